@@ -4,24 +4,74 @@ Manages agent lifecycle, task routing, and agent communication
 """
 
 import asyncio
-from typing import Dict, Any, List, Optional
+import time
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 import json
 
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import (
+    AGENT_MAX_CONCURRENCY,
+    AGENT_PER_AGENT_CONCURRENCY,
+    AGENT_TASK_TIMEOUT_SECONDS,
+    AGENT_TASK_DEADLINE_SECONDS,
+    AGENT_WORKER_COUNT,
+    AGENT_JOBS_FILE,
+    AGENT_JOB_RETENTION_HOURS,
+    AGENT_ROUTING_REFRESH_SECONDS
+)
 from .base_agent import BaseAgent
+from .job_queue import AgentJobStore, JOB_PRIORITIES
+from .task_keys import task_fingerprint
+from .metrics import AgentMetrics, collect_tool_time, prometheus_label
 from .roadmap_agent import RoadmapAgent
 from .langchain_agent import LangChainRoadmapAgent, langchain_roadmap_agent
 
+# Tasks whose result depends only on their inputs; identical in-flight ones share one run
+COALESCED_TASK_TYPES = {"create_roadmap", "analyze_roadmap", "suggest_roadmap"}
+
+# Task types reported as metric labels; anything else is reported as "other"
+METRIC_TASK_TYPES = COALESCED_TASK_TYPES | {"update_roadmap"}
+
 class AgentManager:
     """Manages all learning agents and coordinates their activities"""
     
     def __init__(self):
         self.agents = {}
-        self.task_queue = []
+        # Pending jobs as (priority, submission seq, job_id); status and results live in job_store
+        self.task_queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        # Opened by start_workers (or on first use), so importing the module creates no files
+        self._job_store: Optional[AgentJobStore] = None
+        self._workers: List[asyncio.Task] = []
         self.is_running = False
         self.agent_stats = {}
         self.created_at = datetime.now()
         
+        # Bounded concurrency: one global limit plus a limit per agent
+        self.task_timeout = AGENT_TASK_TIMEOUT_SECONDS
+        self.task_deadline = AGENT_TASK_DEADLINE_SECONDS
+        self._global_semaphore = asyncio.Semaphore(AGENT_MAX_CONCURRENCY)
+        self._agent_semaphores: Dict[str, asyncio.Semaphore] = {}
+        
+        # Single-flight: task fingerprint -> the run shared by identical concurrent tasks
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.coalesced_tasks = 0
+        
+        # Latency histograms (queue wait, LLM, tool, total) and error counters
+        self.metrics = AgentMetrics()
+        
+        # Routing table: task type -> agent names, best first. Rebuilt on (un)registration
+        # and, at most every routing_refresh_seconds, to follow success rates
+        self.routing_refresh_seconds = AGENT_ROUTING_REFRESH_SECONDS
+        self._capabilities: Dict[str, Tuple[str, ...]] = {}
+        self._routes: Dict[str, Tuple[str, ...]] = {}
+        self._routes_refreshed_at = 0.0
+        
         # Register default agents
         self._register_default_agents()
     
@@ -36,12 +86,13 @@ class AgentManager:
         
         print(f"Default agents registered: {list(self.agents.keys())}")
     
-    def register_agent(self, agent: BaseAgent):
-        """Register a new agent"""
+    def register_agent(self, agent: BaseAgent, capabilities: Optional[List[str]] = None):
+        """Register a new agent (capabilities default to the ones the agent declares)"""
         if not isinstance(agent, BaseAgent):
             raise ValueError("Agent must inherit from BaseAgent")
         
         self.agents[agent.name] = agent
+        self._agent_semaphores[agent.name] = self._create_agent_semaphore(agent)
         self.agent_stats[agent.name] = {
             "tasks_executed": 0,
             "successful_tasks": 0,
@@ -50,12 +101,15 @@ class AgentManager:
             "total_execution_time": 0,
             "framework": "Custom"
         }
+        self._capabilities[agent.name] = self._declared_capabilities(agent, capabilities)
+        self._refresh_routes()
         
         print(f"Agent '{agent.name}' registered successfully")
     
-    def register_langchain_agent(self, langchain_agent):
-        """Register a LangChain agent"""
+    def register_langchain_agent(self, langchain_agent, capabilities: Optional[List[str]] = None):
+        """Register a LangChain agent (capabilities default to the ones the agent declares)"""
         self.agents[langchain_agent.name] = langchain_agent
+        self._agent_semaphores[langchain_agent.name] = self._create_agent_semaphore(langchain_agent)
         self.agent_stats[langchain_agent.name] = {
             "tasks_executed": 0,
             "successful_tasks": 0,
@@ -64,6 +118,8 @@ class AgentManager:
             "total_execution_time": 0,
             "framework": "LangChain"
         }
+        self._capabilities[langchain_agent.name] = self._declared_capabilities(langchain_agent, capabilities)
+        self._refresh_routes()
         
         print(f"LangChain Agent '{langchain_agent.name}' registered successfully")
     
@@ -75,10 +131,29 @@ class AgentManager:
                 agent.deactivate()
             del self.agents[agent_name]
             del self.agent_stats[agent_name]
+            self._agent_semaphores.pop(agent_name, None)
+            self._capabilities.pop(agent_name, None)
+            self._refresh_routes()
             print(f"Agent '{agent_name}' unregistered")
             return True
         return False
     
+    @property
+    def job_store(self) -> AgentJobStore:
+        if self._job_store is None:
+            self._job_store = AgentJobStore(AGENT_JOBS_FILE)
+        return self._job_store
+    
+    @staticmethod
+    def _declared_capabilities(agent: Any, capabilities: Optional[List[str]] = None) -> Tuple[str, ...]:
+        declared = capabilities if capabilities is not None else getattr(agent, 'capabilities', ())
+        return tuple(dict.fromkeys(str(task_type).lower() for task_type in declared))
+    
+    @staticmethod
+    def _create_agent_semaphore(agent: Any) -> asyncio.Semaphore:
+        """Per-agent concurrency limit (agents may declare their own max_concurrency)"""
+        return asyncio.Semaphore(getattr(agent, 'max_concurrency', AGENT_PER_AGENT_CONCURRENCY))
+    
     def get_agent(self, agent_name: str) -> Optional[Any]:
         """Get a specific agent by name"""
         return self.agents.get(agent_name)
@@ -116,6 +191,7 @@ class AgentManager:
             
             status.update(stats)
             status['success_rate'] = round(success_rate, 2)
+            status['latency'] = self.metrics.snapshot().get(agent_name, {})
             return status
         return None
     
@@ -126,9 +202,123 @@ class AgentManager:
             statuses[agent_name] = self.get_agent_status(agent_name)
         return statuses
     
-    async def execute_task(self, task: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute a task using the appropriate agent"""
+    async def execute_task(self, task: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Execute a task using the appropriate agent
+        
+        The task waits for a global and a per-agent slot before it runs. `timeout`
+        (or task['timeout']) bounds the agent run in seconds; 0 disables it.
+        Identical concurrent tasks (same type and normalized inputs) share a single
+        run; the extra callers get the same result marked with "coalesced": True.
+        Each extra caller still waits no longer than its own timeout; if that
+        runs out first it gets a timeout error while the shared run goes on.
+        """
+        if task.get('type', '').lower() not in COALESCED_TASK_TYPES:
+            return await self._execute_task(task, timeout)
+        
+        key = task_fingerprint(task)
+        in_flight = self._in_flight.get(key)
+        coalesced = in_flight is not None
+        if coalesced:
+            self.coalesced_tasks += 1
+        else:
+            # Run as its own task so a cancelled caller does not cancel the others
+            in_flight = asyncio.ensure_future(self._execute_task(task, timeout))
+            self._in_flight[key] = in_flight
+            in_flight.add_done_callback(lambda done: self._release_in_flight(key, done))
+        
+        if not coalesced:
+            return dict(await asyncio.shield(in_flight))
+        
+        if timeout is None:
+            timeout = task.get('timeout', self.task_timeout)
+        try:
+            result = await asyncio.wait_for(asyncio.shield(in_flight), timeout if timeout and timeout > 0 else None)
+        except asyncio.TimeoutError:
+            return {
+                "success": False,
+                "error": f"Task timed out after {timeout} seconds",
+                "timed_out": True,
+                "coalesced": True,
+                "execution_time": timeout,
+                "timestamp": datetime.now().isoformat()
+            }
+        return {**result, "coalesced": True}
+    
+    async def execute_task_with_deadline(self,
+                                         task: Dict[str, Any],
+                                         user_id: Optional[str] = None,
+                                         deadline: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Execute a task but answer within `deadline` seconds
+        
+        If a create_roadmap run misses the deadline, a template roadmap is returned
+        right away and the run keeps going in the background. Its result is stored
+        as a job (`upgrade_job_id`) that the client can fetch from /agents/jobs/{id}.
+        The job is stored as 'running'; if the process stops before the run ends,
+        load_pending queues it again on the next start and a worker runs it anew.
+        Without an agent that can build a template roadmap, a timeout error is
+        returned instead.
+        """
+        deadline = self.task_deadline if deadline is None else deadline
+        if not deadline or deadline <= 0 or task.get('type', '').lower() != 'create_roadmap':
+            return await self.execute_task(task)
+        
+        run = asyncio.ensure_future(self.execute_task(task))
+        try:
+            return await asyncio.wait_for(asyncio.shield(run), deadline)
+        except asyncio.TimeoutError:
+            pass
+        
+        template_agent = next(
+            (agent for agent in self.agents.values() if hasattr(agent, 'create_template_roadmap')), None
+        )
+        if template_agent is None:
+            return {
+                "success": False,
+                "error": f"Task timed out after {deadline} seconds",
+                "timed_out": True,
+                "execution_time": deadline,
+                "timestamp": datetime.now().isoformat()
+            }
+        
+        # SQLite writes run in a thread so the event loop keeps serving other requests
+        job = await asyncio.to_thread(self.job_store.add, task, "interactive", user_id)
+        await asyncio.to_thread(self.job_store.mark_running, job["job_id"])
+        run.add_done_callback(lambda done: self._finish_late_run(job["job_id"], done))
+        
+        return {
+            "success": True,
+            "agent": template_agent.name,
+            "result": template_agent.create_template_roadmap(task.get('user_info', {})),
+            "degraded": True,
+            "upgrade_job_id": job["job_id"],
+            "execution_time": deadline,
+            "timestamp": datetime.now().isoformat(),
+            "framework": self.agent_stats.get(template_agent.name, {}).get('framework', 'Unknown')
+        }
+    
+    def _finish_late_run(self, job_id: str, done: asyncio.Future):
+        """
+        Store the result of a run that missed its deadline so the client can upgrade
         
+        Runs as a done-callback on the event loop, so the SQLite write is handed
+        to the default executor instead of blocking the loop.
+        """
+        if done.cancelled():
+            outcome = (False, None, "Task was cancelled")
+        elif done.exception() is not None:
+            outcome = (False, None, str(done.exception()))
+        else:
+            result = done.result()
+            outcome = (bool(result.get("success")), result, result.get("error"))
+        done.get_loop().run_in_executor(None, self.job_store.finish, job_id, *outcome)
+    
+    def _release_in_flight(self, key: str, done: asyncio.Future):
+        if self._in_flight.get(key) is done:
+            del self._in_flight[key]
+    
+    async def _execute_task(self, task: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
         task_type = task.get('type', '').lower()
         target_agent = task.get('agent', None)
         
@@ -140,101 +330,145 @@ class AgentManager:
         
         if not agent:
             return {
+                "success": False,
                 "error": f"No suitable agent found for task type: {task_type}",
                 "available_agents": list(self.agents.keys())
             }
         
-        # Execute task and track performance
-        start_time = datetime.now()
+        if timeout is None:
+            timeout = task.get('timeout', self.task_timeout)
         
-        try:
-            # LangChain agent için özel işlem
-            if hasattr(agent, 'create_roadmap') and task_type == 'create_roadmap':
-                result = await agent.create_roadmap(task.get('user_info', {}))
-            elif hasattr(agent, 'analyze_roadmap') and task_type == 'analyze_roadmap':
-                result = await agent.analyze_roadmap(task.get('roadmap_id', ''))
-            elif hasattr(agent, 'execute_task'):
-                # Legacy agent için
-                result = await agent.execute_task(task)
-            else:
-                result = {"error": "Agent does not support this task type"}
+        agent_semaphore = self._agent_semaphores.get(agent.name) or self._create_agent_semaphore(agent)
+        metric_type = task_type if task_type in METRIC_TASK_TYPES else "other"
+        wait_start = time.perf_counter()
+        # Agent slot first, so tasks queued behind a busy agent do not hold global slots
+        async with agent_semaphore, self._global_semaphore:
+            # Execute task and track performance (time spent waiting for a slot is excluded)
+            run_start = time.perf_counter()
+            start_time = datetime.now()
+            result = None
+            error = None
             
-            # Update agent statistics
-            execution_time = (datetime.now() - start_time).total_seconds()
-            self._update_agent_stats(agent.name, True, execution_time)
+            with collect_tool_time() as tool_time:
+                try:
+                    result = await asyncio.wait_for(
+                        self._dispatch_task(agent, task_type, task),
+                        timeout=timeout if timeout and timeout > 0 else None
+                    )
+                except Exception as e:
+                    error = e
             
+            run_end = time.perf_counter()
+            execution_time = (datetime.now() - start_time).total_seconds()
+        
+        # Agents catch their own errors and return them in the result
+        error_class = type(error).__name__ if error is not None else (
+            "AgentError" if isinstance(result, dict) and result.get("error") and not result.get("success") else None
+        )
+        self._update_agent_stats(agent.name, error_class is None, execution_time)
+        self._record_metrics(agent.name, metric_type, error_class,
+                             queue=run_start - wait_start, run=run_end - run_start, tool=tool_time[0])
+        
+        if error is None:
             return {
                 "success": True,
                 "agent": agent.name,
                 "result": result,
                 "execution_time": execution_time,
                 "timestamp": datetime.now().isoformat(),
-                "framework": self.agent_stats[agent.name].get('framework', 'Unknown')
-            }
-            
-        except Exception as e:
-            execution_time = (datetime.now() - start_time).total_seconds()
-            self._update_agent_stats(agent.name, False, execution_time)
-            
-            return {
-                "success": False,
-                "error": str(e),
-                "agent": agent.name,
-                "execution_time": execution_time,
-                "timestamp": datetime.now().isoformat(),
-                "framework": self.agent_stats[agent.name].get('framework', 'Unknown')
+                "framework": self.agent_stats.get(agent.name, {}).get('framework', 'Unknown')
             }
+        
+        timed_out = isinstance(error, asyncio.TimeoutError)
+        return {
+            "success": False,
+            "error": f"Task timed out after {timeout} seconds" if timed_out else str(error),
+            "timed_out": timed_out,
+            "agent": agent.name,
+            "execution_time": execution_time,
+            "timestamp": datetime.now().isoformat(),
+            "framework": self.agent_stats.get(agent.name, {}).get('framework', 'Unknown')
+        }
+    
+    def _record_metrics(self, agent_name: str, task_type: str, error_class: Optional[str],
+                        queue: float, run: float, tool: float):
+        """Record the phases of one run; LLM time is the run time not spent in tools"""
+        self.metrics.observe(agent_name, task_type, "queue", queue)
+        self.metrics.observe(agent_name, task_type, "llm", max(run - tool, 0.0))
+        if tool:
+            self.metrics.observe(agent_name, task_type, "tool", tool)
+        self.metrics.observe(agent_name, task_type, "total", queue + run)
+        if error_class is not None:
+            self.metrics.count_error(agent_name, task_type, error_class)
+    
+    async def _dispatch_task(self, agent: Any, task_type: str, task: Dict[str, Any]) -> Dict[str, Any]:
+        """Call the agent method that handles the task type"""
+        # LangChain agent için özel işlem
+        if hasattr(agent, 'create_roadmap') and task_type == 'create_roadmap':
+            return await agent.create_roadmap(task.get('user_info', {}))
+        elif hasattr(agent, 'analyze_roadmap') and task_type == 'analyze_roadmap':
+            return await agent.analyze_roadmap(task.get('roadmap_id', ''))
+        elif hasattr(agent, 'execute_task'):
+            # Legacy agent için
+            return await agent.execute_task(task)
+        return {"error": "Agent does not support this task type"}
     
     def _find_best_agent_for_task(self, task: Dict[str, Any]) -> Optional[Any]:
-        """Find the best agent for a given task"""
-        best_agent = None
-        best_score = 0
-        
-        for agent_name, agent in self.agents.items():
-            # LangChain agent için özel kontrol
-            if hasattr(agent, 'create_roadmap') and task.get('type') == 'create_roadmap':
-                score = self._calculate_langchain_agent_score(agent, task)
-            elif hasattr(agent, 'can_handle_task'):
-                # Legacy agent için
-                if agent.can_handle_task(task):
-                    score = self._calculate_agent_score(agent, task)
-                else:
-                    continue
-            else:
+        """Find the best agent for a given task (first active agent in its routing table entry)"""
+        if self.routing_refresh_seconds > 0 and \
+                time.monotonic() - self._routes_refreshed_at >= self.routing_refresh_seconds:
+            self._refresh_routes()
+        
+        for agent_name in self._routes.get(task.get('type', '').lower(), ()):
+            agent = self.agents.get(agent_name)
+            if agent is not None and getattr(agent, 'is_active', True):
+                return agent
+        return None
+    
+    def _refresh_routes(self):
+        """Rank the agents of every declared task type; ties keep registration order"""
+        ranked: Dict[str, List[Tuple[int, int, str]]] = {}
+        for order, (agent_name, agent) in enumerate(self.agents.items()):
+            capabilities = self._capabilities.get(agent_name, ())
+            if not capabilities:
                 continue
-            
-            if score > best_score:
-                best_score = score
-                best_agent = agent
+            if self.agent_stats.get(agent_name, {}).get('framework') == 'LangChain':
+                score = self._calculate_langchain_agent_score(agent)
+            else:
+                score = self._calculate_agent_score(agent)
+            for task_type in capabilities:
+                ranked.setdefault(task_type, []).append((-score, order, agent_name))
         
-        return best_agent
+        self._routes = {
+            task_type: tuple(agent_name for _, _, agent_name in sorted(entries))
+            for task_type, entries in ranked.items()
+        }
+        self._routes_refreshed_at = time.monotonic()
     
-    def _calculate_langchain_agent_score(self, agent: Any, task: Dict[str, Any]) -> int:
-        """Calculate how well a LangChain agent can handle a task"""
+    def _calculate_langchain_agent_score(self, agent: Any) -> int:
+        """Calculate how well a LangChain agent can handle its declared tasks"""
         score = 0
         
-        # LangChain agent'lar için yüksek öncelik
-        score += 50
+        # Success rate so far; an agent that has not run yet is trusted fully
+        stats = self.agent_stats.get(agent.name, {})
+        executed = stats.get('tasks_executed', 0)
+        success_rate = stats.get('successful_tasks', 0) / executed if executed else 1.0
         
-        # Task type kontrolü
-        task_type = task.get('type', '').lower()
-        if task_type == 'create_roadmap' and hasattr(agent, 'create_roadmap'):
-            score += 30
-        elif task_type == 'analyze_roadmap' and hasattr(agent, 'analyze_roadmap'):
-            score += 30
+        # LangChain agent'lar için yüksek öncelik (50) ve declared capability bonus (30),
+        # scaled by the success rate so that a mostly failing agent drops below the legacy ones
+        score += int(success_rate * 80)
         
         # Active agent bonus
         if getattr(agent, 'is_active', True):
             score += 10
         
         # Tools count bonus
-        if hasattr(agent, 'tools'):
-            score += min(len(agent.tools), 10)
+        score += min(len(getattr(agent, 'tools', ())), 10)
         
         return score
     
-    def _calculate_agent_score(self, agent: BaseAgent, task: Dict[str, Any]) -> int:
-        """Calculate how well an agent can handle a task"""
+    def _calculate_agent_score(self, agent: BaseAgent) -> int:
+        """Calculate how well an agent can handle its declared tasks"""
         score = 0
         
         # Base score for being able to handle the task
@@ -263,59 +497,88 @@ class AgentManager:
             
             if success:
                 stats["successful_tasks"] += 1
+            else:
+                stats["failed_tasks"] += 1
             
             stats["last_task"] = datetime.now().isoformat()
     
-    async def execute_batch_tasks(self, tasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Execute multiple tasks in parallel"""
+    async def execute_batch_tasks(self, tasks: List[Dict[str, Any]], timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Execute multiple tasks in parallel
+        
+        All tasks are started at once and share the global and per-agent
+        concurrency limits, so a batch takes about as long as its slowest task
+        (per slot) instead of the sum. Results are returned in input order.
+        """
         if not tasks:
             return []
         
-        # Group tasks by agent for better efficiency
-        agent_tasks = {}
-        for task in tasks:
-            agent = self._find_best_agent_for_task(task)
-            if agent:
-                agent_name = agent.name
-                if agent_name not in agent_tasks:
-                    agent_tasks[agent_name] = []
-                agent_tasks[agent_name].append(task)
-        
-        # Execute tasks in parallel
-        results = []
-        for agent_name, agent_task_list in agent_tasks.items():
-            agent = self.agents[agent_name]
-            
-            # Execute tasks for this agent
-            agent_results = []
-            for task in agent_task_list:
-                try:
-                    if hasattr(agent, 'create_roadmap') and task.get('type') == 'create_roadmap':
-                        result = await agent.create_roadmap(task.get('user_info', {}))
-                    elif hasattr(agent, 'analyze_roadmap') and task.get('type') == 'analyze_roadmap':
-                        result = await agent.analyze_roadmap(task.get('roadmap_id', ''))
-                    elif hasattr(agent, 'execute_task'):
-                        result = await agent.execute_task(task)
-                    else:
-                        result = {"error": "Agent does not support this task type"}
-                    
-                    agent_results.append({
-                        "success": True,
-                        "agent": agent_name,
-                        "result": result,
-                        "task": task
-                    })
-                except Exception as e:
-                    agent_results.append({
-                        "success": False,
-                        "error": str(e),
-                        "agent": agent_name,
-                        "task": task
-                    })
-            
-            results.extend(agent_results)
+        async def run(task: Dict[str, Any]) -> Dict[str, Any]:
+            result = await self.execute_task(task, timeout=timeout)
+            result["task"] = task
+            return result
         
-        return results
+        return list(await asyncio.gather(*(run(task) for task in tasks)))
+    
+    async def submit_task(self, task: Dict[str, Any], priority: str = "batch", user_id: Optional[str] = None) -> Dict[str, Any]:
+        """Queue a task for the worker pool and return the persisted job"""
+        job = await asyncio.to_thread(self.job_store.add, task, priority, user_id)
+        self.task_queue.put_nowait((JOB_PRIORITIES[priority], job["seq"], job["job_id"]))
+        return job
+    
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job with its status and (when finished) result"""
+        return self.job_store.get(job_id)
+    
+    async def start_workers(self, worker_count: Optional[int] = None):
+        """Re-queue jobs left over from the previous run and start the worker pool"""
+        if self._workers:
+            return
+        
+        pruned = await asyncio.to_thread(self.job_store.prune_finished, AGENT_JOB_RETENTION_HOURS)
+        pending = await asyncio.to_thread(self.job_store.load_pending)
+        for job in pending:
+            self.task_queue.put_nowait((JOB_PRIORITIES[job["priority"]], job["seq"], job["job_id"]))
+        
+        worker_count = AGENT_WORKER_COUNT if worker_count is None else worker_count
+        self._workers = [asyncio.create_task(self._worker_loop()) for _ in range(max(1, worker_count))]
+        self.start()
+        print(f"Agent worker pool started: {len(self._workers)} workers, "
+              f"{len(pending)} pending jobs restored, {pruned} old jobs pruned")
+    
+    async def stop_workers(self):
+        """Stop the worker pool; interrupted jobs are re-queued on the next start"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self._job_store is not None:
+            self._job_store.close()
+            self._job_store = None
+        self.stop()
+    
+    async def _worker_loop(self):
+        """Take the highest-priority job from the queue and run it"""
+        while True:
+            _, _, job_id = await self.task_queue.get()
+            try:
+                job = await asyncio.to_thread(self.job_store.get, job_id)
+                # A job can be queued twice if it was submitted before the pool restored pending jobs
+                if job is None or job["status"] != "queued":
+                    continue
+                await asyncio.to_thread(self.job_store.mark_running, job_id)
+                queued_for = (datetime.now() - datetime.fromisoformat(job["created_at"])).total_seconds()
+                self.metrics.observe("all", "all", "job_queue", queued_for)
+                result = await self.execute_task(job["task"])
+                await asyncio.to_thread(
+                    self.job_store.finish, job_id, bool(result.get("success")), result, result.get("error")
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                await asyncio.to_thread(self.job_store.finish, job_id, False, None, str(e))
+            finally:
+                self.task_queue.task_done()
     
     def get_system_status(self) -> Dict[str, Any]:
         """Get overall system status"""
@@ -344,9 +607,42 @@ class AgentManager:
             "uptime": (datetime.now() - self.created_at).total_seconds(),
             "created_at": self.created_at.isoformat(),
             "last_updated": datetime.now().isoformat(),
-            "framework_distribution": framework_stats
+            "framework_distribution": framework_stats,
+            "coalesced_tasks": self.coalesced_tasks,
+            "in_flight_tasks": len(self._in_flight),
+            "job_queue": {
+                "workers": len(self._workers),
+                "queued": self.task_queue.qsize(),
+                "jobs_by_status": self.job_store.get_stats()
+            },
+            "routing_table": {task_type: list(agent_names) for task_type, agent_names in self._routes.items()},
+            "latency": self.metrics.snapshot()
         }
     
+    def render_metrics(self) -> str:
+        """All agent metrics in the Prometheus text exposition format"""
+        lines = self.metrics.render_prometheus()
+        lines += [
+            "# HELP agent_tasks_total Agent tasks by outcome",
+            "# TYPE agent_tasks_total counter"
+        ]
+        for agent_name, stats in list(self.agent_stats.items()):
+            label = prometheus_label(agent_name)
+            lines.append(f'agent_tasks_total{{agent="{label}",outcome="success"}} {stats["successful_tasks"]}')
+            lines.append(f'agent_tasks_total{{agent="{label}",outcome="failed"}} {stats["failed_tasks"]}')
+        lines += [
+            "# HELP agent_coalesced_tasks_total Tasks that shared an identical in-flight run",
+            "# TYPE agent_coalesced_tasks_total counter",
+            f"agent_coalesced_tasks_total {self.coalesced_tasks}",
+            "# HELP agent_in_flight_tasks Distinct coalescable tasks currently running",
+            "# TYPE agent_in_flight_tasks gauge",
+            f"agent_in_flight_tasks {len(self._in_flight)}",
+            "# HELP agent_job_queue_depth Jobs waiting for a worker",
+            "# TYPE agent_job_queue_depth gauge",
+            f"agent_job_queue_depth {self.task_queue.qsize()}"
+        ]
+        return "\n".join(lines) + "\n"
+    
     def start(self):
         """Start the agent manager"""
         self.is_running = True
@@ -368,6 +664,8 @@ class AgentManager:
                 "total_execution_time": 0,
                 "framework": self.agent_stats[agent_name].get('framework', 'Unknown')
             }
+        self.metrics.clear()
+        self._refresh_routes()
         print("Agent statistics cleared")
 
 # Global Agent Manager instance
@@ -4,7 +4,7 @@ Provides common functionality and interface for all agents
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 import asyncio
 import json
 from datetime import datetime
@@ -12,6 +12,9 @@ from datetime import datetime
 class BaseAgent(ABC):
     """Base class for all learning agents"""
     
+    # Task types the agent handles; the agent manager routes tasks by these
+    capabilities: Tuple[str, ...] = ()
+    
     def __init__(self, name: str, description: str):
         self.name = name
         self.description = description
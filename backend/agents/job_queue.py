@@ -0,0 +1,120 @@
+"""
+Agent Job Store - Durable storage for queued agent tasks
+Keeps job status and results in SQLite so queued work survives a restart
+"""
+
+import json
+import sqlite3
+import threading
+import uuid
+from typing import Dict, Any, List, Optional
+from datetime import datetime, timedelta
+
+# Lower value runs first
+JOB_PRIORITIES = {"interactive": 0, "batch": 1}
+
+class AgentJobStore:
+    """SQLite-backed job table used by the AgentManager worker pool"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS agent_job (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id TEXT NOT NULL UNIQUE,
+            user_id TEXT,
+            priority TEXT NOT NULL,
+            status TEXT NOT NULL,
+            task TEXT NOT NULL,
+            result TEXT,
+            error TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT NOT NULL,
+            started_at TEXT,
+            finished_at TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_agent_job_status ON agent_job (status);
+    """
+
+    def __init__(self, db_file: str = "agent_jobs.db"):
+        self.db_file = db_file
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_file, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+
+    def add(self, task: Dict[str, Any], priority: str = "batch", user_id: Optional[str] = None) -> Dict[str, Any]:
+        """Persist a new queued job and return it"""
+        if priority not in JOB_PRIORITIES:
+            raise ValueError(f"Unknown job priority: {priority}")
+
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                """INSERT INTO agent_job (job_id, user_id, priority, status, task, created_at)
+                   VALUES (?, ?, ?, 'queued', ?, ?)""",
+                (job_id, user_id, priority, json.dumps(task, ensure_ascii=False, default=str),
+                 datetime.now().isoformat())
+            )
+        return self.get(job_id)
+
+    def mark_running(self, job_id: str):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE agent_job SET status = 'running', started_at = ?, attempts = attempts + 1 WHERE job_id = ?",
+                (datetime.now().isoformat(), job_id)
+            )
+
+    def finish(self, job_id: str, success: bool, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE agent_job SET status = ?, result = ?, error = ?, finished_at = ? WHERE job_id = ?",
+                ("completed" if success else "failed",
+                 json.dumps(result, ensure_ascii=False, default=str) if result is not None else None,
+                 error, datetime.now().isoformat(), job_id)
+            )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM agent_job WHERE job_id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row is not None else None
+
+    def load_pending(self) -> List[Dict[str, Any]]:
+        """
+        Jobs that still have to run, in priority then submission order
+
+        Jobs left 'running' by a previous process were interrupted and are queued again.
+        """
+        with self._lock:
+            self._conn.execute("UPDATE agent_job SET status = 'queued', started_at = NULL WHERE status = 'running'")
+            rows = self._conn.execute(
+                "SELECT * FROM agent_job WHERE status = 'queued' ORDER BY seq"
+            ).fetchall()
+        jobs = [self._row_to_job(row) for row in rows]
+        jobs.sort(key=lambda job: (JOB_PRIORITIES[job["priority"]], job["seq"]))
+        return jobs
+
+    def prune_finished(self, older_than_hours: float) -> int:
+        """Delete completed/failed jobs finished before the retention window"""
+        cutoff = (datetime.now() - timedelta(hours=older_than_hours)).isoformat()
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM agent_job WHERE status IN ('completed', 'failed') AND finished_at < ?", (cutoff,)
+            )
+        return cursor.rowcount
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM agent_job GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["task"] = json.loads(job["task"])
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        return job
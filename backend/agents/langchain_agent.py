@@ -5,6 +5,7 @@ Modern agent implementation using LangChain framework
 
 import asyncio
 import json
+import uuid
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 import sys
@@ -27,6 +28,8 @@ from config import GEMINI_API_KEY
 from services.ai_service import ai_service
 from services.educational_content_service import educational_content_service
 from services.serp_ai_service import serp_ai_service
+from services.roadmap_cache import roadmap_cache, profile_key
+from .metrics import timed_tool
 
 class RoadmapRequest(BaseModel):
     interests: List[str] = Field(description="Kullanıcının ilgi alanları")
@@ -38,6 +41,9 @@ class RoadmapRequest(BaseModel):
 class LangChainRoadmapAgent:
     """LangChain tabanlı roadmap oluşturma agent'ı"""
     
+    # analyze_roadmap yalnızca agent adıyla istendiğinde çalışır (yönlendirme tablosunda yok)
+    capabilities = ("create_roadmap",)
+    
     def __init__(self):
         self.name = "LangChainRoadmapAgent"
         self.description = "LangChain-powered learning roadmap generation agent"
@@ -112,6 +118,7 @@ class LangChainRoadmapAgent:
         """Agent için araçları oluştur"""
         
         @tool
+        @timed_tool
         def search_educational_content(query: str) -> str:
             """Eğitim içeriği ara"""
             try:
@@ -121,6 +128,7 @@ class LangChainRoadmapAgent:
                 return f"Eğitim içeriği arama hatası: {str(e)}"
         
         @tool
+        @timed_tool
         def search_online_resources(topic: str) -> str:
             """Online kaynakları ara"""
             try:
@@ -130,6 +138,7 @@ class LangChainRoadmapAgent:
                 return f"Online kaynak arama hatası: {str(e)}"
         
         @tool
+        @timed_tool
         def analyze_skill_level(interests: List[str], goals: List[str]) -> str:
             """Kullanıcının seviyesini analiz et"""
             try:
@@ -150,6 +159,7 @@ class LangChainRoadmapAgent:
                 return f"Seviye analizi hatası: {str(e)}"
         
         @tool
+        @timed_tool
         def generate_learning_modules(interests: List[str], level: str, hours: int) -> str:
             """Öğrenme modüllerini oluştur"""
             try:
@@ -187,6 +197,13 @@ class LangChainRoadmapAgent:
             available_hours = user_info.get('available_hours_per_week', 10)
             timeline_months = user_info.get('target_timeline_months', 6)
             
+            # Aynı (normalize edilmiş) profil için üretilmiş yol haritası varsa agent çalıştırılmaz
+            cache_key = profile_key("langchain_agent", interests, skill_level, learning_goals,
+                                    available_hours, timeline_months)
+            roadmap_data = await asyncio.to_thread(roadmap_cache.get, cache_key)
+            if roadmap_data is not None:
+                return self._store_roadmap(roadmap_data, cached=True)
+            
             # Agent'a görev ver
             task = f"""
             Aşağıdaki kullanıcı bilgilerine göre detaylı bir öğrenme yol haritası oluştur:
@@ -233,19 +250,8 @@ class LangChainRoadmapAgent:
                 roadmap_data = self._parse_agent_response(response_text)
                 
                 if roadmap_data:
-                    # Roadmap'i kaydet
-                    roadmap_id = f"langchain_roadmap_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-                    self.roadmaps[roadmap_id] = roadmap_data
-                    
-                    self.last_activity = datetime.now()
-                    
-                    return {
-                        "success": True,
-                        "roadmap_id": roadmap_id,
-                        "roadmap": roadmap_data,
-                        "message": "LangChain agent ile yol haritası oluşturuldu",
-                        "agent": self.name
-                    }
+                    await asyncio.to_thread(roadmap_cache.put, cache_key, roadmap_data)
+                    return self._store_roadmap(roadmap_data)
                 else:
                     # Fallback to template-based roadmap
                     return self._create_fallback_roadmap(user_info)
@@ -261,6 +267,22 @@ class LangChainRoadmapAgent:
                 "error": f"LangChain agent hatası: {str(e)}"
             }
     
+    def _store_roadmap(self, roadmap_data: Dict[str, Any], cached: bool = False) -> Dict[str, Any]:
+        """Üretilen (veya önbellekten gelen) yol haritasını yeni bir kimlikle kaydet"""
+        roadmap_id = f"langchain_roadmap_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        self.roadmaps[roadmap_id] = roadmap_data
+        
+        self.last_activity = datetime.now()
+        
+        return {
+            "success": True,
+            "roadmap_id": roadmap_id,
+            "roadmap": roadmap_data,
+            "message": "LangChain agent ile yol haritası oluşturuldu",
+            "agent": self.name,
+            "cached": cached
+        }
+    
     def _create_fallback_roadmap(self, user_info: Dict[str, Any]) -> Dict[str, Any]:
         """API hatası durumunda fallback roadmap oluştur"""
         try:
@@ -300,7 +322,7 @@ class LangChainRoadmapAgent:
             }
             
             # Roadmap'i kaydet
-            roadmap_id = f"fallback_roadmap_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            roadmap_id = f"fallback_roadmap_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
             self.roadmaps[roadmap_id] = roadmap_data
             
             self.last_activity = datetime.now()
@@ -0,0 +1,188 @@
+"""
+Agent Metrics - Latency histograms and error counters for agent tasks
+Recording is a couple of integer updates on the event loop; no locks are taken
+"""
+
+import time
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, List, Optional, Tuple
+
+# Log-linear buckets: values below 16 µs are exact, every power of two above is
+# split into 16 sub-buckets (~6% relative error), up to 2^40 µs (~12 days)
+SUB_BUCKET_BITS = 4
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+MAX_EXPONENT = 40
+BUCKET_COUNT = SUB_BUCKETS + (MAX_EXPONENT - SUB_BUCKET_BITS + 1) * SUB_BUCKETS
+MAX_TRACKABLE_US = (1 << (MAX_EXPONENT + 1)) - 1
+
+SUMMARY_QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+# Tool time of the task running in the current context (a one-item list so tools can add to it)
+_tool_time: ContextVar[Optional[List[float]]] = ContextVar("agent_tool_time", default=None)
+
+
+class LatencyHistogram:
+    """HDR-style histogram over microseconds with fixed log-linear buckets"""
+
+    __slots__ = ("counts", "count", "total_us", "max_us")
+
+    def __init__(self):
+        self.counts = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total_us = 0
+        self.max_us = 0
+
+    @staticmethod
+    def _index(value_us: int) -> int:
+        if value_us < SUB_BUCKETS:
+            return value_us
+        exponent = value_us.bit_length() - 1
+        sub_bucket = (value_us >> (exponent - SUB_BUCKET_BITS)) - SUB_BUCKETS
+        return SUB_BUCKETS + (exponent - SUB_BUCKET_BITS) * SUB_BUCKETS + sub_bucket
+
+    @staticmethod
+    def _upper_bound(index: int) -> int:
+        """Largest value (µs) that falls into the bucket"""
+        if index < SUB_BUCKETS:
+            return index
+        exponent = (index - SUB_BUCKETS) // SUB_BUCKETS + SUB_BUCKET_BITS
+        sub_bucket = (index - SUB_BUCKETS) % SUB_BUCKETS
+        width = 1 << (exponent - SUB_BUCKET_BITS)
+        return ((SUB_BUCKETS + sub_bucket) << (exponent - SUB_BUCKET_BITS)) + width - 1
+
+    def record(self, seconds: float):
+        value_us = min(max(int(seconds * 1_000_000), 0), MAX_TRACKABLE_US)
+        self.counts[self._index(value_us)] += 1
+        self.count += 1
+        self.total_us += value_us
+        if value_us > self.max_us:
+            self.max_us = value_us
+
+    def quantiles(self, quantiles: Tuple[float, ...] = SUMMARY_QUANTILES) -> List[float]:
+        """Quantile values in seconds (bucket upper bound, capped at the observed max)"""
+        if not self.count:
+            return [0.0 for _ in quantiles]
+        ranks = [max(1, int(q * self.count + 0.999999)) for q in quantiles]
+        values: List[Optional[float]] = [None] * len(ranks)
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if not bucket_count:
+                continue
+            seen += bucket_count
+            for position, rank in enumerate(ranks):
+                if values[position] is None and seen >= rank:
+                    values[position] = min(self._upper_bound(index), self.max_us) / 1_000_000
+            if values[-1] is not None:
+                break
+        return [value if value is not None else self.max_us / 1_000_000 for value in values]
+
+    def summary(self) -> Dict[str, Any]:
+        p50, p90, p99, p999 = self.quantiles()
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_us / self.count / 1000, 3) if self.count else 0,
+            "p50_ms": round(p50 * 1000, 3),
+            "p90_ms": round(p90 * 1000, 3),
+            "p99_ms": round(p99 * 1000, 3),
+            "p999_ms": round(p999 * 1000, 3),
+            "max_ms": round(self.max_us / 1000, 3)
+        }
+
+
+@contextmanager
+def tool_timer():
+    """Add the duration of a tool call to the tool time of the current agent task"""
+    accumulator = _tool_time.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if accumulator is not None:
+            accumulator[0] += time.perf_counter() - start
+
+
+def timed_tool(func):
+    """Decorator form of tool_timer (keeps the signature and docstring for tool registries)"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with tool_timer():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+@contextmanager
+def collect_tool_time():
+    """Collect the tool time of everything run inside the block; yields a one-item list"""
+    accumulator = [0.0]
+    token = _tool_time.set(accumulator)
+    try:
+        yield accumulator
+    finally:
+        _tool_time.reset(token)
+
+
+def prometheus_label(value: str) -> str:
+    """Escape a Prometheus label value"""
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+class AgentMetrics:
+    """Latency histograms per (agent, task type, phase) and error counters per exception class"""
+
+    def __init__(self):
+        self.histograms: Dict[Tuple[str, str, str], LatencyHistogram] = {}
+        self.errors: Dict[Tuple[str, str, str], int] = {}
+
+    def observe(self, agent: str, task_type: str, phase: str, seconds: float):
+        key = (agent, task_type, phase)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms.setdefault(key, LatencyHistogram())
+        histogram.record(seconds)
+
+    def count_error(self, agent: str, task_type: str, error_class: str):
+        key = (agent, task_type, error_class)
+        self.errors[key] = self.errors.get(key, 0) + 1
+
+    def clear(self):
+        self.histograms = {}
+        self.errors = {}
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Nested summary for JSON status endpoints: agent -> task type -> phase/errors"""
+        agents: Dict[str, Dict[str, Any]] = {}
+
+        def entry(agent: str, task_type: str) -> Dict[str, Any]:
+            return agents.setdefault(agent, {}).setdefault(task_type, {"latency": {}, "errors": {}})
+
+        for (agent, task_type, phase), histogram in list(self.histograms.items()):
+            entry(agent, task_type)["latency"][phase] = histogram.summary()
+        for (agent, task_type, error_class), count in list(self.errors.items()):
+            entry(agent, task_type)["errors"][error_class] = count
+        return agents
+
+    def render_prometheus(self) -> List[str]:
+        """Prometheus text exposition lines for the histograms and error counters"""
+        lines = [
+            "# HELP agent_task_duration_seconds Agent task latency by phase (queue, llm, tool, total, job_queue)",
+            "# TYPE agent_task_duration_seconds summary"
+        ]
+        for (agent, task_type, phase), histogram in sorted(self.histograms.items()):
+            labels = f'agent="{prometheus_label(agent)}",task_type="{prometheus_label(task_type)}",phase="{phase}"'
+            for quantile, value in zip(SUMMARY_QUANTILES, histogram.quantiles()):
+                lines.append(f'agent_task_duration_seconds{{{labels},quantile="{quantile}"}} {value:.6f}')
+            lines.append(f"agent_task_duration_seconds_sum{{{labels}}} {histogram.total_us / 1_000_000:.6f}")
+            lines.append(f"agent_task_duration_seconds_count{{{labels}}} {histogram.count}")
+
+        lines += [
+            "# HELP agent_task_errors_total Failed agent tasks by exception class",
+            "# TYPE agent_task_errors_total counter"
+        ]
+        for (agent, task_type, error_class), count in sorted(self.errors.items()):
+            lines.append(
+                f'agent_task_errors_total{{agent="{prometheus_label(agent)}",task_type="{prometheus_label(task_type)}",'
+                f'error="{prometheus_label(error_class)}"}} {count}'
+            )
+        return lines
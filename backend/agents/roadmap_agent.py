@@ -6,6 +6,7 @@ Creates personalized learning paths based on user preferences and goals
 import asyncio
 import json
 import re
+import uuid
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 
@@ -19,10 +20,13 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from services.ai_service import ai_service
 from services.educational_content_service import educational_content_service
 from services.serp_ai_service import serp_ai_service
+from services.roadmap_cache import roadmap_cache, profile_key
 
 class RoadmapAgent(BaseAgent):
     """Agent specialized in creating personalized learning roadmaps"""
     
+    capabilities = ('create_roadmap', 'update_roadmap', 'analyze_roadmap', 'suggest_roadmap')
+    
     def __init__(self):
         super().__init__(
             name="RoadmapAgent",
@@ -60,7 +64,7 @@ class RoadmapAgent(BaseAgent):
     def can_handle_task(self, task: Dict[str, Any]) -> bool:
         """Check if this agent can handle the given task"""
         task_type = task.get('type', '').lower()
-        return task_type in ['create_roadmap', 'update_roadmap', 'analyze_roadmap', 'suggest_roadmap']
+        return task_type in self.capabilities
     
     async def execute_task(self, task: Dict[str, Any]) -> Dict[str, Any]:
         """Execute roadmap-related tasks"""
@@ -108,8 +112,22 @@ class RoadmapAgent(BaseAgent):
             interests, skill_level, learning_goals, available_hours, timeline_months
         )
         
-        # Store roadmap
-        roadmap_id = f"roadmap_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        return self._store_roadmap(roadmap)
+    
+    def create_template_roadmap(self, user_info: Dict[str, Any]) -> Dict[str, Any]:
+        """Create and store a deterministic template roadmap without calling the AI (instant fallback)"""
+        roadmap = self._create_template_roadmap(
+            user_info.get('interests', []),
+            user_info.get('skill_level', 'beginner'),
+            user_info.get('available_hours_per_week', 10),
+            user_info.get('target_timeline_months', 6)
+        )
+        return self._store_roadmap(roadmap)
+    
+    def _store_roadmap(self, roadmap: Dict[str, Any]) -> Dict[str, Any]:
+        """Store a generated roadmap under a new id"""
+        # Suffix keeps ids unique when several roadmaps are created in the same second
+        roadmap_id = f"roadmap_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
         self.learning_paths[roadmap_id] = roadmap
         
         # Add success to memory
@@ -130,7 +148,14 @@ class RoadmapAgent(BaseAgent):
     async def _generate_ai_roadmap(self, interests: List[str], skill_level: str, 
                                   learning_goals: List[str], available_hours: int, 
                                   timeline_months: int) -> Dict[str, Any]:
-        """Generate AI-powered roadmap using Gemini"""
+        """Generate AI-powered roadmap using Gemini (cached per normalized profile)"""
+        
+        cache_key = profile_key("roadmap_agent", interests, skill_level, learning_goals,
+                                available_hours, timeline_months)
+        # The disk tier may read SQLite, so keep the lookup off the event loop
+        cached = await asyncio.to_thread(roadmap_cache.get, cache_key)
+        if cached is not None:
+            return cached
         
         # Create comprehensive prompt
         prompt = f"""
@@ -170,8 +195,9 @@ class RoadmapAgent(BaseAgent):
         """
         
         try:
-            # Use AI service to generate roadmap
-            response = ai_service.get_ai_response(
+            # Use AI service to generate roadmap (blocking client, run off the event loop)
+            response = await asyncio.to_thread(
+                ai_service.get_ai_response,
                 user_message=prompt,
                 roadmap_info={
                     'skill_level': skill_level,
@@ -186,6 +212,8 @@ class RoadmapAgent(BaseAgent):
             roadmap_data = self._parse_ai_response(response)
             
             if roadmap_data:
+                # Template fallbacks are cheap and not cached, so a later call can still get an AI result
+                await asyncio.to_thread(roadmap_cache.put, cache_key, roadmap_data)
                 return roadmap_data
             else:
                 # Fallback to template-based roadmap
@@ -431,7 +459,7 @@ class RoadmapAgent(BaseAgent):
         """
         
         try:
-            response = ai_service.get_ai_response(prompt)
+            response = await asyncio.to_thread(ai_service.get_ai_response, prompt)
             # Parse suggestions from response
             suggestions = self._extract_suggestions(response)
             return suggestions
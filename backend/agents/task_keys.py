@@ -0,0 +1,42 @@
+"""
+Task Keys - Canonical fingerprints for agent tasks
+Equivalent requests map to the same key so their work can be shared
+"""
+
+import json
+import hashlib
+from typing import Dict, Any
+
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.text import normalize_text
+
+# Task fields that do not change the outcome of a task
+_IGNORED_TASK_FIELDS = {"timeout", "priority"}
+
+
+def normalize_value(value: Any) -> Any:
+    """Recursively normalize strings inside dicts and lists (list order is kept)"""
+    if isinstance(value, str):
+        return normalize_text(value)
+    if isinstance(value, dict):
+        return {str(key): normalize_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize_value(item) for item in value]
+    return value
+
+
+def task_fingerprint(task: Dict[str, Any]) -> str:
+    """SHA-256 of the task type and its normalized inputs"""
+    canonical = {
+        key: normalize_value(value)
+        for key, value in task.items()
+        if key not in _IGNORED_TASK_FIELDS
+    }
+    canonical["type"] = str(task.get("type", "")).lower()
+    payload = json.dumps(canonical, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
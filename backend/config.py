@@ -19,6 +19,9 @@ JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "mywisepath-secret-key-2024")
 JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
 
+# Yönetim uç noktalarına erişebilecek kullanıcılar (token'daki "sub" değerleri, virgülle ayrılmış)
+ADMIN_USERS = {user.strip() for user in os.getenv("ADMIN_USERS", "").split(",") if user.strip()}
+
 # Database Configuration (for future use)
 MONGODB_URL = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
 DATABASE_NAME = os.getenv("DATABASE_NAME", "mywisepath")
@@ -33,4 +36,45 @@ EMAIL_FROM_NAME = os.getenv("EMAIL_FROM_NAME", "MyWisePath")
 
 # Email Automation Settings
 WEEKLY_REMINDER_ENABLED = os.getenv("WEEKLY_REMINDER_ENABLED", "true").lower() == "true"
-PROGRESS_REPORT_ENABLED = os.getenv("PROGRESS_REPORT_ENABLED", "true").lower() == "true" 
\ No newline at end of file
+PROGRESS_REPORT_ENABLED = os.getenv("PROGRESS_REPORT_ENABLED", "true").lower() == "true"
+
+# PDF Artifact Store Settings
+PDF_STORE_MAX_MB = int(os.getenv("PDF_STORE_MAX_MB", "200"))
+PDF_STORE_RECONCILE_SECONDS = int(os.getenv("PDF_STORE_RECONCILE_SECONDS", "300"))
+
+# PDF Output Settings
+PDF_FONT_PATH = os.getenv("PDF_FONT_PATH")
+PDF_BOLD_FONT_PATH = os.getenv("PDF_BOLD_FONT_PATH")
+
+# Progress Persistence Settings
+PROGRESS_STORE_BACKEND = os.getenv("PROGRESS_STORE_BACKEND", "sqlite")  # sqlite | jsonlog
+PROGRESS_SNAPSHOT_FORMAT = os.getenv("PROGRESS_SNAPSHOT_FORMAT", "json")  # json | binary (jsonlog deposu için)
+PROGRESS_SNAPSHOT_EVERY = int(os.getenv("PROGRESS_SNAPSHOT_EVERY", "1000"))
+PROGRESS_LOG_SYNC_EVERY = int(os.getenv("PROGRESS_LOG_SYNC_EVERY", "32"))
+PROGRESS_DURABILITY = os.getenv("PROGRESS_DURABILITY", "batched")  # fsync_every_commit | batched | async
+PROGRESS_FLUSH_INTERVAL_MS = int(os.getenv("PROGRESS_FLUSH_INTERVAL_MS", "200"))
+PROGRESS_FLUSH_MAX_RECORDS = int(os.getenv("PROGRESS_FLUSH_MAX_RECORDS", "256"))
+PROGRESS_BATCH_MAX_UPDATES = int(os.getenv("PROGRESS_BATCH_MAX_UPDATES", "500"))
+PROGRESS_STREAM_HEARTBEAT_SECONDS = int(os.getenv("PROGRESS_STREAM_HEARTBEAT_SECONDS", "15"))
+PROGRESS_STREAM_BUFFER_EVENTS = int(os.getenv("PROGRESS_STREAM_BUFFER_EVENTS", "100"))
+PROGRESS_ARCHIVE_AFTER_DAYS = int(os.getenv("PROGRESS_ARCHIVE_AFTER_DAYS", "90"))  # 0: soğuk arşiv kapalı
+PROGRESS_ARCHIVE_INTERVAL_SECONDS = int(os.getenv("PROGRESS_ARCHIVE_INTERVAL_SECONDS", "3600"))
+QUIZ_KEYS_FILE = os.getenv("QUIZ_KEYS_FILE", "quiz_keys.json")
+QUIZ_BULK_MAX_SUBMISSIONS = int(os.getenv("QUIZ_BULK_MAX_SUBMISSIONS", "10000"))
+PROGRESS_MULTIPROCESS = os.getenv("PROGRESS_MULTIPROCESS", "false").lower() == "true"  # birden fazla worker süreci
+
+# Agent Execution Settings
+AGENT_MAX_CONCURRENCY = int(os.getenv("AGENT_MAX_CONCURRENCY", "32"))  # tüm agent'larda aynı anda çalışan görev sayısı
+AGENT_PER_AGENT_CONCURRENCY = int(os.getenv("AGENT_PER_AGENT_CONCURRENCY", "20"))
+AGENT_TASK_TIMEOUT_SECONDS = float(os.getenv("AGENT_TASK_TIMEOUT_SECONDS", "120"))  # 0: zaman aşımı yok
+AGENT_TASK_DEADLINE_SECONDS = float(os.getenv("AGENT_TASK_DEADLINE_SECONDS", "8"))  # /execute yanıt süresi sınırı, 0: kapalı
+AGENT_WORKER_COUNT = int(os.getenv("AGENT_WORKER_COUNT", "4"))  # kuyruktaki işleri çalıştıran worker sayısı
+AGENT_JOBS_FILE = os.getenv("AGENT_JOBS_FILE", "agent_jobs.db")
+AGENT_JOB_RETENTION_HOURS = int(os.getenv("AGENT_JOB_RETENTION_HOURS", "24"))
+AGENT_ROUTING_REFRESH_SECONDS = float(os.getenv("AGENT_ROUTING_REFRESH_SECONDS", "60"))  # başarı oranına göre sıralamanın yenilenme aralığı
+
+# Roadmap Cache Settings
+ROADMAP_CACHE_MAX_ENTRIES = int(os.getenv("ROADMAP_CACHE_MAX_ENTRIES", "1000"))  # 0: önbellek kapalı
+ROADMAP_CACHE_TTL_SECONDS = int(os.getenv("ROADMAP_CACHE_TTL_SECONDS", "86400"))
+ROADMAP_CACHE_DISK_FILE = os.getenv("ROADMAP_CACHE_DISK_FILE", "")  # boş: yalnızca bellek
+ROADMAP_CACHE_DISK_MAX_ENTRIES = int(os.getenv("ROADMAP_CACHE_DISK_MAX_ENTRIES", "10000"))
@@ -1,14 +1,15 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 import uvicorn
 from datetime import datetime
 
 # Router'ları import et
-from routers import auth, roadmap, chatbot, automation, learning_environment, agents, progress, rag
+from routers import auth, roadmap, chatbot, automation, learning_environment, agents, progress, rag, admin
 
 # Agent manager'ı import et ve başlat
 from agents.agent_manager import agent_manager
+from services.progress_service import progress_service
 
 app = FastAPI(
     title="MyWisePath API",
@@ -39,6 +40,7 @@ app.include_router(learning_environment.router)
 app.include_router(agents.router)
 app.include_router(progress.router)
 app.include_router(rag.router, prefix="/api/v1")
+app.include_router(admin.router)
 
 @app.get("/")
 async def root():
@@ -48,11 +50,23 @@ async def root():
 async def health_check():
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Agent gecikme histogramları ve hata sayaçları (Prometheus metin formatı)"""
+    return PlainTextResponse(agent_manager.render_metrics(), media_type="text/plain; version=0.0.4")
+
 @app.on_event("startup")
 async def startup_event():
-    """Uygulama başladığında agent manager'ı başlat"""
-    agent_manager.start()
+    """Uygulama başladığında ilerleme deposunu, agent manager'ı ve iş kuyruğu worker'larını başlat"""
+    progress_service.start()
+    await agent_manager.start_workers()
     print("🤖 Agent Manager başlatıldı ve arka planda çalışıyor")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Uygulama kapanırken worker'ları durdur ve ilerleme verilerini snapshot olarak kaydet"""
+    await agent_manager.stop_workers()
+    progress_service.close()
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
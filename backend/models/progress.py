@@ -55,3 +55,31 @@ class QuizSubmission(BaseModel):
     quiz_id: str
     answers: Dict[str, str]  # question_id: answer
     time_taken_minutes: int
+    score: Optional[int] = None  # cevap anahtarı olmayan quizlerde istemcinin hesapladığı puan (0-100)
+
+class QuizQuestionType(str, Enum):
+    CHOICE = "choice"    # seçenek kimliği (a, b, c...)
+    TEXT = "text"        # serbest metin, normalize edilerek karşılaştırılır
+    NUMERIC = "numeric"  # sayısal cevap, tolerans ile
+
+class QuizQuestionKey(BaseModel):
+    question_id: str
+    question_type: QuizQuestionType = QuizQuestionType.CHOICE
+    accepted_answers: List[str]  # kabul edilen cevaplar (sayısal sorularda tek değer)
+    tolerance: float = 0  # sayısal sorularda mutlak tolerans
+    points: int = 1
+
+class QuizAnswerKey(BaseModel):
+    quiz_id: str
+    module_id: Optional[str] = None
+    questions: List[QuizQuestionKey]
+
+class QuizBulkSubmission(BaseModel):
+    user_id: str
+    answers: Dict[str, str]  # question_id: answer
+    time_taken_minutes: int = 0
+
+class QuizBulkGradeRequest(BaseModel):
+    module_id: str
+    roadmap_id: Optional[str] = None  # verilirse sonuçlar kullanıcıların ilerlemesine kaydedilir
+    submissions: List[QuizBulkSubmission]
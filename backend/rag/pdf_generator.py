@@ -3,7 +3,11 @@ PDF Generator - Roadmap'leri PDF formatında oluşturma ve indirme
 """
 
 import os
-from typing import Dict, Any, List, Optional
+import json
+import hashlib
+from functools import lru_cache
+from itertools import chain
+from typing import Dict, Any, List, Optional, Iterable, Iterator, Tuple
 from pathlib import Path
 import logging
 from datetime import datetime
@@ -11,84 +15,233 @@ from datetime import datetime
 # PDF generation imports
 from reportlab.lib.pagesizes import A4, letter
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle, StyleSheet1
 from reportlab.lib.units import inch
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
 from reportlab.pdfgen import canvas
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+from config import (
+    PDF_STORE_MAX_MB,
+    PDF_STORE_RECONCILE_SECONDS,
+    PDF_FONT_PATH,
+    PDF_BOLD_FONT_PATH
+)
+from .pdf_store import PDFArtifactStore
 
 logger = logging.getLogger(__name__)
 
+class LazyStory:
+    """
+    Flowable parçalarını (ör. modül başına bir liste) ihtiyaç oldukça üreten story.
+
+    ReportLab `doc.build` story'yi baştan tüketir; bu sınıf yalnızca sayfa
+    yerleşimi için gereken kadar parçayı belleğe alır, böylece bellekte aynı
+    anda yaklaşık bir modülün içeriği bulunur.
+    """
+    
+    def __init__(self, chunks: Iterable[List[Any]]):
+        self._chunks = iter(chunks)
+        self._buffer: List[Any] = []
+        self._exhausted = False
+    
+    def _fill(self, size: int = 1):
+        """Tampon en az `size` elemana ulaşana kadar sonraki parçaları çeker"""
+        while len(self._buffer) < size and not self._exhausted:
+            try:
+                self._buffer.extend(next(self._chunks))
+            except StopIteration:
+                self._exhausted = True
+    
+    def _fill_for(self, index):
+        if isinstance(index, slice):
+            if index.stop is None or index.stop < 0 or (index.start or 0) < 0:
+                self._fill(float('inf'))
+            else:
+                self._fill(index.stop)
+        elif index < 0:
+            self._fill(float('inf'))
+        else:
+            self._fill(index + 1)
+    
+    def __len__(self) -> int:
+        # Bir sonraki parçanın hazır olduğundan emin ol; build döngüsü len() ile durur
+        self._fill(2)
+        return len(self._buffer)
+    
+    def __getitem__(self, index):
+        self._fill_for(index)
+        return self._buffer[index]
+    
+    def __setitem__(self, index, value):
+        self._fill_for(index)
+        self._buffer[index] = value
+    
+    def __delitem__(self, index):
+        self._fill_for(index)
+        del self._buffer[index]
+    
+    def insert(self, index: int, value: Any):
+        self._buffer.insert(index, value)
+    
+    def __iter__(self) -> Iterator[Any]:
+        while len(self):
+            yield self._buffer.pop(0)
+
+@lru_cache(maxsize=None)
+def _register_fonts() -> Tuple[str, str]:
+    """
+    PDF_FONT_PATH tanımlıysa TrueType fontu süreç başına bir kez kaydeder.
+
+    ReportLab TrueType fontlarını alt küme (subset) olarak gömer; dosyaya
+    yalnızca kullanılan glifler yazılır. Tanımlı değilse gömülmeyen standart
+    Helvetica fontları kullanılır.
+    """
+    if PDF_FONT_PATH and os.path.exists(PDF_FONT_PATH):
+        try:
+            pdfmetrics.registerFont(TTFont('MyWisePathSans', PDF_FONT_PATH))
+            bold_font_name = 'MyWisePathSans'
+            if PDF_BOLD_FONT_PATH and os.path.exists(PDF_BOLD_FONT_PATH):
+                pdfmetrics.registerFont(TTFont('MyWisePathSans-Bold', PDF_BOLD_FONT_PATH))
+                bold_font_name = 'MyWisePathSans-Bold'
+            return 'MyWisePathSans', bold_font_name
+        except Exception as e:
+            logger.error(f"PDF fontu yüklenemedi, Helvetica kullanılacak: {e}")
+    return 'Helvetica', 'Helvetica-Bold'
+
+@lru_cache(maxsize=None)
+def _get_shared_styles(font_name: str, bold_font_name: str) -> Tuple[StyleSheet1, TableStyle]:
+    """
+    Paragraf ve tablo stillerini süreç başına bir kez oluşturur.
+
+    Dönen nesneler tüm PDFGenerator örnekleri arasında paylaşılır ve
+    değiştirilmemelidir.
+    """
+    styles = getSampleStyleSheet()
+    _create_custom_styles(styles, font_name, bold_font_name)
+    
+    stats_table_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), bold_font_name),
+        ('FONTNAME', (0, 1), (-1, -1), font_name),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
+    
+    return styles, stats_table_style
+
+def _create_custom_styles(styles: StyleSheet1, font_name: str, bold_font_name: str):
+    """Özel PDF stilleri oluşturur"""
+    # Başlık stili
+    styles.add(ParagraphStyle(
+        name='CustomTitle',
+        parent=styles['Heading1'],
+        fontName=bold_font_name,
+        fontSize=24,
+        spaceAfter=30,
+        alignment=TA_CENTER,
+        textColor=colors.darkblue
+    ))
+
+    # Alt başlık stili
+    styles.add(ParagraphStyle(
+        name='CustomHeading2',
+        parent=styles['Heading2'],
+        fontName=bold_font_name,
+        fontSize=16,
+        spaceAfter=12,
+        spaceBefore=20,
+        textColor=colors.darkgreen
+    ))
+
+    # Modül başlığı stili
+    styles.add(ParagraphStyle(
+        name='ModuleTitle',
+        parent=styles['Heading3'],
+        fontName=bold_font_name,
+        fontSize=14,
+        spaceAfter=8,
+        spaceBefore=15,
+        textColor=colors.darkred,
+        leftIndent=20
+    ))
+
+    # Normal metin stili
+    styles.add(ParagraphStyle(
+        name='CustomBody',
+        parent=styles['Normal'],
+        fontName=font_name,
+        fontSize=11,
+        spaceAfter=6,
+        alignment=TA_JUSTIFY
+    ))
+
+    # Kaynak stili
+    styles.add(ParagraphStyle(
+        name='ResourceStyle',
+        parent=styles['Normal'],
+        fontName=font_name,
+        fontSize=10,
+        spaceAfter=4,
+        leftIndent=30,
+        textColor=colors.grey
+    ))
+
 class PDFGenerator:
     """PDF oluşturma ve indirme için ana sınıf"""
     
-    def __init__(self, output_directory: str = "./pdfs"):
+    def __init__(self,
+                 output_directory: str = "./pdfs",
+                 max_store_bytes: Optional[int] = None):
         """
         Args:
             output_directory: PDF dosyalarının kaydedileceği dizin
+            max_store_bytes: Dizin için toplam boyut bütçesi (varsayılan: PDF_STORE_MAX_MB)
         """
         self.output_directory = output_directory
-        self.styles = getSampleStyleSheet()
         
-        # Özel stiller oluştur
-        self._create_custom_styles()
+        # Stiller süreç başına bir kez oluşturulur ve paylaşılır
+        self.font_name, self.bold_font_name = _register_fonts()
+        self.styles, self.stats_table_style = _get_shared_styles(self.font_name, self.bold_font_name)
         
-        # Çıktı dizinini oluştur
+        # Çıktı dizinini ve dosya deposunu oluştur
         os.makedirs(output_directory, exist_ok=True)
+        self.store = PDFArtifactStore(
+            output_directory,
+            max_total_bytes=max_store_bytes or PDF_STORE_MAX_MB * 1024 * 1024,
+            reconcile_interval_seconds=PDF_STORE_RECONCILE_SECONDS
+        )
         
         logger.info(f"PDF Generator başlatıldı: {output_directory}")
     
-    def _create_custom_styles(self):
-        """Özel PDF stilleri oluşturur"""
-        # Başlık stili
-        self.styles.add(ParagraphStyle(
-            name='CustomTitle',
-            parent=self.styles['Heading1'],
-            fontSize=24,
-            spaceAfter=30,
-            alignment=TA_CENTER,
-            textColor=colors.darkblue
-        ))
-        
-        # Alt başlık stili
-        self.styles.add(ParagraphStyle(
-            name='CustomHeading2',
-            parent=self.styles['Heading2'],
-            fontSize=16,
-            spaceAfter=12,
-            spaceBefore=20,
-            textColor=colors.darkgreen
-        ))
-        
-        # Modül başlığı stili
-        self.styles.add(ParagraphStyle(
-            name='ModuleTitle',
-            parent=self.styles['Heading3'],
-            fontSize=14,
-            spaceAfter=8,
-            spaceBefore=15,
-            textColor=colors.darkred,
-            leftIndent=20
-        ))
-        
-        # Normal metin stili
-        self.styles.add(ParagraphStyle(
-            name='CustomBody',
-            parent=self.styles['Normal'],
-            fontSize=11,
-            spaceAfter=6,
-            alignment=TA_JUSTIFY
-        ))
-        
-        # Kaynak stili
-        self.styles.add(ParagraphStyle(
-            name='ResourceStyle',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            spaceAfter=4,
-            leftIndent=30,
-            textColor=colors.grey
-        ))
+    def _create_document(self, filepath: str) -> SimpleDocTemplate:
+        """Tüm raporlar için ortak sayfa düzeniyle PDF dokümanını oluşturur"""
+        return SimpleDocTemplate(
+            filepath,
+            pagesize=A4,
+            rightMargin=72,
+            leftMargin=72,
+            topMargin=72,
+            bottomMargin=72
+        )
+    
+    @staticmethod
+    def _source_key(kind: str, *payload: Any) -> str:
+        """Aynı girdinin aynı PDF'i vermesi için rapor türü ve verinin anahtarı"""
+        canonical = json.dumps([kind, *payload], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    
+    def _find_cached(self, source_key: str) -> Optional[str]:
+        filepath = self.store.find_by_source(source_key)
+        if filepath is not None:
+            logger.info(f"Aynı veriyle üretilmiş PDF yeniden kullanılıyor: {filepath}")
+        return filepath
     
     def generate_roadmap_pdf(self, 
                            roadmap_data: Dict[str, Any],
@@ -104,6 +257,11 @@ class PDFGenerator:
             Oluşturulan PDF dosyasının yolu
         """
         try:
+            source_key = self._source_key("roadmap", roadmap_data, user_info)
+            cached = self._find_cached(source_key)
+            if cached is not None:
+                return cached
+            
             logger.info(f"Roadmap PDF oluşturuluyor: {roadmap_data.get('title', 'Unknown')}")
             
             # PDF dosya adını oluştur
@@ -113,31 +271,18 @@ class PDFGenerator:
             filepath = os.path.join(self.output_directory, filename)
             
             # PDF dokümanını oluştur
-            doc = SimpleDocTemplate(
-                filepath,
-                pagesize=A4,
-                rightMargin=72,
-                leftMargin=72,
-                topMargin=72,
-                bottomMargin=72
-            )
-            
-            # PDF içeriğini oluştur
-            story = []
-            
-            # Başlık sayfası
-            story.extend(self._create_title_page(roadmap_data, user_info))
-            story.append(PageBreak())
+            doc = self._create_document(filepath)
             
-            # İçindekiler
-            story.extend(self._create_table_of_contents(roadmap_data))
-            story.append(PageBreak())
-            
-            # Roadmap içeriği
-            story.extend(self._create_roadmap_content(roadmap_data))
+            # PDF içeriği modül modül üretilir; build sırasında tüketildikçe oluşturulur
+            story = LazyStory(chain(
+                [self._create_title_page(roadmap_data, user_info) + [PageBreak()]],
+                [self._create_table_of_contents(roadmap_data) + [PageBreak()]],
+                self._iter_roadmap_content(roadmap_data)
+            ))
             
             # PDF'i oluştur
             doc.build(story)
+            self.store.register(filepath, source_key=source_key)
             
             logger.info(f"PDF başarıyla oluşturuldu: {filepath}")
             return filepath
@@ -197,54 +342,63 @@ class PDFGenerator:
         story.append(Paragraph("İçindekiler", self.styles['CustomTitle']))
         story.append(Spacer(1, 30))
         
+        # Başlıklar içerikle aynı numaralandırmayı kullanır ve modül çapasına bağlanır
         modules = roadmap_data.get('modules', [])
         for i, module in enumerate(modules, 1):
             module_title = module.get('title', f'Modül {i}')
-            story.append(Paragraph(f"{i}. {module_title}", self.styles['CustomBody']))
+            story.append(Paragraph(f'<a href="#module_{i}">{i}. {module_title}</a>', self.styles['CustomBody']))
         
         return story
     
     def _create_roadmap_content(self, roadmap_data: Dict[str, Any]) -> List:
         """Roadmap içeriğini oluşturur"""
-        story = []
-        
+        return list(chain.from_iterable(self._iter_roadmap_content(roadmap_data)))
+    
+    def _iter_roadmap_content(self, roadmap_data: Dict[str, Any]) -> Iterator[List]:
+        """Roadmap içeriğini modül başına bir flowable listesi olarak üretir"""
         modules = roadmap_data.get('modules', [])
         
         for i, module in enumerate(modules, 1):
-            # Modül başlığı
-            module_title = module.get('title', f'Modül {i}')
-            story.append(Paragraph(f"{i}. {module_title}", self.styles['ModuleTitle']))
-            
-            # Modül açıklaması
-            module_description = module.get('description', '')
-            if module_description:
-                story.append(Paragraph(module_description, self.styles['CustomBody']))
-                story.append(Spacer(1, 10))
-            
-            # Modül kaynakları
-            resources = module.get('resources', [])
-            if resources:
-                story.append(Paragraph("Kaynaklar:", self.styles['CustomHeading2']))
-                for resource in resources:
-                    story.append(Paragraph(f"• {resource}", self.styles['ResourceStyle']))
-                story.append(Spacer(1, 10))
-            
-            # Modül görevleri
-            tasks = module.get('tasks', [])
-            if tasks:
-                story.append(Paragraph("Görevler:", self.styles['CustomHeading2']))
-                for task in tasks:
-                    story.append(Paragraph(f"• {task}", self.styles['CustomBody']))
-                story.append(Spacer(1, 10))
-            
-            # Modül notları
-            notes = module.get('notes', '')
-            if notes:
-                story.append(Paragraph("Notlar:", self.styles['CustomHeading2']))
-                story.append(Paragraph(notes, self.styles['CustomBody']))
-                story.append(Spacer(1, 10))
-            
-            story.append(Spacer(1, 20))
+            yield self._create_module_content(i, module)
+    
+    def _create_module_content(self, index: int, module: Dict[str, Any]) -> List:
+        """Tek bir modülün flowable'larını oluşturur"""
+        story = []
+        
+        # Modül başlığı
+        module_title = module.get('title', f'Modül {index}')
+        story.append(Paragraph(f'<a name="module_{index}"/>{index}. {module_title}', self.styles['ModuleTitle']))
+        
+        # Modül açıklaması
+        module_description = module.get('description', '')
+        if module_description:
+            story.append(Paragraph(module_description, self.styles['CustomBody']))
+            story.append(Spacer(1, 10))
+        
+        # Modül kaynakları
+        resources = module.get('resources', [])
+        if resources:
+            story.append(Paragraph("Kaynaklar:", self.styles['CustomHeading2']))
+            for resource in resources:
+                story.append(Paragraph(f"• {resource}", self.styles['ResourceStyle']))
+            story.append(Spacer(1, 10))
+        
+        # Modül görevleri
+        tasks = module.get('tasks', [])
+        if tasks:
+            story.append(Paragraph("Görevler:", self.styles['CustomHeading2']))
+            for task in tasks:
+                story.append(Paragraph(f"• {task}", self.styles['CustomBody']))
+            story.append(Spacer(1, 10))
+        
+        # Modül notları
+        notes = module.get('notes', '')
+        if notes:
+            story.append(Paragraph("Notlar:", self.styles['CustomHeading2']))
+            story.append(Paragraph(notes, self.styles['CustomBody']))
+            story.append(Spacer(1, 10))
+        
+        story.append(Spacer(1, 20))
         
         return story
     
@@ -262,6 +416,11 @@ class PDFGenerator:
             Oluşturulan PDF dosyasının yolu
         """
         try:
+            source_key = self._source_key("progress_report", progress_data, user_info)
+            cached = self._find_cached(source_key)
+            if cached is not None:
+                return cached
+            
             logger.info("İlerleme raporu PDF oluşturuluyor")
             
             # PDF dosya adını oluştur
@@ -270,14 +429,7 @@ class PDFGenerator:
             filepath = os.path.join(self.output_directory, filename)
             
             # PDF dokümanını oluştur
-            doc = SimpleDocTemplate(
-                filepath,
-                pagesize=A4,
-                rightMargin=72,
-                leftMargin=72,
-                topMargin=72,
-                bottomMargin=72
-            )
+            doc = self._create_document(filepath)
             
             story = []
             
@@ -297,16 +449,7 @@ class PDFGenerator:
             ]
             
             stats_table = Table(stats_data, colWidths=[200, 100])
-            stats_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
+            stats_table.setStyle(self.stats_table_style)
             
             story.append(stats_table)
             story.append(Spacer(1, 20))
@@ -329,6 +472,7 @@ class PDFGenerator:
             
             # PDF'i oluştur
             doc.build(story)
+            self.store.register(filepath, source_key=source_key)
             
             logger.info(f"İlerleme raporu PDF oluşturuldu: {filepath}")
             return filepath
@@ -351,6 +495,11 @@ class PDFGenerator:
             Oluşturulan PDF dosyasının yolu
         """
         try:
+            source_key = self._source_key("learning_summary", summary_data, user_info)
+            cached = self._find_cached(source_key)
+            if cached is not None:
+                return cached
+            
             logger.info("Öğrenme özeti PDF oluşturuluyor")
             
             # PDF dosya adını oluştur
@@ -359,14 +508,7 @@ class PDFGenerator:
             filepath = os.path.join(self.output_directory, filename)
             
             # PDF dokümanını oluştur
-            doc = SimpleDocTemplate(
-                filepath,
-                pagesize=A4,
-                rightMargin=72,
-                leftMargin=72,
-                topMargin=72,
-                bottomMargin=72
-            )
+            doc = self._create_document(filepath)
             
             story = []
             
@@ -400,6 +542,7 @@ class PDFGenerator:
             
             # PDF'i oluştur
             doc.build(story)
+            self.store.register(filepath, source_key=source_key)
             
             logger.info(f"Öğrenme özeti PDF oluşturuldu: {filepath}")
             return filepath
@@ -409,40 +552,31 @@ class PDFGenerator:
             raise
     
     def cleanup_old_pdfs(self, days_to_keep: int = 7):
-        """Eski PDF dosyalarını temizler"""
+        """Belirtilen günden uzun süredir erişilmeyen PDF dosyalarını temizler"""
         try:
-            import time
-            current_time = time.time()
-            cutoff_time = current_time - (days_to_keep * 24 * 60 * 60)
-            
-            deleted_count = 0
-            for filename in os.listdir(self.output_directory):
-                if filename.endswith('.pdf'):
-                    filepath = os.path.join(self.output_directory, filename)
-                    if os.path.getmtime(filepath) < cutoff_time:
-                        os.remove(filepath)
-                        deleted_count += 1
-            
+            deleted_count = self.store.evict_older_than(days_to_keep * 24 * 60 * 60)
             logger.info(f"{deleted_count} eski PDF dosyası silindi")
+            return deleted_count
             
         except Exception as e:
             logger.error(f"PDF temizleme hatası: {e}")
+            return 0
+    
+    def open_pdf(self, filename: str) -> Optional[str]:
+        """İndirilecek PDF'in yolunu döndürür ve erişim zamanını günceller (yoksa None)"""
+        filename = os.path.basename(filename)
+        if self.store.touch(filename) is None:
+            return None
+        filepath = os.path.join(self.output_directory, filename)
+        return filepath if os.path.exists(filepath) else None
     
     def get_pdf_info(self, filepath: str) -> Dict[str, Any]:
         """PDF dosyası hakkında bilgi döndürür"""
         try:
-            if not os.path.exists(filepath):
+            if self.store.touch(filepath) is None:
                 return {"error": "Dosya bulunamadı"}
             
-            file_stats = os.stat(filepath)
-            return {
-                "filename": os.path.basename(filepath),
-                "filepath": filepath,
-                "size_bytes": file_stats.st_size,
-                "size_mb": round(file_stats.st_size / (1024 * 1024), 2),
-                "created_time": datetime.fromtimestamp(file_stats.st_ctime).strftime('%Y-%m-%d %H:%M:%S'),
-                "modified_time": datetime.fromtimestamp(file_stats.st_mtime).strftime('%Y-%m-%d %H:%M:%S')
-            }
+            return self.store.get_info(filepath)
             
         except Exception as e:
             logger.error(f"PDF bilgi alma hatası: {e}")
@@ -0,0 +1,297 @@
+"""
+PDF Artifact Store - Oluşturulan PDF dosyaları için boyut sınırlı, LRU indeksli depo
+"""
+
+import os
+import time
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Dict, Any, Optional, List
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PDFArtifact:
+    """İndeksteki tek bir PDF dosyasının kaydı"""
+    filename: str
+    size_bytes: int
+    content_hash: str
+    created_at: float
+    modified_at: float
+    last_access: float
+    source_key: str = ""
+
+
+class PDFArtifactStore:
+    """
+    PDF dosyalarını bellek içi bir LRU indeksi ile yönetir.
+
+    İndeks son erişim sırasına göre tutulur (en eski başta); toplam boyut
+    bütçeyi aştığında en eski dosyalar O(1) maliyetle silinir. Dosya sistemi
+    yalnızca `reconcile_interval_seconds` aralıklarla taranır.
+    """
+
+    def __init__(self,
+                 directory: str,
+                 max_total_bytes: int = 200 * 1024 * 1024,
+                 reconcile_interval_seconds: int = 300):
+        """
+        Args:
+            directory: PDF dosyalarının bulunduğu dizin
+            max_total_bytes: Depo için toplam bayt bütçesi
+            reconcile_interval_seconds: Dosya sistemiyle eşitleme aralığı
+        """
+        self.directory = directory
+        self.max_total_bytes = max_total_bytes
+        self.reconcile_interval_seconds = reconcile_interval_seconds
+
+        self._index: "OrderedDict[str, PDFArtifact]" = OrderedDict()
+        # Kaynak veri anahtarı -> dosya adı (aynı girdiyle yeniden üretimi önlemek için)
+        self._by_source: Dict[str, str] = {}
+        self._total_bytes = 0
+        self._last_reconcile = 0.0
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        self.reconcile()
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, filepath: str) -> bool:
+        return os.path.basename(filepath) in self._index
+
+    def register(self, filepath: str, source_key: str = "") -> PDFArtifact:
+        """
+        Yeni yazılan bir dosyayı indekse ekler ve bütçe aşılırsa LRU tahliyesi yapar.
+
+        `source_key` verilirse dosya `find_by_source` ile aynı girdi için yeniden kullanılabilir.
+        """
+        self._maybe_reconcile()
+
+        filename = os.path.basename(filepath)
+        path = self._path(filename)
+        file_stats = os.stat(path)
+        now = time.time()
+        artifact = PDFArtifact(
+            filename=filename,
+            size_bytes=file_stats.st_size,
+            content_hash=self._hash_file(path),
+            created_at=now,
+            modified_at=file_stats.st_mtime,
+            last_access=now,
+            source_key=source_key
+        )
+
+        with self._lock:
+            self._drop(filename)
+            self._index[filename] = artifact
+            if source_key:
+                self._by_source[source_key] = filename
+            self._total_bytes += artifact.size_bytes
+            self._evict_over_budget(keep=filename)
+
+        return artifact
+
+    def touch(self, filepath: str) -> Optional[PDFArtifact]:
+        """Dosyanın son erişim zamanını günceller"""
+        filename = os.path.basename(filepath)
+        with self._lock:
+            artifact = self._index.get(filename)
+            if artifact is None:
+                return None
+            artifact.last_access = time.time()
+            self._index.move_to_end(filename)
+            return artifact
+
+    def find_by_source(self, source_key: str) -> Optional[str]:
+        """Aynı kaynak veriden üretilmiş dosyanın yolunu döndürür ve erişim zamanını günceller"""
+        self._maybe_reconcile()
+        with self._lock:
+            filename = self._by_source.get(source_key)
+            if filename is None:
+                return None
+            artifact = self._index.get(filename)
+            if artifact is None or not os.path.exists(self._path(filename)):
+                # Dosya dışarıdan silinmiş: kaydı bırak, çağıran yeniden üretir
+                if artifact is not None:
+                    self._drop(filename)
+                self._by_source.pop(source_key, None)
+                return None
+            artifact.last_access = time.time()
+            self._index.move_to_end(filename)
+            return self._path(filename)
+
+    def get(self, filepath: str) -> Optional[PDFArtifact]:
+        """İndeksteki kaydı döndürür (dosya sistemine dokunmaz)"""
+        self._maybe_reconcile()
+        with self._lock:
+            return self._index.get(os.path.basename(filepath))
+
+    def get_info(self, filepath: str) -> Optional[Dict[str, Any]]:
+        """Dosya bilgilerini indeksten döndürür"""
+        artifact = self.get(filepath)
+        if artifact is None:
+            return None
+
+        info = asdict(artifact)
+        info.update({
+            "filepath": self._path(artifact.filename),
+            "size_mb": round(artifact.size_bytes / (1024 * 1024), 2),
+            "created_time": datetime.fromtimestamp(artifact.created_at).strftime('%Y-%m-%d %H:%M:%S'),
+            "modified_time": datetime.fromtimestamp(artifact.modified_at).strftime('%Y-%m-%d %H:%M:%S'),
+            "last_access_time": datetime.fromtimestamp(artifact.last_access).strftime('%Y-%m-%d %H:%M:%S')
+        })
+        return info
+
+    def remove(self, filepath: str) -> bool:
+        """Dosyayı indeksten ve diskten siler"""
+        filename = os.path.basename(filepath)
+        with self._lock:
+            if filename not in self._index:
+                return False
+            self._delete(filename)
+            return True
+
+    def evict_older_than(self, max_age_seconds: float) -> int:
+        """
+        Belirtilen süreden uzun zamandır erişilmeyen dosyaları siler.
+
+        İndeks erişim sırasına göre tutulduğu için yalnızca silinecek
+        dosyalar gezilir.
+        """
+        self._maybe_reconcile()
+        cutoff = time.time() - max_age_seconds
+        deleted = 0
+        with self._lock:
+            while self._index:
+                filename, artifact = next(iter(self._index.items()))
+                if artifact.last_access >= cutoff:
+                    break
+                self._delete(filename)
+                deleted += 1
+        return deleted
+
+    def reconcile(self) -> Dict[str, int]:
+        """
+        İndeksi dosya sistemiyle eşitler: diskte olup indekste olmayan dosyaları
+        ekler, diskten silinmiş dosyaları indeksten çıkarır.
+        """
+        added = 0
+        removed = 0
+
+        try:
+            on_disk = {}
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.name.endswith('.pdf'):
+                        on_disk[entry.name] = entry.stat()
+        except FileNotFoundError:
+            os.makedirs(self.directory, exist_ok=True)
+            on_disk = {}
+
+        with self._lock:
+            for filename in [name for name in self._index if name not in on_disk]:
+                self._drop(filename)
+                removed += 1
+
+            # Bilinmeyen dosyalar LRU tarafına eklenir; en eski dosya en başta kalır
+            unknown = sorted(
+                (name for name in on_disk if name not in self._index),
+                key=lambda name: on_disk[name].st_mtime,
+                reverse=True
+            )
+            for filename in unknown:
+                file_stats = on_disk[filename]
+                artifact = PDFArtifact(
+                    filename=filename,
+                    size_bytes=file_stats.st_size,
+                    content_hash="",
+                    created_at=file_stats.st_mtime,
+                    modified_at=file_stats.st_mtime,
+                    last_access=file_stats.st_mtime
+                )
+                self._index[filename] = artifact
+                self._index.move_to_end(filename, last=False)
+                self._total_bytes += artifact.size_bytes
+                added += 1
+
+            self._evict_over_budget()
+            self._last_reconcile = time.time()
+
+        if added or removed:
+            logger.info(f"PDF deposu eşitlendi: {added} eklendi, {removed} çıkarıldı")
+
+        return {"added": added, "removed": removed, "total_files": len(self._index)}
+
+    def list_artifacts(self) -> List[Dict[str, Any]]:
+        """İndeksteki dosyaları en son erişilenden başlayarak listeler"""
+        with self._lock:
+            return [asdict(artifact) for artifact in reversed(self._index.values())]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Depo istatistiklerini döndürür"""
+        with self._lock:
+            return {
+                "directory": self.directory,
+                "total_files": len(self._index),
+                "total_bytes": self._total_bytes,
+                "max_total_bytes": self.max_total_bytes,
+                "usage_ratio": round(self._total_bytes / self.max_total_bytes, 4) if self.max_total_bytes else 0
+            }
+
+    def _maybe_reconcile(self):
+        if time.time() - self._last_reconcile >= self.reconcile_interval_seconds:
+            self.reconcile()
+
+    def _evict_over_budget(self, keep: Optional[str] = None):
+        """Toplam boyut bütçenin altına inene kadar en eski dosyaları siler (kilit tutulurken çağrılır)"""
+        while self._total_bytes > self.max_total_bytes and self._index:
+            filename = next(iter(self._index))
+            if filename == keep:
+                # Bütçeden büyük tek dosya: yeni yazılan dosya korunur
+                break
+            self._delete(filename)
+
+    def _delete(self, filename: str):
+        """Kaydı indeksten çıkarır ve dosyayı siler (kilit tutulurken çağrılır)"""
+        artifact = self._index.pop(filename)
+        self._total_bytes -= artifact.size_bytes
+        self._forget_source(artifact)
+        try:
+            os.remove(self._path(filename))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.error(f"PDF silme hatası ({filename}): {e}")
+
+    def _drop(self, filename: str):
+        """Kaydı dosyayı silmeden indeksten çıkarır (kilit tutulurken çağrılır)"""
+        artifact = self._index.pop(filename, None)
+        if artifact is not None:
+            self._total_bytes -= artifact.size_bytes
+            self._forget_source(artifact)
+
+    def _forget_source(self, artifact: PDFArtifact):
+        if artifact.source_key and self._by_source.get(artifact.source_key) == artifact.filename:
+            del self._by_source[artifact.source_key]
+
+    def _path(self, filename: str) -> str:
+        return os.path.join(self.directory, filename)
+
+    @staticmethod
+    def _hash_file(path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(64 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
@@ -0,0 +1,217 @@
+import csv
+import io
+import json
+from datetime import datetime, date, timedelta
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from typing import Optional, Iterator, Dict, Any
+from models.progress import QuizAnswerKey, QuizBulkGradeRequest
+from services.progress_service import progress_service
+from services.progress_store import EXPORT_FIELDS
+from config import ADMIN_USERS, QUIZ_BULK_MAX_SUBMISSIONS
+from utils.auth import verify_token
+
+router = APIRouter(prefix="/api/v1/admin", tags=["Admin"])
+security = HTTPBearer()
+# Analiz, arşivleme ve toplu puanlama engelleyici çağrılardır; uç noktalar iş parçacığı havuzunda çalışır
+
+def _verify_admin(credentials: HTTPAuthorizationCredentials) -> str:
+    """Token'ı doğrula ve kullanıcının yönetici listesinde olduğunu kontrol et"""
+    payload = verify_token(credentials.credentials)
+    if payload is None:
+        raise HTTPException(status_code=401, detail="Geçersiz token")
+
+    user_id = payload.get("sub")
+    if user_id not in ADMIN_USERS:
+        raise HTTPException(status_code=403, detail="Bu işlem için yönetici yetkisi gerekli")
+
+    return user_id
+
+def _export_bound(value: Optional[str], name: str, end: bool = False) -> Optional[str]:
+    """
+    Tarih filtresini depolanan ISO biçimine çevir.
+    
+    Yalnızca tarih verilmiş bir bitiş sınırı o günün tamamını kapsar.
+    """
+    if not value:
+        return None
+    try:
+        if len(value) == 10:
+            day = date.fromisoformat(value)
+            return (day + timedelta(days=1) if end else day).isoformat() + "T00:00:00"
+        moment = datetime.fromisoformat(value)
+        if moment.tzinfo is not None:
+            # Kayıtlar sunucunun yerel saatinde tutulur
+            moment = moment.astimezone().replace(tzinfo=None)
+        return moment.isoformat()
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{name} ISO tarih biçiminde olmalıdır (YYYY-MM-DD)")
+
+def _ndjson_chunks(records: Iterator[Dict[str, Any]], batch_size: int = 500) -> Iterator[str]:
+    """Kayıtları satır satır JSON olarak, parça başına `batch_size` satır ile üret"""
+    lines = []
+    for record in records:
+        lines.append(json.dumps(record, ensure_ascii=False))
+        if len(lines) >= batch_size:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+def _csv_chunks(records: Iterator[Dict[str, Any]], batch_size: int = 500) -> Iterator[str]:
+    """Kayıtları başlık satırıyla birlikte CSV olarak parça parça üret"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    rows = 0
+    for record in records:
+        writer.writerow([record[field] for field in EXPORT_FIELDS])
+        rows += 1
+        if rows >= batch_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            rows = 0
+    yield buffer.getvalue()
+
+@router.get("/progress/analytics")
+def get_progress_analytics(
+    roadmap_id: Optional[str] = None,
+    inactive_days: int = 14,
+    limit: int = 50,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """Tüm kullanıcılar üzerinden tamamlanma dağılımı, modül süreleri ve terk noktaları"""
+
+    _verify_admin(credentials)
+
+    if inactive_days < 1 or inactive_days > 365:
+        raise HTTPException(status_code=400, detail="Hareketsizlik süresi 1-365 gün arasında olmalıdır")
+
+    if limit < 1 or limit > 500:
+        raise HTTPException(status_code=400, detail="Limit 1-500 arasında olmalıdır")
+
+    analytics = progress_service.get_progress_analytics(roadmap_id, inactive_days=inactive_days, limit=limit)
+
+    return JSONResponse(content=analytics)
+
+@router.get("/progress/export")
+def export_progress(
+    format: str = "ndjson",
+    roadmap_id: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """Tüm modül ilerleme kayıtlarını NDJSON veya CSV olarak akıt"""
+
+    _verify_admin(credentials)
+
+    if format not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="Biçim ndjson veya csv olmalıdır")
+
+    since_bound = _export_bound(since, "since")
+    until_bound = _export_bound(until, "until", end=True)
+
+    records = progress_service.export_progress_records(roadmap_id, since_bound, until_bound)
+    # Eşzamanlı üreteç; Starlette her parçayı iş parçacığı havuzunda üretir
+    chunks = _csv_chunks(records) if format == "csv" else _ndjson_chunks(records)
+    media_type = "text/csv; charset=utf-8" if format == "csv" else "application/x-ndjson"
+
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="progress_export.{format}"'}
+    )
+
+@router.post("/progress/archive")
+def archive_inactive_progress(
+    max_idle_days: Optional[int] = None,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """Uzun süredir etkin olmayan roadmap ilerlemelerini hemen soğuk arşive taşı"""
+
+    _verify_admin(credentials)
+
+    if max_idle_days is not None and (max_idle_days < 1 or max_idle_days > 3650):
+        raise HTTPException(status_code=400, detail="Hareketsizlik süresi 1-3650 gün arasında olmalıdır")
+
+    try:
+        result = progress_service.archive_inactive_roadmaps(max_idle_days)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return JSONResponse(content=result)
+
+@router.put("/quizzes/{quiz_id}/key")
+def set_quiz_answer_key(
+    quiz_id: str,
+    answer_key: QuizAnswerKey,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """Quiz cevap anahtarını kaydet (puanlama tabloları bir kez derlenir)"""
+
+    _verify_admin(credentials)
+
+    if answer_key.quiz_id != quiz_id:
+        raise HTTPException(status_code=400, detail="Quiz kimliği adres ile eşleşmiyor")
+
+    try:
+        compiled = progress_service.quiz_engine.set_key(answer_key)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "message": "Cevap anahtarı kaydedildi",
+        "quiz_id": quiz_id,
+        "total_questions": len(compiled),
+        "total_points": compiled.total_points
+    }
+
+@router.delete("/quizzes/{quiz_id}/key")
+def delete_quiz_answer_key(
+    quiz_id: str,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """Quiz cevap anahtarını sil"""
+
+    _verify_admin(credentials)
+
+    if not progress_service.quiz_engine.remove_key(quiz_id):
+        raise HTTPException(status_code=404, detail="Bu quiz için cevap anahtarı bulunamadı")
+
+    return {"message": "Cevap anahtarı silindi", "quiz_id": quiz_id}
+
+@router.post("/quizzes/{quiz_id}/grade")
+def grade_quiz_bulk(
+    quiz_id: str,
+    request: QuizBulkGradeRequest,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """Toplu sınav gönderimlerini tek seferde puanla"""
+
+    _verify_admin(credentials)
+
+    if not request.submissions:
+        raise HTTPException(status_code=400, detail="Gönderim listesi boş olamaz")
+
+    if len(request.submissions) > QUIZ_BULK_MAX_SUBMISSIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Tek istekte en fazla {QUIZ_BULK_MAX_SUBMISSIONS} gönderim puanlanabilir"
+        )
+
+    for index, submission in enumerate(request.submissions):
+        if submission.time_taken_minutes < 0:
+            raise HTTPException(status_code=400, detail=f"{index}. gönderim: Geçen süre negatif olamaz")
+
+    try:
+        result = progress_service.grade_quiz_bulk(quiz_id, request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if result is None:
+        raise HTTPException(status_code=404, detail="Bu quiz için cevap anahtarı bulunamadı")
+
+    return JSONResponse(content=result)
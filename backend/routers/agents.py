@@ -3,6 +3,8 @@ Agent Router - REST API endpoints for agent management and task execution
 Provides interface for interacting with learning agents
 """
 
+import asyncio
+
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import List, Dict, Any, Optional
@@ -98,6 +100,9 @@ async def execute_task(
 ):
     """
     Execute a task using the appropriate agent
+    
+    create_roadmap answers within the configured deadline; a late AI result can be
+    fetched from /jobs/{upgrade_job_id}
     """
     # Token doğrulama
     payload = verify_token(credentials.credentials)
@@ -105,7 +110,8 @@ async def execute_task(
         raise HTTPException(status_code=401, detail="Geçersiz token")
     
     try:
-        result = await agent_manager.execute_task(task)
+        # Slow create_roadmap runs are answered with a template at the deadline
+        result = await agent_manager.execute_task_with_deadline(task, user_id=payload.get("sub"))
         
         if result.get("success"):
             return {
@@ -121,6 +127,67 @@ async def execute_task(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Task execution error: {str(e)}")
 
+@router.post("/jobs")
+async def submit_job(
+    task: Dict[str, Any],
+    priority: str = "batch",
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """
+    Queue a task for the agent worker pool and return its job id immediately
+    """
+    # Token doğrulama
+    payload = verify_token(credentials.credentials)
+    if payload is None:
+        raise HTTPException(status_code=401, detail="Geçersiz token")
+    
+    if priority not in ("interactive", "batch"):
+        raise HTTPException(status_code=400, detail="Priority must be 'interactive' or 'batch'")
+    
+    if not task.get("type"):
+        raise HTTPException(status_code=400, detail="Task type is required")
+    
+    job = await agent_manager.submit_task(task, priority=priority, user_id=payload.get("sub"))
+    
+    return {
+        "success": True,
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "priority": job["priority"],
+        "timestamp": datetime.now().isoformat()
+    }
+
+@router.get("/jobs/{job_id}")
+async def get_job(
+    job_id: str,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """
+    Get the status and (when finished) the result of a queued task
+    """
+    # Token doğrulama
+    payload = verify_token(credentials.credentials)
+    if payload is None:
+        raise HTTPException(status_code=401, detail="Geçersiz token")
+    
+    job = await asyncio.to_thread(agent_manager.get_job, job_id)
+    # Jobs are only visible to the user who submitted them
+    if job is None or job["user_id"] != payload.get("sub"):
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "priority": job["priority"],
+        "task_type": job["task"].get("type"),
+        "attempts": job["attempts"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+        "result": job["result"],
+        "error": job["error"]
+    }
+
 @router.post("/langchain/create-roadmap")
 async def create_roadmap_with_langchain(
     user_info: Dict[str, Any],
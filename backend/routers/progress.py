@@ -1,15 +1,23 @@
-from fastapi import APIRouter, HTTPException, Depends
+import asyncio
+from fastapi import APIRouter, HTTPException, Depends, Request, Header
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from typing import List, Dict
+from typing import List, Dict, Optional
 from models.progress import ProgressUpdate, QuizSubmission, ProgressStatus
-from services.progress_service import progress_service
+from services.progress_service import progress_service, QUIZ_PASSING_SCORE
+from services.progress_events import format_sse
+from config import PROGRESS_BATCH_MAX_UPDATES, PROGRESS_STREAM_HEARTBEAT_SECONDS
 from utils.auth import verify_token
 
 router = APIRouter(prefix="/api/v1/progress", tags=["Progress"])
 security = HTTPBearer()
+# EventSource özel başlık gönderemediği için akış uç noktasında token sorgu parametresiyle de kabul edilir
+optional_security = HTTPBearer(auto_error=False)
+# Servis çağrıları engelleyicidir (kullanıcı kilitleri, dosya kilidi, disk G/Ç); bu yüzden
+# uç noktalar düz `def` tanımlanır ve FastAPI onları iş parçacığı havuzunda çalıştırır
 
 @router.get("/roadmap/{roadmap_id}")
-async def get_roadmap_progress(
+def get_roadmap_progress(
     roadmap_id: str,
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
@@ -22,14 +30,15 @@ async def get_roadmap_progress(
     
     user_id = payload.get("sub")
     
-    progress = progress_service.get_roadmap_progress(user_id, roadmap_id)
+    progress = progress_service.get_roadmap_progress_data(user_id, roadmap_id)
     if not progress:
         raise HTTPException(status_code=404, detail="Roadmap ilerlemesi bulunamadı")
     
-    return progress
+    # Kayıtlar yalnızca JSON türleri içerir; jsonable_encoder dolaşımına gerek yok
+    return JSONResponse(content=progress)
 
 @router.post("/roadmap/{roadmap_id}/module")
-async def update_module_progress(
+def update_module_progress(
     roadmap_id: str,
     update: ProgressUpdate,
     credentials: HTTPAuthorizationCredentials = Depends(security)
@@ -58,8 +67,46 @@ async def update_module_progress(
         "module_progress": module_progress
     }
 
+@router.post("/roadmap/{roadmap_id}/modules:batch")
+def update_modules_batch(
+    roadmap_id: str,
+    updates: List[ProgressUpdate],
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """Birden fazla modül ilerlemesini tek istekte güncelle (çevrimdışı senkronizasyon, içe aktarma)"""
+    
+    # Token doğrulama
+    payload = verify_token(credentials.credentials)
+    if payload is None:
+        raise HTTPException(status_code=401, detail="Geçersiz token")
+    
+    user_id = payload.get("sub")
+    
+    if not updates:
+        raise HTTPException(status_code=400, detail="Güncelleme listesi boş olamaz")
+    
+    if len(updates) > PROGRESS_BATCH_MAX_UPDATES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Tek istekte en fazla {PROGRESS_BATCH_MAX_UPDATES} güncelleme gönderilebilir"
+        )
+    
+    for index, update in enumerate(updates):
+        if update.progress_percentage < 0 or update.progress_percentage > 100:
+            raise HTTPException(status_code=400, detail=f"{index}. güncelleme: İlerleme yüzdesi 0-100 arasında olmalıdır")
+        if update.time_spent_minutes < 0:
+            raise HTTPException(status_code=400, detail=f"{index}. güncelleme: Geçen süre negatif olamaz")
+    
+    module_progresses = progress_service.update_modules_batch(user_id, roadmap_id, updates)
+    
+    return {
+        "message": "Modül ilerlemeleri güncellendi",
+        "applied_updates": len(updates),
+        "module_progress": module_progresses
+    }
+
 @router.post("/roadmap/{roadmap_id}/quiz")
-async def submit_quiz(
+def submit_quiz(
     roadmap_id: str,
     submission: QuizSubmission,
     credentials: HTTPAuthorizationCredentials = Depends(security)
@@ -80,16 +127,21 @@ async def submit_quiz(
     if submission.time_taken_minutes < 0:
         raise HTTPException(status_code=400, detail="Geçen süre negatif olamaz")
     
-    quiz_result = progress_service.submit_quiz_result(user_id, roadmap_id, submission)
+    try:
+        quiz_result = progress_service.submit_quiz_result(user_id, roadmap_id, submission)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     return {
         "message": "Quiz sonucu kaydedildi",
         "quiz_result": quiz_result,
-        "passed": quiz_result.score >= 80
+        "passed": quiz_result.score >= QUIZ_PASSING_SCORE,
+        # False: cevap anahtarı yok, istemcinin puanı kullanıldı
+        "graded": progress_service.has_quiz_key(submission.quiz_id)
     }
 
 @router.get("/summary")
-async def get_user_progress_summary(
+def get_user_progress_summary(
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
     """Kullanıcının genel ilerleme özetini getir"""
@@ -103,11 +155,58 @@ async def get_user_progress_summary(
     
     summary = progress_service.get_user_progress_summary(user_id)
     
-    return summary
+    return JSONResponse(content=summary)
+
+@router.get("/stream")
+async def stream_progress(
+    request: Request,
+    token: Optional[str] = None,
+    last_event_id: Optional[str] = None,
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+):
+    """Kullanıcının ilerleme değişikliklerini Server-Sent Events olarak akıt"""
+    
+    # Token doğrulama (Authorization başlığı veya ?token=)
+    raw_token = credentials.credentials if credentials else token
+    payload = verify_token(raw_token) if raw_token else None
+    if payload is None:
+        raise HTTPException(status_code=401, detail="Geçersiz token")
+    
+    user_id = payload.get("sub")
+    subscription = progress_service.events.subscribe(user_id, last_event_id_header or last_event_id)
+    
+    async def event_stream():
+        try:
+            # İstemciye yeniden bağlanma aralığını bildir
+            yield f"retry: {PROGRESS_STREAM_HEARTBEAT_SECONDS * 1000}\n\n"
+            for event in subscription.backlog:
+                yield format_sse(event)
+            
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.queue.get(), timeout=PROGRESS_STREAM_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": heartbeat\n\n"
+                    continue
+                yield format_sse(event)
+        finally:
+            progress_service.events.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @router.get("/roadmap/{roadmap_id}/weekly")
-async def get_weekly_progress(
+def get_weekly_progress(
     roadmap_id: str,
+    weeks: int = 4,
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
     """Haftalık ilerleme verilerini getir"""
@@ -119,15 +218,43 @@ async def get_weekly_progress(
     
     user_id = payload.get("sub")
     
-    weekly_data = progress_service.get_weekly_progress(user_id, roadmap_id)
+    if weeks < 1 or weeks > 52:
+        raise HTTPException(status_code=400, detail="Hafta sayısı 1-52 arasında olmalıdır")
+    
+    weekly_data = progress_service.get_weekly_progress(user_id, roadmap_id, weeks)
     
     return {
         "roadmap_id": roadmap_id,
         "weekly_progress": weekly_data
     }
 
+@router.get("/roadmap/{roadmap_id}/monthly")
+def get_monthly_progress(
+    roadmap_id: str,
+    months: int = 6,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """Aylık ilerleme verilerini getir"""
+    
+    # Token doğrulama
+    payload = verify_token(credentials.credentials)
+    if payload is None:
+        raise HTTPException(status_code=401, detail="Geçersiz token")
+    
+    user_id = payload.get("sub")
+    
+    if months < 1 or months > 24:
+        raise HTTPException(status_code=400, detail="Ay sayısı 1-24 arasında olmalıdır")
+    
+    monthly_data = progress_service.get_monthly_progress(user_id, roadmap_id, months)
+    
+    return {
+        "roadmap_id": roadmap_id,
+        "monthly_progress": monthly_data
+    }
+
 @router.post("/roadmap/{roadmap_id}/start")
-async def start_roadmap(
+def start_roadmap(
     roadmap_id: str,
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
@@ -152,7 +279,7 @@ async def start_roadmap(
     }
 
 @router.post("/roadmap/{roadmap_id}/module/{module_id}/complete")
-async def complete_module(
+def complete_module(
     roadmap_id: str,
     module_id: str,
     credentials: HTTPAuthorizationCredentials = Depends(security)
@@ -181,7 +308,7 @@ async def complete_module(
     }
 
 @router.get("/roadmap/{roadmap_id}/stats")
-async def get_roadmap_stats(
+def get_roadmap_stats(
     roadmap_id: str,
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
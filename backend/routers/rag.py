@@ -434,6 +434,25 @@ async def generate_learning_summary_pdf(
     except Exception as e:
         logger.error(f"Özet PDF oluşturma hatası: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/pdfs/{filename}")
+async def download_pdf(
+    filename: str,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """
+    Daha önce oluşturulmuş PDF'i indirme
+    """
+    pdf_path = pdf_generator.open_pdf(filename)
+    if pdf_path is None:
+        raise HTTPException(status_code=404, detail="PDF bulunamadı")
+    
+    return FileResponse(
+        path=pdf_path,
+        filename=os.path.basename(pdf_path),
+        media_type="application/pdf"
+    )
+
 @router.get("/stats")
 async def get_rag_stats(current_user: Dict[str, Any] = Depends(get_current_user)):
     """
@@ -480,10 +499,11 @@ async def cleanup_pdfs(
     Eski PDF dosyalarını temizleme
     """
     try:
-        pdf_generator.cleanup_old_pdfs(days_to_keep=days_to_keep)
+        deleted_count = pdf_generator.cleanup_old_pdfs(days_to_keep=days_to_keep)
         
         return {
             "success": True,
+            "deleted_count": deleted_count,
             "message": f"{days_to_keep} günden eski PDF dosyaları temizlendi"
         }
         
@@ -491,3 +511,18 @@ async def cleanup_pdfs(
         logger.error(f"PDF temizleme hatası: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/pdf-store/stats")
+async def get_pdf_store_stats(current_user: Dict[str, Any] = Depends(get_current_user)):
+    """
+    PDF deposu istatistiklerini alma
+    """
+    try:
+        return {
+            "success": True,
+            "stats": pdf_generator.store.get_stats()
+        }
+        
+    except Exception as e:
+        logger.error(f"PDF deposu istatistik hatası: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
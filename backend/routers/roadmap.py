@@ -9,6 +9,7 @@ from models.roadmap import Roadmap, RoadmapRequest, Module, LearningGoal, SkillA
 from utils.auth import verify_token
 from services.ai_service import ai_service
 from services.educational_content_service import educational_content_service
+from services.roadmap_cache import roadmap_cache, profile_key
 
 router = APIRouter(prefix="/api/v1/roadmap", tags=["Roadmap"])
 security = HTTPBearer()
@@ -22,6 +23,12 @@ def generate_ai_roadmap(interests: List[str], skill_level: str, learning_goals:
         print("Gemini API key ayarlanmamış, fallback roadmap döndürülüyor")
         return get_fallback_roadmap(interests, skill_level)
     
+    # Aynı (normalize edilmiş) profil için üretilmiş roadmap varsa AI çağrılmaz
+    cache_key = profile_key("roadmap_router", interests, skill_level, learning_goals)
+    cached = roadmap_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
     try:
         # AI ile roadmap oluştur
         prompt = f"""
@@ -75,6 +82,7 @@ def generate_ai_roadmap(interests: List[str], skill_level: str, learning_goals:
                 if "title" not in roadmap_data or "description" not in roadmap_data or "modules" not in roadmap_data:
                     print("JSON'da gerekli alanlar eksik, fallback kullanılıyor")
                     return get_fallback_roadmap(interests, skill_level)
+                roadmap_cache.put(cache_key, roadmap_data)
                 return roadmap_data
             except json.JSONDecodeError as e:
                 print(f"JSON parse error: {e}")
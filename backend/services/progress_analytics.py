@@ -0,0 +1,383 @@
+"""
+Progress Analytics - Tüm kullanıcıların modül ilerlemesini NumPy sütunlarında tutan kohort analizi
+"""
+
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, List, Tuple, Iterable
+
+import numpy as np
+
+from models.progress import ProgressStatus
+
+STATUS_CODES = {status.value: code for code, status in enumerate(ProgressStatus)}
+COMPLETED = STATUS_CODES[ProgressStatus.COMPLETED.value]
+NOT_STARTED = STATUS_CODES[ProgressStatus.NOT_STARTED.value]
+STALLED_STATUSES = (STATUS_CODES[ProgressStatus.IN_PROGRESS.value], STATUS_CODES[ProgressStatus.PAUSED.value])
+
+COMPLETION_BINS = np.arange(0, 101, 10)
+RATE_PERCENTILES = (25, 50, 75, 90)
+
+
+class _Interner:
+    """Metin değerlerini ardışık tamsayı kodlara çevirir"""
+
+    def __init__(self):
+        self.codes: Dict[Any, int] = {}
+        self.values: List[Any] = []
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def code(self, value) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def reset(self, values: List[Any]):
+        """Kodları verilen değer sırasıyla yeniden numaralar"""
+        self.values = list(values)
+        self.codes = {value: code for code, value in enumerate(self.values)}
+
+
+def _moment(value) -> np.datetime64:
+    """Depolanan ISO zaman damgasını saniye hassasiyetinde datetime64'e çevirir (boşsa NaT)"""
+    return np.datetime64(value or None, 's')
+
+
+class ProgressColumns:
+    """
+    Modül kayıtlarının sütunlu kopyası.
+
+    Her (roadmap anahtarı, modül) çifti bir satırdır; kullanıcı, roadmap
+    örneği ve (roadmap_id, module_id) grubu tamsayı kodlarla tutulur. Servis
+    her modül değişikliğinde satırı yerinde günceller; analiz sorguları
+    Python döngüsü yerine `bincount` ve sıralama ile vektörel hesaplanır.
+    Silinen satırlar boş listeye alınıp yeniden kullanılır. Roadmap örneği
+    kodlarının yarısından fazlası silinmiş satırlara ait olduğunda kod
+    sözlükleri canlı satırlardan yeniden numaralanır; böylece `bincount`
+    boyları süreç boyunca görülen değil, canlı satırları izler.
+
+    Sütunlar tek bir kilitle korunur; kilit yalnızca birkaç hücrelik satır
+    güncellemesi ve analizdeki dizi kopyası süresince tutulur, hesaplama kilit
+    dışında yapılır. Bu süreç genelinde kalan tek ortak kilittir ve yazma
+    yolunda sabit, kısa bir bekleme ekler.
+    """
+
+    COLUMNS = (
+        ("user", np.int32),
+        ("instance", np.int32),
+        ("roadmap", np.int32),
+        ("group", np.int32),
+        ("status", np.int8),
+        ("progress", np.int16),
+        ("minutes", np.int32),
+        ("started_at", "datetime64[s]"),
+        ("completed_at", "datetime64[s]"),
+        ("last_activity", "datetime64[s]"),
+        ("valid", np.bool_),
+    )
+
+    # Bu sayının altındaki kod sözlükleri sıkıştırılmaz
+    COMPACT_MIN_CODES = 1024
+
+    def __init__(self, capacity: int = 1024):
+        self._lock = threading.Lock()
+        self._users = _Interner()
+        self._instances = _Interner()
+        self._roadmaps = _Interner()
+        # (roadmap_id, module_id) çiftleri; süre ve terk analizi bu gruplar üzerinden yapılır
+        self._groups = _Interner()
+
+        # roadmap anahtarı -> module_id -> satır
+        self._rows: Dict[str, Dict[str, int]] = {}
+        self._free: List[int] = []
+        self._size = 0
+        self._count = 0
+        self._columns: Dict[str, np.ndarray] = {
+            name: np.zeros(capacity, dtype=dtype) for name, dtype in self.COLUMNS
+        }
+
+    def __len__(self) -> int:
+        return self._count
+
+    def upsert(self, roadmap_key: str, module_progress: Dict):
+        """Tek bir modül kaydının satırını ekler veya günceller"""
+        with self._lock:
+            row = self._row(roadmap_key, module_progress)
+            columns = self._columns
+            columns["status"][row] = STATUS_CODES.get(module_progress["status"], NOT_STARTED)
+            columns["progress"][row] = module_progress["progress_percentage"]
+            columns["minutes"][row] = module_progress["time_spent_minutes"]
+            columns["started_at"][row] = _moment(module_progress.get("started_at"))
+            columns["completed_at"][row] = _moment(module_progress.get("completed_at"))
+            columns["last_activity"][row] = _moment(module_progress.get("last_activity"))
+
+    def load(self, roadmaps: Iterable[Tuple[str, Dict]]):
+        """
+        Roadmap kayıtlarını toplu yükler.
+
+        Roadmap'in önceki satırları atılır; zaman damgaları tek bir dizi
+        dönüşümüyle ayrıştırıldığı için açılışta milyonlarca satır hızlı yüklenir.
+        """
+        rows: List[int] = []
+        fields: Dict[str, list] = {
+            "status": [], "progress": [], "minutes": [],
+            "started_at": [], "completed_at": [], "last_activity": []
+        }
+        with self._lock:
+            for roadmap_key, roadmap_data in roadmaps:
+                self._remove_roadmap(roadmap_key)
+                for mp in roadmap_data.get("module_progress", []):
+                    rows.append(self._row(roadmap_key, mp))
+                    fields["status"].append(STATUS_CODES.get(mp["status"], NOT_STARTED))
+                    fields["progress"].append(mp["progress_percentage"])
+                    fields["minutes"].append(mp["time_spent_minutes"])
+                    fields["started_at"].append(mp.get("started_at"))
+                    fields["completed_at"].append(mp.get("completed_at"))
+                    fields["last_activity"].append(mp.get("last_activity"))
+
+            if rows:
+                index = np.array(rows, dtype=np.int64)
+                for name, values in fields.items():
+                    column = self._columns[name]
+                    column[index] = np.array(values, dtype=column.dtype)
+
+    def remove_roadmap(self, roadmap_key: str):
+        """Roadmap'in tüm satırlarını boşaltır"""
+        with self._lock:
+            self._remove_roadmap(roadmap_key)
+
+    def analyze(self,
+                roadmap_id: Optional[str] = None,
+                inactive_days: int = 14,
+                limit: int = 50,
+                now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Kohort özetini hesaplar.
+
+        Args:
+            roadmap_id: Yalnızca bu roadmap'in satırları (None ise tümü)
+            inactive_days: Bu süreden uzun süredir hareketsiz, bitmemiş modüller terk sayılır
+            limit: Modül listelerinde döndürülecek en fazla grup sayısı
+            now: Hareketsizlik için referans zamanı
+        """
+        with self._lock:
+            n = self._size
+            if roadmap_id is not None:
+                roadmap_code = self._roadmaps.codes.get(roadmap_id, -1)
+                selection = self._columns["valid"][:n] & (self._columns["roadmap"][:n] == roadmap_code)
+            elif self._count < n:
+                selection = self._columns["valid"][:n]
+            else:
+                # Boş satır yoksa maske yerine düz kopya yeterli
+                selection = slice(None)
+            # Hesaplama kilit dışında kopyalar üzerinde yapılır (maskeli seçim zaten kopyadır)
+            data = {
+                name: self._columns[name][:n][selection]
+                for name in ("user", "instance", "group", "status", "minutes", "last_activity")
+            }
+            if isinstance(selection, slice):
+                data = {name: column.copy() for name, column in data.items()}
+            group_names = list(self._groups.values)
+            user_count = len(self._users)
+            instance_count = len(self._instances)
+
+        group_count = len(group_names)
+        status = data["status"]
+        completed = status == COMPLETED
+        cutoff = np.datetime64(now or datetime.now(), 's') - np.timedelta64(timedelta(days=inactive_days))
+        stalled = (status == STALLED_STATUSES[0]) | (status == STALLED_STATUSES[1])
+        stalled &= data["last_activity"] < cutoff
+
+        # Roadmap örneği (kullanıcı + roadmap) başına tamamlanan ve toplam modül; ağırlıklı
+        # bincount yerine (örnek, tamamlandı) çiftleri tek bir tamsayı sayımıyla toplanır
+        instance_keys = data["instance"].astype(np.int64) << 1
+        instance_keys |= completed
+        per_instance = np.bincount(instance_keys, minlength=instance_count * 2)
+        done = per_instance[1::2]
+        modules = per_instance[0::2] + done
+        present = modules > 0
+        done, modules = done[present], modules[present]
+        rate_mean, rate_percentiles, histogram = self._rate_distribution(done, modules)
+
+        # Modül grubu başına (durum, terk) sayıları: anahtar = grup << 3 | durum << 1 | terk
+        group_keys = data["group"].astype(np.int64) << 3
+        group_keys |= status.astype(np.int64) << 1
+        group_keys |= stalled
+        per_group = np.bincount(group_keys, minlength=group_count * 8).reshape(-1, len(STATUS_CODES), 2)
+        per_group_status = per_group.sum(axis=2)
+        status_counts = per_group_status.sum(axis=0)
+        started_per_group = per_group_status.sum(axis=1) - per_group_status[:, NOT_STARTED]
+        completed_per_group = per_group_status[:, COMPLETED]
+        stalled_per_group = per_group[:, :, 1].sum(axis=1)
+
+        minute_keys = data["group"].astype(np.int64) << 32
+        minute_keys |= np.maximum(data["minutes"], 0)
+        minute_stats = self._group_percentiles(minute_keys[completed], (0.5, 0.9))
+
+        def module_entry(code: int) -> Dict[str, Any]:
+            roadmap, module = group_names[code]
+            starts = int(started_per_group[code])
+            median, p90 = minute_stats.get(code, (None, None))
+            return {
+                "roadmap_id": roadmap,
+                "module_id": module,
+                "started": starts,
+                "completed": int(completed_per_group[code]),
+                "stalled": int(stalled_per_group[code]),
+                "completion_rate": round(float(completed_per_group[code]) / starts * 100, 1) if starts else 0,
+                "drop_off_rate": round(float(stalled_per_group[code]) / starts * 100, 1) if starts else 0,
+                "median_minutes_to_complete": median,
+                "p90_minutes_to_complete": p90
+            }
+
+        busiest = np.argsort(-started_per_group, kind="stable")[:limit]
+        drop_offs = np.argsort(-stalled_per_group, kind="stable")[:limit]
+
+        return {
+            "roadmap_id": roadmap_id,
+            "totals": {
+                "module_records": int(status.size),
+                "users": int(np.count_nonzero(np.bincount(data["user"], minlength=user_count))),
+                "roadmaps": int(modules.size),
+                "time_spent_minutes": int(data["minutes"].sum(dtype=np.int64)),
+                "status_counts": {
+                    status_value: int(status_counts[code]) for status_value, code in STATUS_CODES.items()
+                }
+            },
+            "completion_rate": {
+                "mean": rate_mean,
+                "percentiles": dict(zip((f"p{q}" for q in RATE_PERCENTILES), rate_percentiles)),
+                "histogram": [
+                    {"from": int(COMPLETION_BINS[i]), "to": int(COMPLETION_BINS[i + 1]), "roadmaps": int(count)}
+                    for i, count in enumerate(histogram)
+                ]
+            },
+            "modules": [module_entry(int(code)) for code in busiest if started_per_group[code] > 0],
+            "drop_off_points": [module_entry(int(code)) for code in drop_offs if stalled_per_group[code] > 0],
+            "inactive_days": inactive_days
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "rows": self._count,
+            "capacity": len(self._columns["valid"]),
+            "users": len(self._users),
+            "module_groups": len(self._groups),
+            "bytes": sum(column.nbytes for column in self._columns.values())
+        }
+
+    @staticmethod
+    def _rate_distribution(done: np.ndarray, modules: np.ndarray) -> Tuple[float, List[float], np.ndarray]:
+        """
+        Tamamlanma oranlarının ortalaması, yüzdelikleri ve 10'luk histogramı.
+
+        Oranlar binde bir hassasiyetle tamsayıya çevrilip sayılır; yüzdelikler
+        sıralama yerine kümülatif sayımda ikili aramayla bulunur.
+        """
+        if not modules.size:
+            return 0, [0] * len(RATE_PERCENTILES), np.zeros(len(COMPLETION_BINS) - 1, dtype=np.int64)
+
+        permille = done * 1000 // modules
+        counts = np.bincount(permille, minlength=1001)
+        histogram = np.add.reduceat(counts, COMPLETION_BINS[:-1] * 10)
+
+        cumulative = np.cumsum(counts)
+        ranks = np.array(RATE_PERCENTILES) / 100 * (modules.size - 1)
+        lower = np.floor(ranks)
+        low = np.searchsorted(cumulative, lower + 1, side="left") / 10
+        high = np.searchsorted(cumulative, np.ceil(ranks) + 1, side="left") / 10
+        percentiles = low + (high - low) * (ranks - lower)
+
+        mean = float((done / modules).mean() * 100)
+        return round(mean, 1), [round(float(value), 1) for value in percentiles], histogram
+
+    @staticmethod
+    def _group_percentiles(keys: np.ndarray, quantiles: Tuple[float, ...]) -> Dict[int, Tuple[float, ...]]:
+        """
+        Grup başına yüzdelikleri tek bir sıralamayla hesaplar.
+
+        Anahtarın üst 32 biti grup kodu, alt 32 biti değerdir; sıralanmış dizide
+        her grubun değerleri ardışık ve sıralı olur, yüzdelikler doğrusal
+        aradeğerlemeyle doğrudan indekslenir.
+        """
+        if not keys.size:
+            return {}
+        keys = np.sort(keys)
+        sorted_groups = keys >> 32
+        sorted_values = (keys & 0xFFFFFFFF).astype(np.float64)
+
+        starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+        counts = np.diff(np.r_[starts, keys.size])
+
+        results = []
+        for q in quantiles:
+            position = (counts - 1) * q
+            lower = np.floor(position).astype(np.int64)
+            upper = np.ceil(position).astype(np.int64)
+            low = sorted_values[starts + lower]
+            high = sorted_values[starts + upper]
+            results.append(np.round(low + (high - low) * (position - lower), 1))
+
+        return {
+            int(code): tuple(float(column[i]) for column in results)
+            for i, code in enumerate(sorted_groups[starts])
+        }
+
+    def _row(self, roadmap_key: str, module_progress: Dict) -> int:
+        """Modülün satırını bulur veya yeni satır ayırır (kilit tutulurken çağrılır)"""
+        module_id = module_progress["module_id"]
+        module_rows = self._rows.setdefault(roadmap_key, {})
+        row = module_rows.get(module_id)
+        if row is not None:
+            return row
+
+        if self._free:
+            row = self._free.pop()
+        else:
+            if self._size == len(self._columns["valid"]):
+                self._grow()
+            row = self._size
+            self._size += 1
+
+        roadmap_id = module_progress["roadmap_id"]
+        columns = self._columns
+        columns["user"][row] = self._users.code(module_progress["user_id"])
+        columns["instance"][row] = self._instances.code(roadmap_key)
+        columns["roadmap"][row] = self._roadmaps.code(roadmap_id)
+        columns["group"][row] = self._groups.code((roadmap_id, module_id))
+        columns["valid"][row] = True
+        module_rows[module_id] = row
+        self._count += 1
+        return row
+
+    def _remove_roadmap(self, roadmap_key: str):
+        module_rows = self._rows.pop(roadmap_key, None)
+        if not module_rows:
+            return
+        rows = list(module_rows.values())
+        self._columns["valid"][rows] = False
+        self._free.extend(rows)
+        self._count -= len(rows)
+        if len(self._instances) > max(self.COMPACT_MIN_CODES, 2 * len(self._rows)):
+            self._compact_codes()
+
+    def _compact_codes(self):
+        """Canlı satırlarda kullanılmayan kodları atıp sözlükleri yeniden numaralar (kilit tutulurken çağrılır)"""
+        valid = self._columns["valid"][:self._size]
+        for name, interner in (("user", self._users), ("instance", self._instances),
+                               ("roadmap", self._roadmaps), ("group", self._groups)):
+            column = self._columns[name][:self._size]
+            used, inverse = np.unique(column[valid], return_inverse=True)
+            column[valid] = inverse
+            interner.reset([interner.values[code] for code in used])
+
+    def _grow(self):
+        capacity = len(self._columns["valid"]) * 2
+        for name, column in self._columns.items():
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:len(column)] = column
+            self._columns[name] = grown
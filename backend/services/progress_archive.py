@@ -0,0 +1,151 @@
+"""
+Progress Archive - Uzun süredir etkin olmayan roadmap ilerlemeleri için sıkıştırılmış soğuk katman
+"""
+
+import json
+import sqlite3
+import threading
+import zlib
+import logging
+from datetime import datetime
+from typing import Dict, Any, Optional, List, Tuple, Iterator
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressArchive:
+    """
+    Roadmap kayıtlarını (modüller ve quiz sonuçlarıyla) zlib ile sıkıştırılmış
+    JSON olarak ayrı bir SQLite dosyasında saklar.
+
+    Arşivdeki kayıtlar ana depoda ve bellekte bulunmaz; servis kullanıcıya ilk
+    erişimde kayıtlarını ana depoya geri taşır. Kayıtlar önce hedefe yazılıp
+    sonra kaynaktan silindiği için yarıda kalan bir taşıma en fazla çift kayıt
+    bırakır; bu durumda ana depodaki (daha yeni) kayıt geçerlidir.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS archived_roadmap (
+            roadmap_key TEXT PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            roadmap_id TEXT NOT NULL,
+            last_activity TEXT,
+            archived_at TEXT NOT NULL,
+            raw_size INTEGER NOT NULL,
+            payload BLOB NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_archived_roadmap_user
+            ON archived_roadmap (user_id);
+        CREATE INDEX IF NOT EXISTS idx_archived_roadmap_roadmap
+            ON archived_roadmap (roadmap_id);
+    """
+
+    def __init__(self, db_file: str = "user_progress.archive.db", compression_level: int = 6):
+        """
+        Args:
+            db_file: Arşiv veritabanı dosyası
+            compression_level: zlib sıkıştırma düzeyi (1-9)
+        """
+        self.db_file = db_file
+        self.compression_level = compression_level
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(db_file, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self.SCHEMA)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM archived_roadmap").fetchone()[0]
+
+    def put(self, records: List[Tuple[str, Dict[str, Any]]]):
+        """Roadmap kayıtlarını sıkıştırarak tek bir işlemde arşive yazar"""
+        archived_at = datetime.now().isoformat()
+        rows = []
+        for roadmap_key, roadmap_data in records:
+            raw = json.dumps(roadmap_data, separators=(',', ':'), default=str).encode('utf-8')
+            rows.append((
+                roadmap_key, roadmap_data["user_id"], roadmap_data["roadmap_id"],
+                roadmap_data.get("last_activity"), archived_at, len(raw),
+                zlib.compress(raw, self.compression_level)
+            ))
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO archived_roadmap VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def get_user(self, user_id: str) -> Dict[str, Dict[str, Any]]:
+        """Kullanıcının arşivlenmiş roadmap kayıtlarını çözerek döndürür"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT roadmap_key, payload FROM archived_roadmap WHERE user_id = ?", (user_id,)
+            ).fetchall()
+        return {roadmap_key: self._decode(payload) for roadmap_key, payload in rows}
+
+    def remove(self, roadmap_keys: List[str]):
+        """Kayıtları arşivden siler (ana depoya geri taşındıktan sonra)"""
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM archived_roadmap WHERE roadmap_key = ?", [(key,) for key in roadmap_keys]
+            )
+
+    def iter_records(self,
+                     roadmap_id: Optional[str] = None,
+                     active_since: Optional[str] = None,
+                     fetch_size: int = 200) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Arşivdeki kayıtları ayrı bir salt okunur bağlantıdan parça parça çözer.
+
+        `active_since` roadmap'in son etkinliğine uygulanır; modüllerin son
+        etkinliği roadmap'inkini geçmediği için ön eleme olarak kullanılabilir.
+        """
+        conditions, params = [], []
+        if roadmap_id is not None:
+            conditions.append("roadmap_id = ?")
+            params.append(roadmap_id)
+        if active_since is not None:
+            conditions.append("last_activity >= ?")
+            params.append(active_since)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        conn = sqlite3.connect(f"file:{self.db_file}?mode=ro", uri=True, check_same_thread=False, timeout=30)
+        try:
+            cursor = conn.execute(f"SELECT roadmap_key, payload FROM archived_roadmap {where}", params)
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    break
+                for roadmap_key, payload in rows:
+                    yield roadmap_key, self._decode(payload)
+        finally:
+            conn.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            roadmaps, users, raw_bytes, stored_bytes = self._conn.execute(
+                """SELECT COUNT(*), COUNT(DISTINCT user_id),
+                          COALESCE(SUM(raw_size), 0), COALESCE(SUM(LENGTH(payload)), 0)
+                   FROM archived_roadmap"""
+            ).fetchone()
+        return {
+            "roadmaps": roadmaps,
+            "users": users,
+            "raw_bytes": raw_bytes,
+            "stored_bytes": stored_bytes,
+            "compression_ratio": round(raw_bytes / stored_bytes, 2) if stored_bytes else 0
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _decode(payload: bytes) -> Dict[str, Any]:
+        return json.loads(zlib.decompress(payload))
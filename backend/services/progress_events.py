@@ -0,0 +1,174 @@
+"""
+Progress Events - Kullanıcı ilerleme değişikliklerini canlı akış (SSE) abonelerine dağıtır
+"""
+
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional, List, Tuple
+
+
+class ProgressSubscription:
+    """Tek bir SSE bağlantısının olay kuyruğu"""
+
+    def __init__(self, user_id: str, loop: asyncio.AbstractEventLoop, max_queue: int):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue: "asyncio.Queue[Tuple[str, str, str]]" = asyncio.Queue(maxsize=max_queue)
+        self.backlog: List[Tuple[str, str, str]] = []
+
+    def deliver(self, event: Tuple[str, str, str]):
+        """Olay döngüsünde çalışır; yavaş istemcinin kuyruğu dolarsa yeniden eşitleme ister"""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait((event[0], "resync", "{}"))
+
+
+class _UserChannel:
+    """Bir kullanıcının aboneleri ve devam ettirme için son olayları"""
+
+    def __init__(self, buffer_size: int):
+        self.lock = threading.Lock()
+        self.sequence = 0
+        self.buffer: "deque[Tuple[int, str, str]]" = deque(maxlen=buffer_size)
+        self.subscribers: List[ProgressSubscription] = []
+        self.idle_since: Optional[float] = None
+
+
+class ProgressEventHub:
+    """
+    Kullanıcı başına kanallarla çalışan yayın merkezi.
+
+    Olaylar yalnızca en az bir kez abone olmuş kullanıcılar için tutulur;
+    akışa bağlı olmayan kullanıcılar için yayın maliyeti tek bir sözlük
+    aramasıdır. Olay kimlikleri `"{epoch}-{sıra}"` biçimindedir: sunucu yeniden
+    başladığında veya istenen olay tampondan düştüğünde istemciye `resync`
+    gönderilir ve istemci özeti bir kez yeniden çeker.
+    """
+
+    def __init__(self, buffer_size: int = 100, max_queue: int = 256, retention_seconds: int = 300):
+        """
+        Args:
+            buffer_size: Devam ettirme için kullanıcı başına tutulan son olay sayısı
+            max_queue: Bağlantı başına bekleyen olay sınırı
+            retention_seconds: Abonesi kalmayan kanalın tutulma süresi
+        """
+        self.buffer_size = buffer_size
+        self.max_queue = max_queue
+        self.retention_seconds = retention_seconds
+        self.epoch = format(int(time.time() * 1000), 'x')
+
+        self._channels: Dict[str, _UserChannel] = {}
+        self._prune_lock = threading.Lock()
+        self._last_prune = time.time()
+
+    def publish(self, user_id: str, event_type: str, data: Dict[str, Any]):
+        """Kullanıcının abonelerine olay gönderir (herhangi bir iş parçacığından çağrılabilir)"""
+        channel = self._channels.get(user_id)
+        if channel is None:
+            return
+
+        payload = json.dumps(data, separators=(',', ':'), default=str)
+        with channel.lock:
+            channel.sequence += 1
+            channel.buffer.append((channel.sequence, event_type, payload))
+            event = (f"{self.epoch}-{channel.sequence}", event_type, payload)
+            for subscription in channel.subscribers:
+                try:
+                    subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+                except RuntimeError:
+                    # Olay döngüsü kapanmış; bağlantı zaten sonlanıyor
+                    pass
+
+    def subscribe(self, user_id: str, last_event_id: Optional[str] = None) -> ProgressSubscription:
+        """
+        Yeni bir abonelik açar.
+
+        `last_event_id` verilirse kaçırılan olaylar `backlog` içinde döndürülür;
+        tampon yetmiyorsa tek bir `resync` olayı konur.
+        """
+        self._prune()
+        subscription = ProgressSubscription(user_id, asyncio.get_running_loop(), self.max_queue)
+
+        while True:
+            channel = self._channels.get(user_id)
+            if channel is None:
+                channel = self._channels.setdefault(user_id, _UserChannel(self.buffer_size))
+
+            with channel.lock:
+                if self._channels.get(user_id) is not channel:
+                    # Kanal bu arada temizlendi; yenisiyle tekrar dene
+                    continue
+                if last_event_id:
+                    subscription.backlog = self._replay(channel, last_event_id)
+                channel.subscribers.append(subscription)
+                channel.idle_since = None
+                return subscription
+
+    def unsubscribe(self, subscription: ProgressSubscription):
+        channel = self._channels.get(subscription.user_id)
+        if channel is None:
+            return
+        with channel.lock:
+            if subscription in channel.subscribers:
+                channel.subscribers.remove(subscription)
+            if not channel.subscribers:
+                channel.idle_since = time.time()
+
+    def get_stats(self) -> Dict[str, Any]:
+        channels = list(self._channels.values())
+        return {
+            "channels": len(channels),
+            "subscribers": sum(len(channel.subscribers) for channel in channels),
+            "buffered_events": sum(len(channel.buffer) for channel in channels)
+        }
+
+    def _replay(self, channel: _UserChannel, last_event_id: str) -> List[Tuple[str, str, str]]:
+        """Son görülen olaydan sonraki olayları döndürür (kanal kilidi altında çağrılır)"""
+        epoch, _, sequence = last_event_id.partition("-")
+        last_sequence = int(sequence) if sequence.isdigit() else -1
+        current_id = f"{self.epoch}-{channel.sequence}"
+
+        if epoch != self.epoch or last_sequence < 0 or last_sequence > channel.sequence:
+            return [(current_id, "resync", "{}")]
+        if last_sequence == channel.sequence:
+            return []
+
+        oldest = channel.buffer[0][0] if channel.buffer else channel.sequence + 1
+        if last_sequence + 1 < oldest:
+            return [(current_id, "resync", "{}")]
+
+        return [
+            (f"{self.epoch}-{sequence}", event_type, payload)
+            for sequence, event_type, payload in channel.buffer
+            if sequence > last_sequence
+        ]
+
+    def _prune(self):
+        """Abonesi uzun süredir olmayan kanalları bırakır"""
+        if time.time() - self._last_prune < min(self.retention_seconds, 60):
+            return
+        if not self._prune_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_prune = time.time()
+            cutoff = self._last_prune - self.retention_seconds
+            for user_id, channel in list(self._channels.items()):
+                if channel.idle_since is not None and channel.idle_since < cutoff:
+                    with channel.lock:
+                        if not channel.subscribers and channel.idle_since is not None \
+                                and channel.idle_since < cutoff:
+                            del self._channels[user_id]
+        finally:
+            self._prune_lock.release()
+
+
+def format_sse(event: Tuple[str, str, str]) -> str:
+    """Olayı SSE tel biçimine çevirir"""
+    event_id, event_type, payload = event
+    return f"id: {event_id}\nevent: {event_type}\ndata: {payload}\n\n"
@@ -0,0 +1,164 @@
+"""
+Progress Rollups - İlerleme olaylarının gün/hafta/ay kovalarına yazım anında toplanması
+"""
+
+from array import array
+from datetime import date
+from typing import Dict, Any, Optional, List, Tuple, Iterable
+
+# (user_id, roadmap_id, granularity, bucket, (minutes, progress_delta, modules_completed))
+RollupRow = Tuple[str, str, str, int, Tuple[int, int, int]]
+
+GRANULARITIES = ("day", "week", "month")
+
+
+def bucket_of(granularity: str, moment: date) -> int:
+    """Tarihin ilgili kova numarasını döndürür (haftalar pazartesi başlar)"""
+    if granularity == "day":
+        return moment.toordinal()
+    if granularity == "week":
+        # 1 Ocak 0001 pazartesidir; ordinal 1 ilk haftanın ilk günü
+        return (moment.toordinal() - 1) // 7
+    if granularity == "month":
+        return moment.year * 12 + moment.month - 1
+    raise ValueError(f"Bilinmeyen kova türü: {granularity}")
+
+
+def bucket_start(granularity: str, bucket: int) -> date:
+    """Kova numarasının başlangıç tarihini döndürür"""
+    if granularity == "day":
+        return date.fromordinal(bucket)
+    if granularity == "week":
+        return date.fromordinal(bucket * 7 + 1)
+    if granularity == "month":
+        return date(bucket // 12, bucket % 12 + 1, 1)
+    raise ValueError(f"Bilinmeyen kova türü: {granularity}")
+
+
+class RollupSeries:
+    """
+    Ardışık kovaları tek bir `array('i')` içinde tutan seri.
+
+    Her kova üç tamsayıdan oluşur (dakika, yüzde farkı, tamamlanan modül) ve
+    ilk kovadan itibaren kaydırmalı olarak adreslenir; böylece bir kullanıcı
+    için bir yıllık günlük seri yaklaşık 4 KB yer kaplar.
+    """
+
+    FIELDS = 3
+    __slots__ = ("origin", "values")
+
+    def __init__(self):
+        self.origin = 0
+        self.values = array('i')
+
+    def __len__(self) -> int:
+        return len(self.values) // self.FIELDS
+
+    def add(self, bucket: int, deltas: Tuple[int, int, int]) -> Tuple[int, int, int]:
+        """Kovaya farkları ekler ve kovanın yeni değerlerini döndürür"""
+        offset = self._offset(bucket)
+        for i, delta in enumerate(deltas):
+            self.values[offset + i] += delta
+        return tuple(self.values[offset:offset + self.FIELDS])
+
+    def set(self, bucket: int, values: Tuple[int, int, int]):
+        """Kovanın değerlerini doğrudan yazar (depodan yükleme için)"""
+        offset = self._offset(bucket)
+        self.values[offset:offset + self.FIELDS] = array('i', values)
+
+    def get(self, bucket: int) -> Tuple[int, int, int]:
+        index = bucket - self.origin
+        if not self.values or index < 0 or index >= len(self):
+            return (0, 0, 0)
+        offset = index * self.FIELDS
+        return tuple(self.values[offset:offset + self.FIELDS])
+
+    def _offset(self, bucket: int) -> int:
+        if not self.values:
+            self.origin = bucket
+        elif bucket < self.origin:
+            self.values = array('i', [0]) * (self.FIELDS * (self.origin - bucket)) + self.values
+            self.origin = bucket
+
+        index = bucket - self.origin
+        missing = (index + 1) * self.FIELDS - len(self.values)
+        if missing > 0:
+            self.values.extend(array('i', [0]) * missing)
+        return index * self.FIELDS
+
+
+class ProgressRollups:
+    """
+    Kullanıcı + roadmap başına gün, hafta ve ay serileri.
+
+    Yazım anında her olay üç kovaya eklenir; haftalık veya aylık seri
+    sorguları yalnızca istenen sayıda kovayı okur.
+    """
+
+    def __init__(self):
+        # user_id -> (roadmap_id, kova türü) -> seri
+        self._series: Dict[str, Dict[Tuple[str, str], RollupSeries]] = {}
+
+    def record(self,
+               user_id: str,
+               roadmap_id: str,
+               minutes: int,
+               progress_delta: int,
+               modules_completed: int,
+               moment: Optional[date] = None) -> List[RollupRow]:
+        """
+        Olayı gün/hafta/ay kovalarına ekler.
+
+        Depoya yazılmak üzere değişen kovaların güncel değerlerini döndürür.
+        """
+        if not (minutes or progress_delta or modules_completed):
+            return []
+
+        moment = moment or date.today()
+        deltas = (minutes, progress_delta, modules_completed)
+        rows = []
+        user_series = self._user_series(user_id)
+        for granularity in GRANULARITIES:
+            series = user_series.get((roadmap_id, granularity))
+            if series is None:
+                series = user_series[(roadmap_id, granularity)] = RollupSeries()
+            bucket = bucket_of(granularity, moment)
+            rows.append((user_id, roadmap_id, granularity, bucket, series.add(bucket, deltas)))
+        return rows
+
+    def load(self, rows: Iterable[RollupRow]):
+        """Depodaki kova değerlerini belleğe yükler"""
+        for user_id, roadmap_id, granularity, bucket, values in rows:
+            series = self._user_series(user_id).setdefault((roadmap_id, granularity), RollupSeries())
+            series.set(bucket, tuple(values))
+
+    def drop_user(self, user_id: str):
+        """Kullanıcının tüm serilerini bellekten çıkarır"""
+        self._series.pop(user_id, None)
+
+    def series(self,
+               user_id: str,
+               roadmap_id: str,
+               granularity: str,
+               periods: int,
+               until: Optional[date] = None) -> List[Dict[str, Any]]:
+        """Son `periods` kovayı eskiden yeniye doğru döndürür"""
+        last = bucket_of(granularity, until or date.today())
+        series = self._series.get(user_id, {}).get((roadmap_id, granularity))
+
+        result = []
+        for bucket in range(last - periods + 1, last + 1):
+            minutes, progress_delta, modules_completed = series.get(bucket) if series else (0, 0, 0)
+            result.append({
+                "period_start": bucket_start(granularity, bucket).isoformat(),
+                "time_spent_minutes": minutes,
+                "progress_delta": progress_delta,
+                "modules_completed": modules_completed
+            })
+        return result
+
+    def _user_series(self, user_id: str) -> Dict[Tuple[str, str], RollupSeries]:
+        user_series = self._series.get(user_id)
+        if user_series is None:
+            user_series = self._series.setdefault(user_id, {})
+        return user_series
@@ -1,38 +1,490 @@
-from typing import List, Optional, Dict
-from datetime import datetime, timedelta
-import json
 import os
+import copy
+import logging
+import itertools
+import threading
+from contextlib import contextmanager
+from typing import List, Optional, Dict, Tuple, Iterator
+from datetime import datetime, timedelta
+from config import (
+    PROGRESS_STORE_BACKEND,
+    PROGRESS_SNAPSHOT_EVERY,
+    PROGRESS_LOG_SYNC_EVERY,
+    PROGRESS_DURABILITY,
+    PROGRESS_FLUSH_INTERVAL_MS,
+    PROGRESS_FLUSH_MAX_RECORDS,
+    PROGRESS_MULTIPROCESS,
+    PROGRESS_SNAPSHOT_FORMAT,
+    PROGRESS_STREAM_BUFFER_EVENTS,
+    PROGRESS_ARCHIVE_AFTER_DAYS,
+    PROGRESS_ARCHIVE_INTERVAL_SECONDS,
+    QUIZ_KEYS_FILE
+)
+from services.progress_store import ProgressStore, create_progress_store, export_rows
+from services.progress_archive import ProgressArchive
+from services.progress_rollups import ProgressRollups
+from services.progress_events import ProgressEventHub
+from services.progress_analytics import ProgressColumns
+from services.quiz_engine import QuizEngine
 from models.progress import (
     ModuleProgress, 
     RoadmapProgress, 
     ProgressStatus, 
     ProgressUpdate,
     QuizResult,
-    QuizSubmission
+    QuizSubmission,
+    QuizBulkGradeRequest
 )
 
+ROADMAP_TIMESTAMP_FIELDS = ("started_at", "estimated_completion_date", "last_activity")
+MODULE_TIMESTAMP_FIELDS = ("started_at", "completed_at", "last_activity")
+QUIZ_PASSING_SCORE = 80
+
+logger = logging.getLogger(__name__)
+
+def _timestamp(value):
+    """Zaman damgasını depolanan ISO biçimine çevir (eski kayıtlarda boşluk ayraçlı olabilir)"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, str) and len(value) > 10 and value[10] == " ":
+        return f"{value[:10]}T{value[11:]}"
+    return value
+
+def _to_record(model, timestamp_fields: Tuple[str, ...]) -> Dict:
+    """Doğrulanmış modeli depolanan düz kayıt biçimine çevir"""
+    record = model.model_dump()
+    for field in timestamp_fields:
+        record[field] = _timestamp(record.get(field))
+    return record
+
+def _normalize_roadmap_record(roadmap_data: Dict):
+    """Yüklenen kaydı yerinde normalize et; okumalar kaydı yeniden doğrulamadan döndürür"""
+    for field in ROADMAP_TIMESTAMP_FIELDS:
+        roadmap_data[field] = _timestamp(roadmap_data.get(field))
+    for mp in roadmap_data.setdefault("module_progress", []):
+        mp["status"] = ProgressStatus(mp.get("status", ProgressStatus.NOT_STARTED)).value
+        for field in MODULE_TIMESTAMP_FIELDS:
+            mp[field] = _timestamp(mp.get(field))
+        for quiz in mp.setdefault("quiz_results", []):
+            quiz["completed_at"] = _timestamp(quiz.get("completed_at"))
+
 class ProgressService:
-    def __init__(self):
-        self.progress_file = "user_progress.json"
-        self.progress_data = self._load_progress_data()
+    def __init__(self,
+                 progress_file: str = "user_progress.json",
+                 store: Optional[ProgressStore] = None,
+                 multiprocess: Optional[bool] = None,
+                 events: Optional[ProgressEventHub] = None,
+                 quiz_engine: Optional[QuizEngine] = None,
+                 archive: Optional[ProgressArchive] = None,
+                 archive_after_days: Optional[int] = None,
+                 autostart: bool = True):
+        """
+        `autostart=False` ile depo, arşiv ve arka plan thread'i oluşturulmaz;
+        bunlar `start()` çağrılınca açılır (global instance uygulama açılışında başlatılır).
+        """
+        self.progress_file = progress_file
+        # Çok süreçli modda kullanıcı kayıtları her işlemde depodan tazelenir
+        self.multiprocess = PROGRESS_MULTIPROCESS if multiprocess is None else multiprocess
+        self.store = store
+        # Canlı akış (SSE) aboneleri için değişiklik olayları
+        self.events = events or ProgressEventHub(buffer_size=PROGRESS_STREAM_BUFFER_EVENTS)
+        # Quiz cevap anahtarları ve derlenmiş puanlama tabloları
+        self.quiz_engine = quiz_engine or QuizEngine(QUIZ_KEYS_FILE)
+        # Kullanıcı başına kilitler: farklı kullanıcılar birbirini beklemez
+        self._user_locks: Dict[str, threading.Lock] = {}
+        self.archive_after_days = PROGRESS_ARCHIVE_AFTER_DAYS if archive_after_days is None else archive_after_days
+        self.archive = archive
+        self._archive_stop = threading.Event()
+        self._archive_thread = None
+        self.started = False
+        if autostart:
+            self.start()
     
-    def _load_progress_data(self) -> Dict:
-        """Kullanıcı ilerleme verilerini yükle"""
-        if os.path.exists(self.progress_file):
+    def start(self):
+        """Depoyu ve arşivi aç, kayıtları yükle ve arşivleme thread'ini başlat (tekrar çağrılırsa bir şey yapmaz)"""
+        if self.started:
+            return
+        self.started = True
+        progress_file = self.progress_file
+        self.store = self.store or create_progress_store(
+            PROGRESS_STORE_BACKEND,
+            progress_file,
+            snapshot_every=PROGRESS_SNAPSHOT_EVERY,
+            sync_every=PROGRESS_LOG_SYNC_EVERY,
+            durability=PROGRESS_DURABILITY,
+            flush_interval_ms=PROGRESS_FLUSH_INTERVAL_MS,
+            max_batch=PROGRESS_FLUSH_MAX_RECORDS,
+            multiprocess=self.multiprocess,
+            snapshot_format=PROGRESS_SNAPSHOT_FORMAT
+        )
+        # Tembel yüklemede kullanıcı kayıtları ilk erişimde depodan okunur
+        self.lazy = self.store.supports_lazy_load
+        self._loaded_users = set()
+        self.progress_data = {} if self.lazy else self._load_progress_data()
+        
+        # İkincil indeksler: user_id -> roadmap anahtarları, (anahtar, module_id) -> modül kaydı
+        self._user_roadmaps: Dict[str, Dict[str, None]] = {}
+        self._module_index: Dict[Tuple[str, str], Dict] = {}
+        # Roadmap başına artımlı toplamlar: modül sayısı, tamamlanan, yüzde toplamı, süre toplamı
+        self._aggregates: Dict[str, Dict[str, int]] = {}
+        for roadmap_key, roadmap_data in self.progress_data.items():
+            self._index_roadmap(roadmap_key, roadmap_data)
+        
+        # Soğuk katman: uzun süredir etkin olmayan roadmap'ler sıkıştırılmış arşive taşınır,
+        # kullanıcıya ilk erişimde ana depoya geri alınır
+        if self.archive is None and self.archive_after_days > 0:
+            self.archive = ProgressArchive(os.path.splitext(progress_file)[0] + ".archive.db")
+        self._thawed_users = set()
+        
+        # Kohort analizi için tüm modül kayıtlarının sütunlu kopyası
+        self.analytics = ProgressColumns()
+        self.analytics.load(self.progress_data.items())
+        # Tembel yüklemede yüklenmemiş kullanıcılar ilk analiz isteğinde sütunlara eklenir;
+        # arşivdeki kayıtlar yalnızca analiz süresince eklenir
+        self._analytics_complete = not self.lazy
+        self._analytics_lock = threading.Lock()
+        
+        # Gün/hafta/ay kovalarına yazım anında toplanan etkinlik serileri
+        self.rollups = ProgressRollups()
+        if not self.lazy:
+            self.rollups.load(self.store.load_rollups())
+        
+        if self.archive is not None and self.archive_after_days > 0 and PROGRESS_ARCHIVE_INTERVAL_SECONDS > 0:
+            self._archive_thread = threading.Thread(
+                target=self._archive_loop, args=(PROGRESS_ARCHIVE_INTERVAL_SECONDS,), daemon=True
+            )
+            self._archive_thread.start()
+    
+    def _user_lock(self, user_id: str) -> threading.Lock:
+        lock = self._user_locks.get(user_id)
+        if lock is None:
+            lock = self._user_locks.setdefault(user_id, threading.Lock())
+        return lock
+    
+    @contextmanager
+    def _user_locked(self, user_id: str):
+        """
+        Kullanıcının süreç içi kilidini al.
+        
+        Bellekten çıkarılan kullanıcının kilidi sözlükten silinir; silinmeden önce
+        alınmış eski kilidi bekleyen thread güncel kilitle yeniden dener.
+        """
+        while True:
+            lock = self._user_lock(user_id)
+            lock.acquire()
+            if self._user_locks.get(user_id) is lock:
+                break
+            lock.release()
+        try:
+            yield
+        finally:
+            lock.release()
+    
+    def _forget_user_lock(self, user_id: str):
+        """Kimse tutmuyorsa kullanıcının kilidini sözlükten çıkar"""
+        lock = self._user_locks.get(user_id)
+        if lock is not None and lock.acquire(blocking=False):
             try:
-                with open(self.progress_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
-                return {}
-        return {}
+                if self._user_locks.get(user_id) is lock:
+                    del self._user_locks[user_id]
+            finally:
+                lock.release()
+    
+    @contextmanager
+    def _locked(self, user_id: str):
+        """Kullanıcının kayıtlarını süreç içinde ve (varsa) süreçler arasında kilitle"""
+        with self._user_locked(user_id), self.store.user_lock(user_id):
+            if self.multiprocess or (self.lazy and user_id not in self._loaded_users):
+                self._refresh_user(user_id)
+            if self.archive is not None and (self.multiprocess or user_id not in self._thawed_users):
+                self._thaw_user(user_id)
+            yield
+    
+    def _refresh_user(self, user_id: str):
+        """Kullanıcının kayıtlarını depodaki güncel hâliyle yükle veya değiştir (kilit altında çağrılır)"""
+        for roadmap_key in list(self._user_roadmaps.get(user_id, ())):
+            self._unindex_roadmap(roadmap_key, self.progress_data.pop(roadmap_key))
+        user_roadmaps = self.store.load_user(user_id)
+        for roadmap_key, roadmap_data in user_roadmaps.items():
+            self.progress_data[roadmap_key] = roadmap_data
+            self._index_roadmap(roadmap_key, roadmap_data)
+        self.analytics.load(user_roadmaps.items())
+        self.rollups.drop_user(user_id)
+        self.rollups.load(self.store.load_rollups(user_id))
+        self._loaded_users.add(user_id)
+    
+    def _index_roadmap(self, roadmap_key: str, roadmap_data: Dict):
+        """Roadmap kaydını ve modüllerini ikincil indekslere ekle"""
+        _normalize_roadmap_record(roadmap_data)
+        self._user_roadmaps.setdefault(roadmap_data["user_id"], {})[roadmap_key] = None
+        for mp in roadmap_data.get("module_progress", []):
+            self._module_index[(roadmap_key, mp["module_id"])] = mp
+        self._recompute_roadmap_aggregates(roadmap_key, roadmap_data)
+    
+    def _unindex_roadmap(self, roadmap_key: str, roadmap_data: Dict):
+        """Roadmap kaydını ve modüllerini ikincil indekslerden ve analiz sütunlarından çıkar"""
+        user_keys = self._user_roadmaps.get(roadmap_data["user_id"])
+        if user_keys is not None:
+            user_keys.pop(roadmap_key, None)
+            if not user_keys:
+                del self._user_roadmaps[roadmap_data["user_id"]]
+        for mp in roadmap_data.get("module_progress", []):
+            self._module_index.pop((roadmap_key, mp["module_id"]), None)
+        self._aggregates.pop(roadmap_key, None)
+        self.analytics.remove_roadmap(roadmap_key)
+    
+    def _find_module(self, roadmap_key: str, module_id: str) -> Optional[Dict]:
+        """Modül kaydını O(1) olarak bul"""
+        return self._module_index.get((roadmap_key, module_id))
+    
+    def _add_module(self, roadmap_key: str, roadmap_data: Dict, module_progress: Dict):
+        """Yeni modül kaydını roadmap'e ve indekse ekle"""
+        roadmap_data.setdefault("module_progress", []).append(module_progress)
+        self._module_index[(roadmap_key, module_progress["module_id"])] = module_progress
+        self._apply_module_delta(roadmap_key, None, module_progress)
+    
+    @staticmethod
+    def _module_contribution(module_progress: Dict) -> Tuple[int, int, int]:
+        """Modülün roadmap toplamlarına katkısı: (tamamlandı mı, yüzde, süre)"""
+        return (
+            1 if module_progress["status"] == ProgressStatus.COMPLETED.value else 0,
+            module_progress["progress_percentage"],
+            module_progress["time_spent_minutes"]
+        )
+    
+    def _apply_module_delta(self, roadmap_key: str, old: Optional[Tuple[int, int, int]], module_progress: Dict):
+        """Tek bir modülün eski ve yeni katkısı arasındaki farkı toplamlara ve analiz sütunlarına uygula"""
+        aggregate = self._aggregates.setdefault(
+            roadmap_key, {"modules": 0, "completed": 0, "progress_sum": 0, "time_sum": 0}
+        )
+        completed, progress, time_spent = self._module_contribution(module_progress)
+        if old is None:
+            aggregate["modules"] += 1
+            old = (0, 0, 0)
+        aggregate["completed"] += completed - old[0]
+        aggregate["progress_sum"] += progress - old[1]
+        aggregate["time_sum"] += time_spent - old[2]
+        self.analytics.upsert(roadmap_key, module_progress)
+    
+    def _recompute_roadmap_aggregates(self, roadmap_key: str, roadmap_data: Dict) -> Dict[str, int]:
+        """Toplamları tüm modüller üzerinden baştan hesapla (doğrulama/onarım için)"""
+        module_progresses = roadmap_data.get("module_progress", [])
+        aggregate = {
+            "modules": len(module_progresses),
+            "completed": sum(1 for mp in module_progresses if mp["status"] == ProgressStatus.COMPLETED.value),
+            "progress_sum": sum(mp["progress_percentage"] for mp in module_progresses),
+            "time_sum": sum(mp["time_spent_minutes"] for mp in module_progresses)
+        }
+        self._aggregates[roadmap_key] = aggregate
+        return aggregate
+    
+    def verify_aggregates(self, repair: bool = True) -> List[str]:
+        """
+        Artımlı toplamları tam hesaplamayla karşılaştır.
+        
+        Tutarsız roadmap anahtarlarını döndürür; repair=True ise toplamları düzeltir.
+        """
+        mismatched = []
+        for user_id in list(self._user_roadmaps):
+            with self._user_locked(user_id):
+                for roadmap_key in list(self._user_roadmaps.get(user_id, ())):
+                    current = dict(self._aggregates.get(roadmap_key, {}))
+                    expected = self._recompute_roadmap_aggregates(roadmap_key, self.progress_data[roadmap_key])
+                    if current != expected:
+                        mismatched.append(roadmap_key)
+                        if not repair:
+                            self._aggregates[roadmap_key] = current
+        return mismatched
+    
+    def _load_progress_data(self) -> Dict:
+        """Kullanıcı ilerleme verilerini depodan yükle"""
+        return self.store.load()
+    
+    def _copy_progress_data(self) -> Dict:
+        """Her kullanıcının kayıtlarını kendi kilidi altında kopyala (snapshot için)"""
+        data = {}
+        for user_id in list(self._user_roadmaps):
+            with self._user_locked(user_id):
+                for roadmap_key in self._user_roadmaps.get(user_id, ()):
+                    data[roadmap_key] = copy.deepcopy(self.progress_data[roadmap_key])
+            if user_id not in self._user_roadmaps:
+                # Kopyalanırken bellekten çıkarılan kullanıcının kilidi yeniden oluşmuş olabilir
+                self._forget_user_lock(user_id)
+        return data
     
     def _save_progress_data(self):
-        """Kullanıcı ilerleme verilerini kaydet"""
-        with open(self.progress_file, 'w', encoding='utf-8') as f:
-            json.dump(self.progress_data, f, indent=2, default=str)
+        """Tüm ilerleme verilerini depoya sıkıştırılmış olarak kaydet"""
+        self.store.compact(self._copy_progress_data)
+    
+    def _checkpoint(self):
+        """Gerekirse deponun arka planda snapshot almasını iste (kullanıcı kilidi dışında çağrılır)"""
+        self.store.checkpoint(self._copy_progress_data)
+    
+    def _persist_roadmap(self, roadmap_key: str):
+        """Roadmap üst bilgisini depoya yaz"""
+        self.store.save_roadmap(roadmap_key, self.progress_data[roadmap_key])
+    
+    def _persist_modules(self, roadmap_key: str, module_progresses: List[Dict], rollups: List = ()):
+        """Modül kayıtlarını, roadmap üst bilgisini ve zaman kovalarını tek seferde depoya yaz"""
+        self.store.save_batch(
+            [(roadmap_key, self.progress_data[roadmap_key])],
+            [(roadmap_key, mp) for mp in module_progresses],
+            rollups
+        )
+    
+    def _module_activity(self, previous_contribution: Tuple[int, int, int], module_progress: Dict) -> Tuple[int, int]:
+        """Modül değişikliğinin etkinlik farkı: (harcanan dakika, yeni tamamlanan modül)"""
+        completed, _, time_spent = self._module_contribution(module_progress)
+        return (
+            max(0, time_spent - previous_contribution[2]),
+            max(0, completed - previous_contribution[0])
+        )
+    
+    def _record_activity(self, roadmap_data: Dict, activity: Tuple[int, int], previous_overall: int) -> List:
+        """Etkinlik farkını zaman kovalarına ekle; depoya yazılacak kovaları döndür"""
+        minutes, modules_completed = activity
+        return self.rollups.record(
+            roadmap_data["user_id"],
+            roadmap_data["roadmap_id"],
+            minutes=minutes,
+            progress_delta=roadmap_data.get("overall_progress", 0) - previous_overall,
+            modules_completed=modules_completed
+        )
+    
+    def _publish(self, event_type: str, roadmap_data: Dict, **data):
+        """Değişikliği roadmap üst bilgisiyle birlikte kullanıcının akışına gönder (kilit altında)"""
+        header = {k: v for k, v in roadmap_data.items() if k != "module_progress"}
+        self.events.publish(
+            roadmap_data["user_id"],
+            event_type,
+            {"roadmap_id": roadmap_data["roadmap_id"], "roadmap": header, **data}
+        )
+    
+    def _thaw_user(self, user_id: str):
+        """
+        Kullanıcının arşivdeki roadmap'lerini ana depoya ve belleğe geri al (kilit altında çağrılır).
+        
+        Kayıtlar önce depoya yazılır, arşivden en son silinir; yarıda kalmış bir
+        taşımadan sonra her iki yerde bulunan roadmap için ana depodaki kayıt geçerlidir.
+        """
+        archived = self.archive.get_user(user_id)
+        if archived:
+            thawed = [(key, data) for key, data in archived.items() if key not in self.progress_data]
+            for roadmap_key, roadmap_data in thawed:
+                self.store.save_batch(
+                    [(roadmap_key, roadmap_data)],
+                    [(roadmap_key, mp) for mp in roadmap_data.get("module_progress", [])]
+                )
+                self.progress_data[roadmap_key] = roadmap_data
+                self._index_roadmap(roadmap_key, roadmap_data)
+            self.analytics.load(thawed)
+            if not self.lazy:
+                # Bellekten çıkarılan kullanıcının zaman kovaları depodan geri okunur
+                self.rollups.drop_user(user_id)
+                self.rollups.load(self.store.load_rollups(user_id))
+            # Toplu yazmalı depoda kayıtlar diske inmeden arşivden silinmemeli
+            self.store.flush(sync=True)
+            self.archive.remove(list(archived))
+        self._thawed_users.add(user_id)
+    
+    def archive_inactive_roadmaps(self, max_idle_days: Optional[int] = None) -> Dict:
+        """
+        Son etkinliği eşikten eski roadmap'leri soğuk arşive taşı ve bellekten çıkar.
+        
+        Hiç etkin roadmap'i kalmayan kullanıcılar bellekten tamamen çıkarılır (kayıtlar,
+        analiz satırları, zaman kovaları, kilit ve yükleme kayıtları); böylece bellek
+        toplam geçmişle değil, etkin kullanıcı sayısıyla sınırlı kalır.
+        """
+        if self.archive is None:
+            raise ValueError("Soğuk arşiv etkin değil")
+        
+        max_idle_days = self.archive_after_days if max_idle_days is None else max_idle_days
+        if max_idle_days < 1:
+            raise ValueError("Hareketsizlik süresi en az 1 gün olmalıdır")
+        cutoff = (datetime.now() - timedelta(days=max_idle_days)).isoformat()
+        
+        def is_idle(roadmap_data: Dict) -> bool:
+            last_activity = roadmap_data.get("last_activity")
+            return last_activity is not None and last_activity < cutoff
+        
+        candidates = [
+            user_id for user_id, keys in list(self._user_roadmaps.items())
+            if any(is_idle(self.progress_data[key]) for key in list(keys) if key in self.progress_data)
+        ]
+        
+        archived_roadmaps = 0
+        evicted = []
+        for user_id in candidates:
+            with self._locked(user_id):
+                idle = [
+                    (key, self.progress_data[key])
+                    for key in self._user_roadmaps.get(user_id, ())
+                    if is_idle(self.progress_data[key])
+                ]
+                if not idle:
+                    continue
+                # Önce arşive yazılır, sonra depodan silinir; arada çökme kayıp değil çift kayıt bırakır
+                self.archive.put(idle)
+                for roadmap_key, roadmap_data in idle:
+                    self.store.delete_roadmap(roadmap_key, roadmap_data)
+                    self._unindex_roadmap(roadmap_key, roadmap_data)
+                    del self.progress_data[roadmap_key]
+                archived_roadmaps += len(idle)
+                
+                if user_id not in self._user_roadmaps:
+                    # Zaman kovaları depoda kalır; bir sonraki erişimde yeniden okunur
+                    self._thawed_users.discard(user_id)
+                    self._loaded_users.discard(user_id)
+                    self.rollups.drop_user(user_id)
+                    evicted.append(user_id)
+        
+        for user_id in evicted:
+            self._forget_user_lock(user_id)
+        evicted_users = len(evicted)
+        
+        if archived_roadmaps:
+            self._checkpoint()
+            logger.info(f"{archived_roadmaps} roadmap soğuk arşive taşındı, {evicted_users} kullanıcı bellekten çıkarıldı")
+        
+        return {
+            "archived_roadmaps": archived_roadmaps,
+            "evicted_users": evicted_users,
+            "hot_roadmaps": len(self.progress_data),
+            "hot_users": len(self._user_roadmaps),
+            "archive": self.archive.get_stats()
+        }
+    
+    def _archive_loop(self, interval_seconds: int):
+        """Arka planda eski roadmap'leri düzenli aralıklarla arşivle"""
+        wait = min(interval_seconds, 60)
+        while not self._archive_stop.wait(wait):
+            try:
+                self.archive_inactive_roadmaps()
+            except Exception as e:
+                logger.error(f"Soğuk arşivleme başarısız: {e}")
+            wait = interval_seconds
+    
+    def close(self):
+        """Servisi kapatırken son durumu depoya yaz"""
+        if not self.started:
+            return
+        self.started = False
+        self._archive_stop.set()
+        if self._archive_thread is not None:
+            self._archive_thread.join()
+        self._save_progress_data()
+        self.store.close()
+        if self.archive is not None:
+            self.archive.close()
     
     def initialize_roadmap_progress(self, user_id: str, roadmap_id: str, total_modules: int) -> RoadmapProgress:
         """Yeni roadmap için ilerleme kaydı oluştur"""
+        with self._locked(user_id):
+            roadmap_progress = self._initialize_roadmap_progress(user_id, roadmap_id, total_modules)
+        self._checkpoint()
+        return roadmap_progress
+    
+    def _initialize_roadmap_progress(self, user_id: str, roadmap_id: str, total_modules: int) -> RoadmapProgress:
         roadmap_key = f"{user_id}_{roadmap_id}"
         
         roadmap_progress = RoadmapProgress(
@@ -43,8 +495,16 @@ class ProgressService:
             last_activity=datetime.now()
         )
         
-        self.progress_data[roadmap_key] = roadmap_progress.dict()
-        self._save_progress_data()
+        previous = self.progress_data.get(roadmap_key)
+        if previous is not None:
+            # Mevcut kayıt sıfırlanıyor; eski modüller indeksten ve depodan kaldırılır
+            self._unindex_roadmap(roadmap_key, previous)
+            self.store.delete_roadmap(roadmap_key, previous)
+        
+        self.progress_data[roadmap_key] = _to_record(roadmap_progress, ROADMAP_TIMESTAMP_FIELDS)
+        self._index_roadmap(roadmap_key, self.progress_data[roadmap_key])
+        self._persist_roadmap(roadmap_key)
+        self._publish("roadmap", self.progress_data[roadmap_key])
         
         return roadmap_progress
     
@@ -52,34 +512,114 @@ class ProgressService:
         """Roadmap ilerlemesini getir"""
         roadmap_key = f"{user_id}_{roadmap_id}"
         
-        if roadmap_key in self.progress_data:
-            data = self.progress_data[roadmap_key]
-            return RoadmapProgress(**data)
+        with self._locked(user_id):
+            if roadmap_key in self.progress_data:
+                data = self.progress_data[roadmap_key]
+                return RoadmapProgress(**data)
         
         return None
     
+    def get_roadmap_progress_data(self, user_id: str, roadmap_id: str) -> Optional[Dict]:
+        """Roadmap ilerlemesini yeniden doğrulamadan düz sözlük olarak getir (okuma yolu)"""
+        roadmap_key = f"{user_id}_{roadmap_id}"
+        
+        with self._locked(user_id):
+            data = self.progress_data.get(roadmap_key)
+            return self._export_roadmap(data) if data is not None else None
+    
+    @staticmethod
+    def _export_roadmap(roadmap_data: Dict) -> Dict:
+        """
+        Kaydın yanıt için kopyasını çıkar.
+        
+        Kayıtlar yazım sırasında doğrulandığı için model yeniden kurulmaz; yalnızca
+        sonradan değişebilecek sözlükler kopyalanır (quiz sonuçları eklendikten
+        sonra değişmez).
+        """
+        exported = dict(roadmap_data)
+        exported["module_progress"] = [
+            {**mp, "quiz_results": list(mp["quiz_results"])}
+            for mp in roadmap_data["module_progress"]
+        ]
+        return exported
+    
     def update_module_progress(self, user_id: str, roadmap_id: str, update: ProgressUpdate) -> ModuleProgress:
         """Modül ilerlemesini güncelle"""
+        with self._locked(user_id):
+            module_progress = self._update_module_progress(user_id, roadmap_id, update)
+        self._checkpoint()
+        return module_progress
+    
+    def _update_module_progress(self, user_id: str, roadmap_id: str, update: ProgressUpdate) -> ModuleProgress:
         roadmap_key = f"{user_id}_{roadmap_id}"
         
         if roadmap_key not in self.progress_data:
             # Roadmap ilerlemesi yoksa oluştur
-            self.initialize_roadmap_progress(user_id, roadmap_id, 0)
+            self._initialize_roadmap_progress(user_id, roadmap_id, 0)
         
         roadmap_data = self.progress_data[roadmap_key]
+        previous_overall = roadmap_data.get("overall_progress", 0)
+        
+        module_progress, activity = self._apply_module_update(roadmap_key, roadmap_data, update)
+        
+        # Roadmap genel ilerlemesini güncelle
+        self._update_roadmap_overall_progress(roadmap_data)
+        rollups = self._record_activity(roadmap_data, activity, previous_overall)
+        
+        self._persist_modules(roadmap_key, [module_progress], rollups)
+        self._publish("module", roadmap_data, modules=[module_progress])
+        
+        return ModuleProgress(**module_progress)
+    
+    def update_modules_batch(self, user_id: str, roadmap_id: str, updates: List[ProgressUpdate]) -> List[ModuleProgress]:
+        """
+        Birden fazla modül güncellemesini sırayla uygula.
         
+        Roadmap toplamları bir kez hesaplanır ve tüm değişiklikler tek bir
+        yazmayla depoya aktarılır. Güncellenen her modül bir kez döndürülür.
+        """
+        with self._locked(user_id):
+            roadmap_key = f"{user_id}_{roadmap_id}"
+            if roadmap_key not in self.progress_data:
+                self._initialize_roadmap_progress(user_id, roadmap_id, 0)
+            
+            roadmap_data = self.progress_data[roadmap_key]
+            previous_overall = roadmap_data.get("overall_progress", 0)
+            
+            changed: Dict[str, Dict] = {}
+            # Etkinlik, modülün toplu güncelleme öncesi ve sonrası hâli arasındaki net farktır
+            previous: Dict[str, Tuple[int, int, int]] = {}
+            for update in updates:
+                if update.module_id not in previous:
+                    existing = self._find_module(roadmap_key, update.module_id)
+                    previous[update.module_id] = self._module_contribution(existing) if existing else (0, 0, 0)
+                module_progress, _ = self._apply_module_update(roadmap_key, roadmap_data, update)
+                changed[update.module_id] = module_progress
+            
+            activities = [self._module_activity(previous[module_id], mp) for module_id, mp in changed.items()]
+            total_minutes = sum(minutes for minutes, _ in activities)
+            total_completed = sum(completed for _, completed in activities)
+            
+            self._update_roadmap_overall_progress(roadmap_data)
+            rollups = self._record_activity(roadmap_data, (total_minutes, total_completed), previous_overall)
+            self._persist_modules(roadmap_key, list(changed.values()), rollups)
+            self._publish("module", roadmap_data, modules=list(changed.values()))
+            
+            results = [ModuleProgress(**mp) for mp in changed.values()]
+        self._checkpoint()
+        return results
+    
+    def _apply_module_update(self, roadmap_key: str, roadmap_data: Dict, update: ProgressUpdate) -> Tuple[Dict, Tuple[int, int]]:
+        """Tek bir güncellemeyi modül kaydına ve artımlı toplamlara uygula"""
         # Modül ilerlemesini bul veya oluştur
-        module_progress = None
-        for mp in roadmap_data.get("module_progress", []):
-            if mp["module_id"] == update.module_id:
-                module_progress = mp
-                break
+        module_progress = self._find_module(roadmap_key, update.module_id)
         
         if not module_progress:
+            previous_contribution = (0, 0, 0)
             module_progress = {
                 "module_id": update.module_id,
-                "roadmap_id": roadmap_id,
-                "user_id": user_id,
+                "roadmap_id": roadmap_data["roadmap_id"],
+                "user_id": roadmap_data["user_id"],
                 "status": update.status.value,
                 "progress_percentage": update.progress_percentage,
                 "time_spent_minutes": update.time_spent_minutes,
@@ -89,9 +629,10 @@ class ProgressService:
                 "notes": update.notes,
                 "quiz_results": []
             }
-            roadmap_data["module_progress"].append(module_progress)
+            self._add_module(roadmap_key, roadmap_data, module_progress)
         else:
             # Mevcut modül ilerlemesini güncelle
+            previous_contribution = self._module_contribution(module_progress)
             module_progress["status"] = update.status.value
             module_progress["progress_percentage"] = update.progress_percentage
             module_progress["time_spent_minutes"] = update.time_spent_minutes
@@ -105,25 +646,25 @@ class ProgressService:
             
             if update.notes:
                 module_progress["notes"] = update.notes
+            
+            self._apply_module_delta(roadmap_key, previous_contribution, module_progress)
         
-        # Roadmap genel ilerlemesini güncelle
-        self._update_roadmap_overall_progress(roadmap_data)
-        
-        self._save_progress_data()
-        
-        return ModuleProgress(**module_progress)
+        return module_progress, self._module_activity(previous_contribution, module_progress)
     
     def _update_roadmap_overall_progress(self, roadmap_data: Dict):
-        """Roadmap genel ilerlemesini hesapla ve güncelle"""
-        module_progresses = roadmap_data.get("module_progress", [])
+        """Roadmap genel ilerlemesini artımlı toplamlardan güncelle"""
+        roadmap_key = f"{roadmap_data['user_id']}_{roadmap_data['roadmap_id']}"
+        aggregate = self._aggregates.get(roadmap_key)
+        if aggregate is None:
+            aggregate = self._recompute_roadmap_aggregates(roadmap_key, roadmap_data)
         
-        if not module_progresses:
+        if not aggregate["modules"]:
             return
         
-        total_modules = len(module_progresses)
-        completed_modules = sum(1 for mp in module_progresses if mp["status"] == ProgressStatus.COMPLETED.value)
-        total_progress = sum(mp["progress_percentage"] for mp in module_progresses)
-        total_time = sum(mp["time_spent_minutes"] for mp in module_progresses)
+        total_modules = aggregate["modules"]
+        completed_modules = aggregate["completed"]
+        total_progress = aggregate["progress_sum"]
+        total_time = aggregate["time_sum"]
         
         overall_progress = total_progress // total_modules if total_modules > 0 else 0
         
@@ -142,65 +683,176 @@ class ProgressService:
                 estimated_completion = datetime.now() + timedelta(minutes=remaining_minutes)
                 roadmap_data["estimated_completion_date"] = estimated_completion.isoformat()
     
+    def has_quiz_key(self, quiz_id: str) -> bool:
+        return self.quiz_engine.get(quiz_id) is not None
+    
     def submit_quiz_result(self, user_id: str, roadmap_id: str, submission: QuizSubmission) -> QuizResult:
-        """Quiz sonucunu kaydet"""
-        # Basit quiz değerlendirme (gerçek uygulamada daha karmaşık olabilir)
-        score = self._evaluate_quiz(submission.answers)
+        """
+        Quiz cevaplarını cevap anahtarıyla puanla ve sonucu kaydet.
         
+        Cevap anahtarı olmayan quizlerde istemcinin gönderdiği puan kullanılır
+        (gönderilmediyse cevaplanan soru oranı); quiz başka bir modüle aitse ValueError.
+        """
+        compiled = self._compiled_quiz(submission.quiz_id, submission.module_id)
+        if compiled is None:
+            grade = self._client_grade(submission)
+        else:
+            grade = compiled.grade(submission.answers)
         quiz_result = QuizResult(
             quiz_id=submission.quiz_id,
             module_id=submission.module_id,
-            score=score,
-            total_questions=len(submission.answers),
-            correct_answers=score,  # Basit hesaplama
+            score=grade["score"],
+            total_questions=grade["total_questions"],
+            correct_answers=grade["correct_answers"],
             completed_at=datetime.now(),
             time_taken_minutes=submission.time_taken_minutes
         )
         
         # Modül ilerlemesine quiz sonucunu ekle
-        roadmap_key = f"{user_id}_{roadmap_id}"
-        if roadmap_key in self.progress_data:
-            roadmap_data = self.progress_data[roadmap_key]
-            
-            for mp in roadmap_data.get("module_progress", []):
-                if mp["module_id"] == submission.module_id:
-                    mp["quiz_results"].append(quiz_result.dict())
-                    
-                    # Quiz sonucuna göre ilerlemeyi güncelle
-                    if score >= 80:  # %80 ve üzeri başarılı
-                        mp["progress_percentage"] = min(100, mp["progress_percentage"] + 20)
-                        if mp["progress_percentage"] >= 100:
-                            mp["status"] = ProgressStatus.COMPLETED.value
-                            mp["completed_at"] = datetime.now().isoformat()
-                    
-                    break
-            
-            self._update_roadmap_overall_progress(roadmap_data)
-            self._save_progress_data()
+        with self._locked(user_id):
+            self._record_quiz_result(user_id, roadmap_id, submission.module_id, quiz_result)
+        self._checkpoint()
         
         return quiz_result
     
-    def _evaluate_quiz(self, answers: Dict[str, str]) -> int:
-        """Quiz cevaplarını değerlendir (basit implementasyon)"""
-        # Gerçek uygulamada burada doğru cevaplarla karşılaştırma yapılır
-        # Şimdilik rastgele bir skor döndürüyoruz
-        import random
-        return random.randint(60, 100)
+    @staticmethod
+    def _client_grade(submission: QuizSubmission) -> Dict[str, int]:
+        """Anahtarsız quiz: istemci puanı (0-100'e sınırlanır) ya da cevaplanan soru oranı"""
+        total_questions = len(submission.answers)
+        if submission.score is not None:
+            score = max(0, min(100, submission.score))
+        else:
+            answered = sum(1 for answer in submission.answers.values() if str(answer).strip())
+            score = round(answered * 100 / total_questions) if total_questions else 0
+        return {
+            "score": score,
+            "total_questions": total_questions,
+            "correct_answers": round(score * total_questions / 100)
+        }
+    
+    def grade_quiz_bulk(self, quiz_id: str, request: QuizBulkGradeRequest) -> Optional[Dict]:
+        """
+        Bir sınavın tüm gönderimlerini tek geçişte puanla.
+        
+        `roadmap_id` verilirse her sonuç ilgili kullanıcının ilerlemesine kaydedilir;
+        o roadmap'te modül kaydı olmayan kullanıcılar `not_recorded` listesinde döner.
+        Cevap anahtarı yoksa None döner.
+        """
+        compiled = self._compiled_quiz(quiz_id, request.module_id)
+        if compiled is None:
+            return None
+        
+        graded = compiled.grade_many([submission.answers for submission in request.submissions])
+        scores = graded["scores"].tolist()
+        correct_answers = graded["correct_answers"].tolist()
+        
+        not_recorded = []
+        if request.roadmap_id:
+            completed_at = datetime.now()
+            for submission, score, correct in zip(request.submissions, scores, correct_answers):
+                quiz_result = QuizResult(
+                    quiz_id=quiz_id,
+                    module_id=request.module_id,
+                    score=score,
+                    total_questions=len(compiled),
+                    correct_answers=correct,
+                    completed_at=completed_at,
+                    time_taken_minutes=submission.time_taken_minutes
+                )
+                with self._locked(submission.user_id):
+                    recorded = self._record_quiz_result(
+                        submission.user_id, request.roadmap_id, request.module_id, quiz_result
+                    )
+                if not recorded:
+                    not_recorded.append(submission.user_id)
+            self._checkpoint()
+        
+        count = len(scores)
+        return {
+            "quiz_id": quiz_id,
+            "graded": count,
+            "recorded": count - len(not_recorded) if request.roadmap_id else 0,
+            "not_recorded": not_recorded,
+            "average_score": round(float(graded["scores"].mean()), 1) if count else 0,
+            "pass_rate": round(float((graded["scores"] >= QUIZ_PASSING_SCORE).mean() * 100), 1) if count else 0,
+            "questions": [
+                {"question_id": question_id, "correct_rate": round(float(rate) * 100, 1)}
+                for question_id, rate in zip(
+                    compiled.question_ids,
+                    graded["correct"].mean(axis=0) if count else [0] * len(compiled)
+                )
+            ],
+            "results": [
+                {
+                    "user_id": submission.user_id,
+                    "score": score,
+                    "correct_answers": correct,
+                    "total_questions": len(compiled),
+                    "passed": score >= QUIZ_PASSING_SCORE
+                }
+                for submission, score, correct in zip(request.submissions, scores, correct_answers)
+            ]
+        }
+    
+    def _compiled_quiz(self, quiz_id: str, module_id: str):
+        """Quiz'in derlenmiş cevap anahtarını getir ve modül eşleşmesini kontrol et"""
+        compiled = self.quiz_engine.get(quiz_id)
+        if compiled is not None and compiled.module_id and compiled.module_id != module_id:
+            raise ValueError("Quiz bu modüle ait değil")
+        return compiled
+    
+    def _record_quiz_result(self, user_id: str, roadmap_id: str, module_id: str, quiz_result: QuizResult) -> bool:
+        """Sonucu modül kaydına ekle; kullanıcının bu roadmap'te modül kaydı yoksa False"""
+        score = quiz_result.score
+        roadmap_key = f"{user_id}_{roadmap_id}"
+        if roadmap_key not in self.progress_data:
+            return False
+        
+        mp = self._find_module(roadmap_key, module_id)
+        if mp is None:
+            # Modül kaydı yoksa hiçbir şey değişmez; kaydetme ve yayın da yapılmaz
+            return False
+        
+        roadmap_data = self.progress_data[roadmap_key]
+        previous_overall = roadmap_data.get("overall_progress", 0)
+        previous_contribution = self._module_contribution(mp)
+        mp["quiz_results"].append(_to_record(quiz_result, ("completed_at",)))
+        
+        # Quiz sonucuna göre ilerlemeyi güncelle
+        if score >= QUIZ_PASSING_SCORE:  # %80 ve üzeri başarılı
+            mp["progress_percentage"] = min(100, mp["progress_percentage"] + 20)
+            if mp["progress_percentage"] >= 100:
+                mp["status"] = ProgressStatus.COMPLETED.value
+                mp["completed_at"] = datetime.now().isoformat()
+        
+        self._apply_module_delta(roadmap_key, previous_contribution, mp)
+        self._update_roadmap_overall_progress(roadmap_data)
+        activity = self._module_activity(previous_contribution, mp)
+        rollups = self._record_activity(roadmap_data, activity, previous_overall)
+        self._persist_modules(roadmap_key, [mp], rollups)
+        self._publish(
+            "quiz", roadmap_data,
+            quiz_result=_to_record(quiz_result, ("completed_at",)),
+            modules=[mp]
+        )
+        return True
     
     def get_user_progress_summary(self, user_id: str) -> Dict:
         """Kullanıcının genel ilerleme özetini getir"""
-        user_roadmaps = []
         total_time_spent = 0
         total_completed_modules = 0
         total_modules = 0
         
-        for key, data in self.progress_data.items():
-            if key.startswith(f"{user_id}_"):
-                roadmap_progress = RoadmapProgress(**data)
-                user_roadmaps.append(roadmap_progress)
-                total_time_spent += roadmap_progress.total_time_spent_minutes
-                total_completed_modules += roadmap_progress.completed_modules
-                total_modules += roadmap_progress.total_modules
+        with self._locked(user_id):
+            user_roadmaps = [
+                self._export_roadmap(self.progress_data[key])
+                for key in self._user_roadmaps.get(user_id, ())
+            ]
+        
+        for roadmap_progress in user_roadmaps:
+            total_time_spent += roadmap_progress["total_time_spent_minutes"]
+            total_completed_modules += roadmap_progress["completed_modules"]
+            total_modules += roadmap_progress["total_modules"]
         
         return {
             "total_roadmaps": len(user_roadmaps),
@@ -208,31 +860,91 @@ class ProgressService:
             "total_completed_modules": total_completed_modules,
             "total_modules": total_modules,
             "overall_completion_rate": (total_completed_modules / total_modules * 100) if total_modules > 0 else 0,
-            "roadmaps": [rp.dict() for rp in user_roadmaps]
+            "roadmaps": user_roadmaps
         }
     
-    def get_weekly_progress(self, user_id: str, roadmap_id: str) -> List[Dict]:
-        """Haftalık ilerleme verilerini getir"""
-        # Son 4 haftanın verilerini simüle et
-        weekly_data = []
-        for week in range(4):
-            week_data = {
-                "week": week + 1,
-                "progress": 0,
-                "time_spent_minutes": 0,
-                "modules_completed": 0
+    def get_progress_analytics(self,
+                               roadmap_id: Optional[str] = None,
+                               inactive_days: int = 14,
+                               limit: int = 50) -> Dict:
+        """Tüm kullanıcılar üzerinden tamamlanma dağılımı, modül süreleri ve terk noktaları"""
+        self._ensure_analytics_complete()
+        if self.archive is None or not len(self.archive):
+            return self.analytics.analyze(roadmap_id, inactive_days=inactive_days, limit=limit)
+        
+        # Arşivdeki roadmap'ler analiz süresince sütunlara eklenip sonra çıkarılır
+        with self._analytics_lock:
+            added = []
+            try:
+                for roadmap_key, roadmap_data in self.archive.iter_records(roadmap_id):
+                    with self._user_locked(roadmap_data["user_id"]):
+                        if roadmap_key not in self.progress_data:
+                            self.analytics.load([(roadmap_key, roadmap_data)])
+                            added.append((roadmap_key, roadmap_data["user_id"]))
+                return self.analytics.analyze(roadmap_id, inactive_days=inactive_days, limit=limit)
+            finally:
+                for roadmap_key, user_id in added:
+                    with self._user_locked(user_id):
+                        # Bu arada geri yüklenen roadmap'in satırları korunur
+                        if roadmap_key not in self.progress_data:
+                            self.analytics.remove_roadmap(roadmap_key)
+    
+    def _ensure_analytics_complete(self):
+        """Tembel yüklemede yüklenmemiş kullanıcıların kayıtlarını bir kez sütunlara ekle"""
+        if self._analytics_complete:
+            return
+        by_user: Dict[str, List[Tuple[str, Dict]]] = {}
+        if self.lazy:
+            for roadmap_key, roadmap_data in self.store.load().items():
+                by_user.setdefault(roadmap_data["user_id"], []).append((roadmap_key, roadmap_data))
+        for user_id, roadmaps in by_user.items():
+            with self._user_locked(user_id):
+                # Bellekteki kayıt depodakinden yeni olabilir; yüklü kullanıcılar zaten güncel
+                if user_id not in self._loaded_users:
+                    self.analytics.load(roadmaps)
+        self._analytics_complete = True
+    
+    def export_progress_records(self,
+                                roadmap_id: Optional[str] = None,
+                                since: Optional[str] = None,
+                                until: Optional[str] = None) -> Iterator[Dict]:
+        """Tüm modül kayıtlarını depodan ve soğuk arşivden akış olarak getir (filtreler depoda uygulanır)"""
+        records = self.store.iter_module_records(roadmap_id, since, until)
+        if self.archive is None:
+            return records
+        archived = (roadmap_data for _, roadmap_data in self.archive.iter_records(roadmap_id, since))
+        return itertools.chain(records, export_rows(archived, roadmap_id, since, until))
+    
+    def get_weekly_progress(self, user_id: str, roadmap_id: str, weeks: int = 4) -> List[Dict]:
+        """Haftalık ilerleme verilerini zaman kovalarından getir (eskiden yeniye)"""
+        with self._locked(user_id):
+            buckets = self.rollups.series(user_id, roadmap_id, "week", weeks)
+        
+        return [
+            {
+                "week": index + 1,
+                "week_start": bucket["period_start"],
+                "progress": bucket["progress_delta"],
+                "time_spent_minutes": bucket["time_spent_minutes"],
+                "modules_completed": bucket["modules_completed"]
             }
-            
-            # Gerçek uygulamada burada veritabanından haftalık veriler çekilir
-            # Şimdilik simüle ediyoruz
-            import random
-            week_data["progress"] = random.randint(10, 30) * (week + 1)
-            week_data["time_spent_minutes"] = random.randint(60, 300)
-            week_data["modules_completed"] = random.randint(0, 2)
-            
-            weekly_data.append(week_data)
+            for index, bucket in enumerate(buckets)
+        ]
+    
+    def get_monthly_progress(self, user_id: str, roadmap_id: str, months: int = 6) -> List[Dict]:
+        """Aylık ilerleme verilerini zaman kovalarından getir (eskiden yeniye)"""
+        with self._locked(user_id):
+            buckets = self.rollups.series(user_id, roadmap_id, "month", months)
         
-        return weekly_data
+        return [
+            {
+                "month": bucket["period_start"][:7],
+                "progress": bucket["progress_delta"],
+                "time_spent_minutes": bucket["time_spent_minutes"],
+                "modules_completed": bucket["modules_completed"]
+            }
+            for bucket in buckets
+        ]
 
-# Global servis instance
-progress_service = ProgressService()
+# Global servis instance (depo uygulama açılışında start() ile açılır)
+progress_service = ProgressService(autostart=False)
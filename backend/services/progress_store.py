@@ -0,0 +1,1726 @@
+"""
+Progress Store - İlerleme verileri için kalıcı depolama katmanı
+"""
+
+import glob
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+import logging
+from abc import ABC, abstractmethod
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Any, Optional, List, Tuple, Callable, Iterable, Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows: süreçler arası kullanıcı kilidi kullanılamaz
+    fcntl = None
+
+try:
+    import msgpack
+except ImportError:  # İkili snapshot kayıtları bu durumda JSON ile kodlanır
+    msgpack = None
+
+from services.progress_rollups import RollupRow
+
+logger = logging.getLogger(__name__)
+
+class ProgressStore(ABC):
+    """
+    ProgressService için depolama arayüzü.
+
+    Kayıtlar servisin kullandığı düz sözlük biçimindedir ve
+    `f"{user_id}_{roadmap_id}"` anahtarıyla adreslenir.
+    """
+
+    # True ise servis tüm veriyi açılışta değil, kullanıcı ilk erişildiğinde yükler
+    supports_lazy_load = False
+
+    @abstractmethod
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """Tüm roadmap ilerleme kayıtlarını yükler"""
+        pass
+
+    @abstractmethod
+    def save_roadmap(self, key: str, roadmap_data: Dict[str, Any]):
+        """Roadmap üst bilgisini (modüller hariç) kaydeder"""
+        pass
+
+    @abstractmethod
+    def save_module(self, key: str, module_data: Dict[str, Any]):
+        """Tek bir modül kaydını (quiz sonuçlarıyla) kaydeder"""
+        pass
+
+    @abstractmethod
+    def delete_roadmap(self, key: str, roadmap_data: Dict[str, Any]):
+        """Roadmap kaydını siler"""
+        pass
+
+    def checkpoint(self, snapshot_source: Callable[[], Dict[str, Dict[str, Any]]]):
+        """
+        Gerekirse depoyu sıkıştırır (ör. snapshot alır).
+
+        `snapshot_source` yalnızca snapshot gerçekten alınacaksa çağrılır ve
+        tutarlı bir veri kopyası döndürmelidir; depo onu arka plandaki bir iş
+        parçacığından çağırabilir.
+        """
+        pass
+
+    def compact(self, snapshot_source: Callable[[], Dict[str, Dict[str, Any]]]):
+        """Depoyu koşulsuz olarak sıkıştırır"""
+        pass
+
+    def user_lock(self, user_id: str):
+        """Süreçler arası kullanıcı kilidi (varsayılan: kilit yok)"""
+        return nullcontext()
+
+    def save_rollups(self, rows: List[RollupRow]):
+        """Zaman kovalarının güncel değerlerini kaydeder"""
+        pass
+
+    def load_rollups(self, user_id: Optional[str] = None) -> List[RollupRow]:
+        """Kayıtlı zaman kovalarını (isteğe bağlı olarak tek kullanıcı için) yükler"""
+        return []
+
+    def save_batch(self,
+                   roadmaps: List[Tuple[str, Dict[str, Any]]],
+                   modules: List[Tuple[str, Dict[str, Any]]],
+                   rollups: List[RollupRow] = ()):
+        """Birden fazla kaydı tek seferde yazar (varsayılan: tek tek)"""
+        for key, module_data in modules:
+            self.save_module(key, module_data)
+        for key, roadmap_data in roadmaps:
+            self.save_roadmap(key, roadmap_data)
+        if rollups:
+            self.save_rollups(list(rollups))
+
+    def iter_module_records(self,
+                            roadmap_id: Optional[str] = None,
+                            since: Optional[str] = None,
+                            until: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Dışa aktarma için modül satırlarını `EXPORT_FIELDS` biçiminde üretir.
+
+        `since` (dahil) ve `until` (hariç) modülün son etkinlik zamanına ISO
+        metin olarak uygulanır. Varsayılan uygulama tüm veriyi yükler; sabit
+        bellekle akış için depolar bu yöntemi kendi okuma yoluyla yeniden tanımlar.
+        """
+        yield from export_rows(self.load().values(), roadmap_id, since, until)
+
+    def flush(self, sync: bool = True):
+        """Tamponlanmış yazmaları diske aktarır; sync=True ise fsync yapar"""
+        pass
+
+    def close(self):
+        """Depoyu kapatır"""
+        pass
+
+class ProgressEventLog(ProgressStore):
+    """
+    İlerleme verilerini anlık görüntü (snapshot) + append-only olay günlüğü olarak saklar.
+
+    Her güncelleme günlüğe tek satırlık kompakt bir kayıt olarak eklenir; tüm
+    veri yalnızca `snapshot_every` kayıtta bir (veya kapanışta) yeniden yazılır.
+    Açılışta son snapshot yüklenir ve günlüğün kalanı üzerine uygulanır.
+
+    Snapshot sırasında günlük yeni bir nesle döndürülür (ör. user_progress.log.3);
+    snapshot hangi nesle kadar olan olayları içerdiğini `__log_generation__`
+    alanında saklar. Böylece snapshot alınırken gelen yazmalar bekletilmez ve
+    yarıda kalan bir snapshot veri kaybına yol açmaz. Eşiği aşan yazma snapshot'ı
+    kendisi almaz; ayrı bir snapshot iş parçacığına haber verir.
+    """
+
+    GENERATION_KEY = "__log_generation__"
+    ROLLUPS_KEY = "__rollups__"
+
+    def __init__(self,
+                 snapshot_file: str = "user_progress.json",
+                 log_file: Optional[str] = None,
+                 snapshot_every: int = 1000,
+                 sync_every: int = 32):
+        """
+        Args:
+            snapshot_file: Sıkıştırılmış snapshot dosyası
+            log_file: Olay günlüğü dosyası (varsayılan: snapshot adı + .log)
+            snapshot_every: Kaç olayda bir snapshot alınacağı
+            sync_every: Kaç olayda bir günlüğün diske fsync edileceği
+        """
+        self.snapshot_file = snapshot_file
+        self.log_file = log_file or f"{os.path.splitext(snapshot_file)[0]}.log"
+        self.snapshot_every = snapshot_every
+        self.sync_every = sync_every
+
+        self._events_since_snapshot = 0
+        self._events_since_sync = 0
+        self._generation = 0
+        self._rollups: Dict[Tuple[str, str, str, int], List[int]] = {}
+        self._log = None
+        self._lock = threading.RLock()
+        self._snapshot_lock = threading.Lock()
+        # Eşik aşıldığında snapshot'ı alan iş parçacığı (ilk istekte başlatılır)
+        self._snapshot_requested = threading.Event()
+        self._snapshot_source: Optional[Callable[[], Dict[str, Dict[str, Any]]]] = None
+        self._snapshot_thread: Optional[threading.Thread] = None
+        self._snapshot_stopped = False
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """Son snapshot'ı yükler ve günlükteki olayları üzerine uygular"""
+        data: Dict[str, Dict[str, Any]] = {}
+
+        if os.path.exists(self.snapshot_file):
+            try:
+                with open(self.snapshot_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except Exception as e:
+                logger.error(f"İlerleme snapshot'ı okunamadı: {e}")
+                data = {}
+
+        covered_generation = int(data.pop(self.GENERATION_KEY, 0) or 0)
+        self._generation = covered_generation
+        self._rollups = {}
+        self._apply_rollups(data.pop(self.ROLLUPS_KEY, []))
+
+        replayed = 0
+        for event in self._uncovered_events(covered_generation):
+            if event.get("op") == "rollup":
+                self._apply_rollups(event.get("data") or [])
+            else:
+                self.apply_event(data, event)
+            replayed += 1
+
+        self._events_since_snapshot = replayed
+        if replayed:
+            logger.info(f"İlerleme günlüğünden {replayed} olay yeniden uygulandı")
+
+        return data
+
+    def _uncovered_events(self, covered_generation: int):
+        """Snapshot'ın kapsamadığı günlük nesillerindeki olayları sırayla döndürür"""
+        for generation, segment in self._rotated_segments():
+            if generation < covered_generation:
+                # Snapshot bu nesli zaten içeriyor
+                self._remove_quietly(segment)
+                continue
+            yield from self._read_events(segment)
+            self._generation = max(self._generation, generation + 1)
+
+        if os.path.exists(self.log_file):
+            yield from self._read_events(self.log_file)
+
+    @staticmethod
+    def _read_events(path: str):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # Çökme sırasında yarım kalmış son satır
+                    logger.warning("İlerleme günlüğünde bozuk kayıt atlandı")
+
+    def _rotated_segments(self) -> List[Tuple[int, str]]:
+        segments = []
+        for path in glob.glob(f"{glob.escape(self.log_file)}.*"):
+            suffix = path[len(self.log_file) + 1:]
+            if suffix.isdigit():
+                segments.append((int(suffix), path))
+        return sorted(segments)
+
+    @staticmethod
+    def apply_event(data: Dict[str, Dict[str, Any]], event: Dict[str, Any]):
+        """Tek bir olayı bellek içi veriye uygular (idempotent)"""
+        op = event.get("op")
+        key = event.get("key")
+        payload = event.get("data") or {}
+
+        if op == "roadmap":
+            entry = data.setdefault(key, {"module_progress": []})
+            entry.update(payload)
+        elif op == "module":
+            entry = data.setdefault(key, {"module_progress": []})
+            modules = entry.setdefault("module_progress", [])
+            for i, mp in enumerate(modules):
+                if mp["module_id"] == payload["module_id"]:
+                    modules[i] = payload
+                    break
+            else:
+                modules.append(payload)
+        elif op == "delete":
+            data.pop(key, None)
+
+    def save_roadmap(self, key: str, roadmap_data: Dict[str, Any]):
+        """Roadmap üst bilgisini (modüller hariç) günlüğe ekler"""
+        header = {k: v for k, v in roadmap_data.items() if k != "module_progress"}
+        self._append({"op": "roadmap", "key": key, "user": roadmap_data["user_id"], "data": header})
+
+    def save_module(self, key: str, module_data: Dict[str, Any]):
+        """Tek bir modül kaydını günlüğe ekler"""
+        self._append({"op": "module", "key": key, "user": module_data["user_id"], "data": module_data})
+
+    def delete_roadmap(self, key: str, roadmap_data: Dict[str, Any]):
+        """Roadmap kaydının silindiğini günlüğe ekler"""
+        self._append({"op": "delete", "key": key, "user": roadmap_data["user_id"]})
+
+    def save_rollups(self, rows: List[RollupRow]):
+        """Kova değerlerini tek bir günlük kaydı olarak ekler"""
+        if rows:
+            self.save_batch([], [], rows)
+
+    def load_rollups(self, user_id: Optional[str] = None) -> List[RollupRow]:
+        with self._lock:
+            return [(key[0], key[1], key[2], key[3], tuple(values))
+                    for key, values in self._rollups.items()
+                    if user_id is None or key[0] == user_id]
+
+    def _apply_rollups(self, encoded: List[List[Any]]):
+        for user_id, roadmap_id, granularity, bucket, values in encoded:
+            self._rollups[(user_id, roadmap_id, granularity, bucket)] = values
+
+    def iter_module_records(self,
+                            roadmap_id: Optional[str] = None,
+                            since: Optional[str] = None,
+                            until: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Snapshot'ı roadmap roadmap okur, günlükteki olayları yalnızca etkilenen roadmap'lere uygular.
+
+        Dosyalar kilit altında açılır, okuma o anki görüntü üzerinden kilitsiz yapılır;
+        deponun durumu değiştirilmez. Bellekte bir roadmap ile son snapshot'tan sonraki
+        olaylar tutulur.
+        """
+        snapshot = None
+        segments = []
+        try:
+            with self._snapshot_lock, self._lock:
+                self.flush(sync=False)
+                # Açık dosyalar döndürme ve silmeden etkilenmez; günlük şu anki boyutuna kadar okunur
+                for _, segment in self._rotated_segments():
+                    segments.append((open(segment, 'rb'), None))
+                if os.path.exists(self.log_file):
+                    segments.append((open(self.log_file, 'rb'), os.path.getsize(self.log_file)))
+                if os.path.exists(self.snapshot_file):
+                    snapshot = open(self.snapshot_file, 'r', encoding='utf-8')
+
+            pending: Dict[str, List[Dict[str, Any]]] = {}
+            for handle, size in segments:
+                for event in self._decode_events(handle.read() if size is None else handle.read(size)):
+                    if event.get("op") != "rollup":
+                        pending.setdefault(event.get("key"), []).append(event)
+                handle.close()
+
+            if snapshot is not None:
+                for key, roadmap_data in _iter_json_object(snapshot):
+                    if key in (self.GENERATION_KEY, self.ROLLUPS_KEY):
+                        continue
+                    roadmap_data = self._replay(key, roadmap_data, pending.pop(key, ()))
+                    if roadmap_data is not None:
+                        yield from export_rows((roadmap_data,), roadmap_id, since, until)
+
+            for key, events in pending.items():
+                roadmap_data = self._replay(key, None, events)
+                if roadmap_data is not None:
+                    yield from export_rows((roadmap_data,), roadmap_id, since, until)
+        finally:
+            for handle, _ in segments:
+                handle.close()
+            if snapshot is not None:
+                snapshot.close()
+
+    def _replay(self, key: str, roadmap_data: Optional[Dict[str, Any]], events) -> Optional[Dict[str, Any]]:
+        """Tek bir roadmap'in olaylarını sırayla uygular (silinmişse None)"""
+        data = {key: roadmap_data} if roadmap_data is not None else {}
+        for event in events:
+            self.apply_event(data, event)
+        return data.get(key)
+
+    @staticmethod
+    def _decode_events(raw: bytes):
+        for line in raw.splitlines():
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning("İlerleme günlüğünde bozuk kayıt atlandı")
+
+    def should_snapshot(self) -> bool:
+        return self._events_since_snapshot >= self.snapshot_every
+
+    def checkpoint(self, snapshot_source: Callable[[], Dict[str, Dict[str, Any]]]):
+        """Günlük yeterince uzadıysa snapshot'ı snapshot iş parçacığına bırakır (beklemez)"""
+        if not self.should_snapshot():
+            return
+        with self._lock:
+            self._snapshot_source = snapshot_source
+            if self._snapshot_thread is None and not self._snapshot_stopped:
+                self._snapshot_thread = threading.Thread(
+                    target=self._snapshot_loop, name="progress-snapshot", daemon=True
+                )
+                self._snapshot_thread.start()
+        self._snapshot_requested.set()
+
+    def _snapshot_loop(self):
+        while True:
+            self._snapshot_requested.wait()
+            self._snapshot_requested.clear()
+            if self._snapshot_stopped:
+                return
+            try:
+                self.write_snapshot(self._snapshot_source)
+            except Exception as e:
+                logger.error(f"İlerleme snapshot'ı alınamadı: {e}")
+
+    def _stop_snapshots(self):
+        """Snapshot iş parçacığını durdurur; süren snapshot bitene kadar bekler (kilit dışında çağrılır)"""
+        self._snapshot_stopped = True
+        self._snapshot_requested.set()
+        thread = self._snapshot_thread
+        if thread is not None:
+            thread.join()
+            self._snapshot_thread = None
+
+    def compact(self, snapshot_source: Callable[[], Dict[str, Dict[str, Any]]]):
+        self.write_snapshot(snapshot_source)
+
+    def write_snapshot(self, snapshot_source: Callable[[], Dict[str, Dict[str, Any]]], wait: bool = True):
+        """
+        Günlüğü döndürür, verinin kopyasını atomik olarak snapshot dosyasına yazar
+        ve artık gerekmeyen günlük nesillerini siler.
+        """
+        if not self._snapshot_lock.acquire(blocking=wait):
+            # Başka bir iş parçacığı zaten snapshot alıyor
+            return
+        try:
+            with self._lock:
+                covered_generation = self._rotate_log()
+                rollups = [list(key) + [values] for key, values in self._rollups.items()]
+
+            # Döndürmeden önceki tüm olaylar bellekte uygulanmış durumda
+            data = dict(snapshot_source())
+            data[self.GENERATION_KEY] = covered_generation
+            data[self.ROLLUPS_KEY] = rollups
+
+            tmp_file = f"{self.snapshot_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, separators=(',', ':'), default=str)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.snapshot_file)
+
+            self._remove_covered_segments(covered_generation)
+        finally:
+            self._snapshot_lock.release()
+
+    def _rotate_log(self) -> int:
+        """Günlüğü yeni nesle döndürür; snapshot'ın kapsayacağı nesil sınırını döndürür (kilit altında)"""
+        self.flush()
+        self._close_log()
+        if os.path.exists(self.log_file):
+            os.replace(self.log_file, f"{self.log_file}.{self._generation}")
+        self._generation += 1
+        self._events_since_snapshot = 0
+        self._events_since_sync = 0
+        return self._generation
+
+    def _remove_covered_segments(self, covered_generation: int):
+        for generation, segment in self._rotated_segments():
+            if generation < covered_generation:
+                self._remove_quietly(segment)
+
+    def save_batch(self,
+                   roadmaps: List[Tuple[str, Dict[str, Any]]],
+                   modules: List[Tuple[str, Dict[str, Any]]],
+                   rollups: List[RollupRow] = ()):
+        """Tüm kayıtları günlüğe yazar; fsync en fazla bir kez yapılır"""
+        with self._lock:
+            for key, module_data in modules:
+                self._append({"op": "module", "key": key, "user": module_data["user_id"], "data": module_data},
+                             flush=False)
+            if rollups:
+                encoded = [[user_id, roadmap_id, granularity, bucket, list(values)]
+                           for user_id, roadmap_id, granularity, bucket, values in rollups]
+                self._apply_rollups(encoded)
+                self._append({"op": "rollup", "data": encoded}, flush=False)
+            for key, roadmap_data in roadmaps:
+                header = {k: v for k, v in roadmap_data.items() if k != "module_progress"}
+                self._append({"op": "roadmap", "key": key, "user": roadmap_data["user_id"], "data": header},
+                             flush=False)
+
+            if self._log is not None:
+                self._log.flush()
+                if self._events_since_sync >= self.sync_every:
+                    self.flush()
+
+    def flush(self, sync: bool = True):
+        """Tamponlanmış günlük kayıtlarını diske yazar"""
+        with self._lock:
+            if self._log is None:
+                return
+            self._log.flush()
+            if sync:
+                os.fsync(self._log.fileno())
+                self._events_since_sync = 0
+
+    def close(self):
+        self._stop_snapshots()
+        with self._lock:
+            self.flush()
+            self._close_log()
+
+    def _append(self, event: Dict[str, Any], flush: bool = True):
+        with self._lock:
+            if self._log is None:
+                self._log = open(self.log_file, 'a', encoding='utf-8')
+            self._log.write(json.dumps(event, separators=(',', ':'), default=str))
+            self._log.write("\n")
+
+            self._events_since_snapshot += 1
+            self._events_since_sync += 1
+            if not flush:
+                return
+            self._log.flush()
+            if self._events_since_sync >= self.sync_every:
+                self.flush()
+
+    def _close_log(self):
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    @staticmethod
+    def _remove_quietly(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+ROADMAP_COLUMNS = [
+    "overall_progress", "completed_modules", "total_modules", "total_time_spent_minutes",
+    "started_at", "estimated_completion_date", "last_activity"
+]
+
+MODULE_COLUMNS = [
+    "status", "progress_percentage", "time_spent_minutes",
+    "started_at", "completed_at", "last_activity", "notes"
+]
+
+QUIZ_COLUMNS = [
+    "quiz_id", "score", "total_questions", "correct_answers", "completed_at", "time_taken_minutes"
+]
+
+# Dışa aktarılan modül satırının alanları (CSV başlığı bu sırayla yazılır)
+EXPORT_FIELDS = (
+    "user_id", "roadmap_id", "module_id", "status", "progress_percentage", "time_spent_minutes",
+    "started_at", "completed_at", "last_activity", "notes", "quiz_attempts", "best_quiz_score"
+)
+
+def export_rows(roadmaps: Iterable[Dict[str, Any]],
+                roadmap_id: Optional[str],
+                since: Optional[str],
+                until: Optional[str]) -> Iterator[Dict[str, Any]]:
+    """Bellekteki roadmap kayıtlarını filtreleyip dışa aktarma satırlarına çevirir"""
+    for roadmap_data in roadmaps:
+        if roadmap_id is not None and roadmap_data.get("roadmap_id") != roadmap_id:
+            continue
+        for mp in roadmap_data.get("module_progress", []):
+            last_activity = mp.get("last_activity")
+            if isinstance(last_activity, str) and len(last_activity) > 10 and last_activity[10] == " ":
+                last_activity = f"{last_activity[:10]}T{last_activity[11:]}"
+            if since is not None and (last_activity is None or last_activity < since):
+                continue
+            if until is not None and (last_activity is None or last_activity >= until):
+                continue
+            quiz_results = mp.get("quiz_results") or []
+            row = {field: mp.get(field) for field in EXPORT_FIELDS}
+            row["status"] = getattr(row["status"], "value", row["status"])
+            row["last_activity"] = last_activity
+            row["quiz_attempts"] = len(quiz_results)
+            row["best_quiz_score"] = max((quiz["score"] for quiz in quiz_results), default=None)
+            yield row
+
+def _iter_json_object(f, chunk_size: int = 1 << 16) -> Iterator[Tuple[str, Any]]:
+    """
+    Dosyadaki tek bir JSON nesnesinin üst düzey (anahtar, değer) çiftlerini sırayla üretir.
+
+    Dosya parça parça okunur; bellekte aynı anda yalnızca bir değer bulunur.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def refill() -> bool:
+        nonlocal buffer, pos, eof
+        if eof:
+            return False
+        # Büyük değerlerde okunan parça büyütülür; yeniden ayrıştırma toplamda doğrusal kalır
+        chunk = f.read(max(chunk_size, len(buffer) - pos))
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        eof = not chunk
+        return not eof
+
+    def skip_space():
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buffer) or not refill():
+                return
+
+    def decode():
+        nonlocal pos
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if refill():
+                    continue
+                raise
+            # Parçanın sonunda biten sayı yarım okunmuş olabilir
+            if end == len(buffer) and refill():
+                continue
+            pos = end
+            return value
+
+    skip_space()
+    if pos >= len(buffer):
+        return
+    if buffer[pos] != "{":
+        raise ValueError("Snapshot bir JSON nesnesi değil")
+    pos += 1
+    while True:
+        skip_space()
+        if pos >= len(buffer):
+            raise ValueError("Snapshot beklenmedik şekilde bitti")
+        if buffer[pos] == "}":
+            return
+        if buffer[pos] == ",":
+            pos += 1
+            skip_space()
+        key = decode()
+        skip_space()
+        if pos >= len(buffer) or buffer[pos] != ":":
+            raise ValueError("Snapshot anahtarından sonra ':' bekleniyordu")
+        pos += 1
+        skip_space()
+        yield key, decode()
+
+class BinarySnapshotStore(ProgressEventLog):
+    """
+    Olay günlüğünü kullanıcı başına kayıtlardan oluşan ikili bir snapshot ile birleştirir.
+
+    Snapshot düzeni:
+        başlık | [u32 uzunluk][kayıt] ... | kullanıcı anahtarları | sıralı ofset indeksi
+
+    Her kayıt tek bir kullanıcının roadmap'lerini ve zaman kovalarını içerir
+    (msgpack kuruluysa msgpack, değilse kompakt JSON). Dosya mmap ile açılır ve
+    kullanıcı kaydı indekste ikili arama ile bulunur; açılışta yalnızca başlık
+    ve son snapshot'tan sonraki günlük okunur. Snapshot, servisteki verinin
+    kopyası yerine eski snapshot + bekleyen olaylardan üretilir: olayı olmayan
+    kullanıcıların kayıtları çözülmeden kopyalanır.
+    """
+
+    MAGIC = b"MWPPROG1"
+    # sihirli değer, kodlayıcı, günlük nesli, kullanıcı sayısı, indeks ofseti, anahtar ofseti
+    HEADER = struct.Struct("<8sc7xQQQQ")
+    # anahtar ofseti, anahtar uzunluğu, kayıt ofseti
+    ENTRY = struct.Struct("<QIQ")
+    LENGTH = struct.Struct("<I")
+
+    supports_lazy_load = True
+
+    def __init__(self,
+                 snapshot_file: str = "user_progress.bin",
+                 log_file: Optional[str] = None,
+                 legacy_json_file: Optional[str] = "user_progress.json",
+                 snapshot_every: int = 1000,
+                 sync_every: int = 32,
+                 codec: Optional[str] = None):
+        """
+        Args:
+            snapshot_file: İkili snapshot dosyası
+            log_file: Olay günlüğü dosyası (varsayılan: snapshot adı + .log)
+            legacy_json_file: İkili snapshot yoksa dönüştürülecek JSON snapshot
+            snapshot_every: Kaç olayda bir snapshot alınacağı
+            sync_every: Kaç olayda bir günlüğün diske fsync edileceği
+            codec: Kayıt kodlayıcısı ("m": msgpack, "j": JSON; varsayılan: kuruluysa msgpack)
+        """
+        super().__init__(snapshot_file, log_file, snapshot_every, sync_every)
+        self.legacy_json_file = legacy_json_file
+        self.codec = codec or ("m" if msgpack is not None else "j")
+        if self.codec == "m" and msgpack is None:
+            raise ValueError("msgpack kodlayıcısı için msgpack paketi kurulu olmalı")
+
+        self._reader: Optional[_SnapshotReader] = None
+        # Snapshot'tan sonra gelen olaylar, kullanıcıya göre gruplanmış
+        self._pending: Dict[str, List[Dict[str, Any]]] = {}
+        # Yazılmakta olan snapshot'ın kapsadığı olaylar (dosya değişene kadar görünür kalır)
+        self._inflight: Dict[str, List[Dict[str, Any]]] = {}
+        self._open()
+
+    def _open(self):
+        if not os.path.exists(self.snapshot_file) and self.legacy_json_file \
+                and os.path.exists(self.legacy_json_file):
+            self._convert_legacy_json()
+
+        covered_generation = 0
+        if os.path.exists(self.snapshot_file):
+            self._reader = _SnapshotReader(self.snapshot_file, self)
+            covered_generation = self._reader.generation
+        self._generation = covered_generation
+
+        replayed = 0
+        for event in self._uncovered_events(covered_generation):
+            self._track_pending(event)
+            replayed += 1
+        self._events_since_snapshot = replayed
+
+    def _convert_legacy_json(self):
+        """JSON snapshot + günlüğü bir kez ikili snapshot'a dönüştürür"""
+        legacy = ProgressEventLog(self.legacy_json_file, log_file=self.log_file)
+        data = legacy.load()
+
+        users: Dict[str, Dict[str, Any]] = {}
+        for key, roadmap_data in data.items():
+            users.setdefault(roadmap_data["user_id"], {"roadmaps": {}, "rollups": []})["roadmaps"][key] = roadmap_data
+        for user_id, roadmap_id, granularity, bucket, values in legacy.load_rollups():
+            users.setdefault(user_id, {"roadmaps": {}, "rollups": []})["rollups"].append(
+                [roadmap_id, granularity, bucket, list(values)]
+            )
+
+        covered_generation = legacy._generation + 1
+        self._write_file(
+            covered_generation,
+            ((user_id, self._encode(users[user_id])) for user_id in self._sorted_users(users))
+        )
+        self._remove_quietly(self.log_file)
+        legacy._remove_covered_segments(covered_generation)
+        logger.info(f"{len(data)} roadmap ilerlemesi JSON snapshot'ından ikili snapshot'a dönüştürüldü")
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """Tüm kullanıcıların kayıtlarını yükler (tembel yükleme kullanılmıyorsa)"""
+        data: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for user_id in self._all_users():
+                data.update(self._materialize(user_id)["roadmaps"])
+        return data
+
+    def load_user(self, user_id: str) -> Dict[str, Dict[str, Any]]:
+        """Tek bir kullanıcının kaydını indeksten bulup bekleyen olaylarla birleştirir"""
+        with self._lock:
+            return self._materialize(user_id)["roadmaps"]
+
+    def load_rollups(self, user_id: Optional[str] = None) -> List[RollupRow]:
+        with self._lock:
+            users = self._all_users() if user_id is None else [user_id]
+            return [
+                (uid, roadmap_id, granularity, bucket, tuple(values))
+                for uid in users
+                for roadmap_id, granularity, bucket, values in self._materialize(uid)["rollups"]
+            ]
+
+    def iter_module_records(self,
+                            roadmap_id: Optional[str] = None,
+                            since: Optional[str] = None,
+                            until: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Kullanıcı kayıtlarını snapshot indeksinden teker teker çözerek satır üretir"""
+        with self._lock:
+            users = self._all_users()
+        for user_id in users:
+            with self._lock:
+                roadmaps = self._materialize(user_id)["roadmaps"]
+            yield from export_rows(roadmaps.values(), roadmap_id, since, until)
+
+    def write_snapshot(self, snapshot_source: Optional[Callable[[], Dict[str, Dict[str, Any]]]] = None,
+                       wait: bool = True):
+        """
+        Eski snapshot ve bekleyen olaylardan yeni bir ikili snapshot üretir.
+
+        `snapshot_source` kullanılmaz; bellekte yüklü olmayan kullanıcılar da
+        snapshot'a dahil edilmelidir.
+        """
+        if not self._snapshot_lock.acquire(blocking=wait):
+            return
+        try:
+            with self._lock:
+                covered_generation = self._rotate_log()
+                self._inflight = self._pending
+                self._pending = {}
+                reader = self._reader
+                inflight = self._inflight
+                users = self._all_users()
+
+            def records():
+                for user_id in users:
+                    if reader is None or user_id in inflight or reader.codec != self.codec:
+                        record = self._merge(user_id, reader, (inflight.get(user_id, ()),))
+                        if record["roadmaps"] or record["rollups"]:
+                            yield user_id, self._encode(record)
+                    else:
+                        yield user_id, reader.raw(user_id)
+
+            self._write_file(covered_generation, records())
+            new_reader = _SnapshotReader(self.snapshot_file, self)
+
+            with self._lock:
+                self._reader = new_reader
+                self._inflight = {}
+            if reader is not None:
+                reader.close()
+
+            self._remove_covered_segments(covered_generation)
+        finally:
+            self._snapshot_lock.release()
+
+    def close(self):
+        self._stop_snapshots()
+        with self._lock:
+            super().close()
+            if self._reader is not None:
+                self._reader.close()
+                self._reader = None
+
+    def _append(self, event: Dict[str, Any], flush: bool = True):
+        with self._lock:
+            super()._append(event, flush)
+            self._track_pending(event)
+
+    def _apply_rollups(self, encoded: List[List[Any]]):
+        # Kovalar kullanıcı bazlı bekleyen olaylarda tutulur
+        pass
+
+    def _track_pending(self, event: Dict[str, Any]):
+        if event.get("op") == "rollup":
+            by_user: Dict[str, List[List[Any]]] = {}
+            for row in event.get("data") or []:
+                by_user.setdefault(row[0], []).append(row)
+            for user_id, rows in by_user.items():
+                self._pending.setdefault(user_id, []).append({"op": "rollup", "data": rows})
+            return
+
+        user_id = event.get("user") or (event.get("data") or {}).get("user_id")
+        if user_id is None:
+            logger.warning("Kullanıcısı bilinmeyen ilerleme olayı atlandı")
+            return
+        self._pending.setdefault(user_id, []).append(event)
+
+    def _all_users(self) -> List[str]:
+        users = set(self._pending) | set(self._inflight)
+        if self._reader is not None:
+            users.update(self._reader.users())
+        return self._sorted_users(users)
+
+    @staticmethod
+    def _sorted_users(users) -> List[str]:
+        # İndeks, ikili aramanın kullandığı UTF-8 bayt sırasıyla yazılır
+        return sorted(users, key=lambda user_id: user_id.encode('utf-8'))
+
+    def _materialize(self, user_id: str) -> Dict[str, Any]:
+        """Kullanıcının güncel kaydını üretir (kilit altında çağrılır)"""
+        return self._merge(
+            user_id, self._reader, (self._inflight.get(user_id, ()), self._pending.get(user_id, ()))
+        )
+
+    def _merge(self, user_id: str, reader: Optional["_SnapshotReader"], event_lists) -> Dict[str, Any]:
+        """Snapshot kaydını ve verilen olayları birleştirir"""
+        raw = reader.raw(user_id) if reader is not None else None
+        record = reader.decode(raw) if raw is not None else {"roadmaps": {}, "rollups": []}
+
+        if any(event_lists):
+            roadmaps = record["roadmaps"]
+            rollups = {(row[0], row[1], row[2]): row[3] for row in record["rollups"]}
+            for events in event_lists:
+                for event in events:
+                    if event["op"] == "rollup":
+                        for _, roadmap_id, granularity, bucket, values in event["data"]:
+                            rollups[(roadmap_id, granularity, bucket)] = values
+                    else:
+                        self.apply_event(roadmaps, event)
+            record["rollups"] = [[r, g, b, values] for (r, g, b), values in rollups.items()]
+
+        return record
+
+    def _encode(self, record: Dict[str, Any]) -> bytes:
+        if self.codec == "m":
+            return msgpack.packb(record, use_bin_type=True, default=str)
+        return json.dumps(record, separators=(',', ':'), default=str).encode('utf-8')
+
+    def _write_file(self, generation: int, records):
+        """Kayıtları, anahtarları ve indeksi geçici dosyaya yazıp atomik olarak yerine koyar"""
+        tmp_file = f"{self.snapshot_file}.tmp"
+        keys = bytearray()
+        entries = []
+        with open(tmp_file, 'wb') as f:
+            f.write(bytes(self.HEADER.size))
+            for user_id, payload in records:
+                key = user_id.encode('utf-8')
+                entries.append((len(keys), len(key), f.tell()))
+                keys += key
+                f.write(self.LENGTH.pack(len(payload)))
+                f.write(payload)
+
+            keys_offset = f.tell()
+            f.write(keys)
+            index_offset = f.tell()
+            for entry in entries:
+                f.write(self.ENTRY.pack(*entry))
+
+            f.seek(0)
+            f.write(self.HEADER.pack(self.MAGIC, self.codec.encode('ascii'), generation,
+                                     len(entries), index_offset, keys_offset))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.snapshot_file)
+
+
+class _SnapshotReader:
+    """İkili snapshot dosyasını mmap ile açar; kullanıcı kayıtlarını ikili aramayla bulur"""
+
+    def __init__(self, path: str, store: BinarySnapshotStore):
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, codec, self.generation, self.count, self._index_offset, self._keys_offset = \
+            store.HEADER.unpack_from(self._map, 0)
+        if magic != store.MAGIC:
+            self.close()
+            raise ValueError(f"Geçersiz ilerleme snapshot dosyası: {path}")
+        self.codec = codec.decode('ascii')
+        if self.codec == "m" and msgpack is None:
+            self.close()
+            raise RuntimeError("Snapshot msgpack ile yazılmış; msgpack paketi kurulu olmalı")
+        self._entry = store.ENTRY
+        self._length = store.LENGTH
+
+    def raw(self, user_id: str) -> Optional[bytes]:
+        """Kullanıcının kodlanmış kaydını döndürür (yoksa None)"""
+        key = user_id.encode('utf-8')
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            entry_key, record_offset = self._entry_at(middle)
+            if entry_key < key:
+                low = middle + 1
+            elif entry_key > key:
+                high = middle
+            else:
+                (length,) = self._length.unpack_from(self._map, record_offset)
+                start = record_offset + self._length.size
+                return self._map[start:start + length]
+        return None
+
+    def users(self) -> List[str]:
+        return [self._entry_at(i)[0].decode('utf-8') for i in range(self.count)]
+
+    def decode(self, raw: bytes) -> Dict[str, Any]:
+        if self.codec == "m":
+            return msgpack.unpackb(raw, raw=False, strict_map_key=False)
+        return json.loads(raw)
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def _entry_at(self, index: int) -> Tuple[bytes, int]:
+        key_offset, key_length, record_offset = self._entry.unpack_from(
+            self._map, self._index_offset + index * self._entry.size
+        )
+        start = self._keys_offset + key_offset
+        return self._map[start:start + key_length], record_offset
+
+
+class SQLiteProgressStore(ProgressStore):
+    """
+    İlerleme verilerini gömülü bir SQLite veritabanında (WAL modu) saklar.
+
+    Veriler roadmap_progress, module_progress ve quiz_result tablolarına
+    normalize edilir; kullanıcı ve roadmap bazlı sorgular indekslerle yapılır.
+    Veritabanı boşsa mevcut JSON snapshot + günlük otomatik olarak taşınır.
+
+    Okumalar iş parçacığı başına açılan bağlantılarla kilitsiz yapılır (WAL her
+    okumaya tutarlı bir görüntü verir). Yazmalar tek bağlantı üzerinden `_lock`
+    ile sıralanır; SQLite zaten tek yazıcıya izin verdiği için bu süreç genelindeki
+    tek sıralama noktasıdır. Toplu yazmalı (batched/async) kurulumda bu kilidi
+    yalnızca yazıcı iş parçacığı tuttuğu için istek iş parçacıkları onu beklemez.
+    """
+
+    supports_lazy_load = True
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS roadmap_progress (
+            user_id TEXT NOT NULL,
+            roadmap_id TEXT NOT NULL,
+            overall_progress INTEGER NOT NULL DEFAULT 0,
+            completed_modules INTEGER NOT NULL DEFAULT 0,
+            total_modules INTEGER NOT NULL DEFAULT 0,
+            total_time_spent_minutes INTEGER NOT NULL DEFAULT 0,
+            started_at TEXT,
+            estimated_completion_date TEXT,
+            last_activity TEXT,
+            PRIMARY KEY (user_id, roadmap_id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_roadmap_progress_roadmap
+            ON roadmap_progress (roadmap_id);
+
+        CREATE TABLE IF NOT EXISTS module_progress (
+            user_id TEXT NOT NULL,
+            roadmap_id TEXT NOT NULL,
+            module_id TEXT NOT NULL,
+            position INTEGER NOT NULL DEFAULT 0,
+            status TEXT NOT NULL,
+            progress_percentage INTEGER NOT NULL DEFAULT 0,
+            time_spent_minutes INTEGER NOT NULL DEFAULT 0,
+            started_at TEXT,
+            completed_at TEXT,
+            last_activity TEXT,
+            notes TEXT,
+            PRIMARY KEY (user_id, roadmap_id, module_id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_module_progress_roadmap
+            ON module_progress (roadmap_id);
+        CREATE INDEX IF NOT EXISTS idx_module_progress_activity
+            ON module_progress (last_activity);
+
+        CREATE TABLE IF NOT EXISTS quiz_result (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            roadmap_id TEXT NOT NULL,
+            module_id TEXT NOT NULL,
+            quiz_id TEXT NOT NULL,
+            score INTEGER NOT NULL,
+            total_questions INTEGER NOT NULL,
+            correct_answers INTEGER NOT NULL,
+            completed_at TEXT,
+            time_taken_minutes INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_quiz_result_module
+            ON quiz_result (user_id, roadmap_id, module_id);
+
+        CREATE TABLE IF NOT EXISTS progress_rollup (
+            user_id TEXT NOT NULL,
+            roadmap_id TEXT NOT NULL,
+            granularity TEXT NOT NULL,
+            bucket INTEGER NOT NULL,
+            minutes INTEGER NOT NULL DEFAULT 0,
+            progress_delta INTEGER NOT NULL DEFAULT 0,
+            modules_completed INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, roadmap_id, granularity, bucket)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS store_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+
+    def __init__(self,
+                 db_file: str = "user_progress.db",
+                 legacy_json_file: Optional[str] = "user_progress.json",
+                 synchronous: str = "NORMAL",
+                 cross_process: bool = False):
+        """
+        Args:
+            db_file: SQLite veritabanı dosyası
+            legacy_json_file: Otomatik taşınacak eski JSON ilerleme dosyası
+            synchronous: SQLite synchronous ayarı (FULL: her commit'te fsync)
+            cross_process: Aynı veritabanını kullanan süreçler arasında kullanıcı kilidi
+        """
+        self.db_file = db_file
+        self.legacy_json_file = legacy_json_file
+        self._lock = threading.RLock()
+        self._user_locks = _StripedFileLock(f"{db_file}.locks") if cross_process else None
+        # İş parçacığı başına okuma bağlantıları (kapatırken hepsi kapatılır)
+        self._local = threading.local()
+        self._readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+
+        self._conn = sqlite3.connect(db_file, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA synchronous={synchronous}")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(self.SCHEMA)
+
+        self._migrate_legacy_json()
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        with self._read() as conn:
+            return self._load_where(conn, "", ())
+
+    def load_user(self, user_id: str) -> Dict[str, Dict[str, Any]]:
+        """Tek bir kullanıcının roadmap kayıtlarını yükler"""
+        with self._read() as conn:
+            return self._load_where(conn, "WHERE user_id = ?", (user_id,))
+
+    def load_roadmap(self, user_id: str, roadmap_id: str) -> Optional[Dict[str, Any]]:
+        """Tek bir roadmap kaydını yükler"""
+        with self._read() as conn:
+            data = self._load_where(conn, "WHERE user_id = ? AND roadmap_id = ?", (user_id, roadmap_id))
+        return next(iter(data.values()), None)
+
+    def iter_module_records(self,
+                            roadmap_id: Optional[str] = None,
+                            since: Optional[str] = None,
+                            until: Optional[str] = None,
+                            fetch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """
+        Modül satırlarını ayrı bir salt okunur bağlantıdan parça parça okur.
+
+        Filtreler SQL'e aktarılır (roadmap ve son etkinlik indeksleri); WAL
+        sayesinde okuma tek bir tutarlı görüntü üzerinde yapılır ve servisin
+        bağlantısını veya yazmaları bekletmez.
+        """
+        conditions, params = [], []
+        if roadmap_id is not None:
+            conditions.append("m.roadmap_id = ?")
+            params.append(roadmap_id)
+        if since is not None:
+            conditions.append("m.last_activity >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("m.last_activity < ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        # Quiz toplamları satır başına indeksle bulunur; GROUP BY ara sonucu oluşmaz
+        quiz_match = "WHERE q.user_id = m.user_id AND q.roadmap_id = m.roadmap_id AND q.module_id = m.module_id"
+
+        conn = sqlite3.connect(f"file:{self.db_file}?mode=ro", uri=True, check_same_thread=False, timeout=30)
+        try:
+            cursor = conn.execute(
+                f"""SELECT m.user_id, m.roadmap_id, m.module_id, {', '.join('m.' + c for c in MODULE_COLUMNS)},
+                           (SELECT COUNT(*) FROM quiz_result q {quiz_match}) AS quiz_attempts,
+                           (SELECT MAX(q.score) FROM quiz_result q {quiz_match}) AS best_quiz_score
+                    FROM module_progress m
+                    {where}""",
+                params
+            )
+            columns = [description[0] for description in cursor.description]
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    record = dict(zip(columns, row))
+                    yield {field: record[field] for field in EXPORT_FIELDS}
+        finally:
+            conn.close()
+
+    def save_roadmap(self, key: str, roadmap_data: Dict[str, Any]):
+        with self._lock, self._transaction():
+            self._upsert_roadmap(roadmap_data)
+
+    def save_module(self, key: str, module_data: Dict[str, Any]):
+        with self._lock, self._transaction():
+            self._upsert_module(module_data)
+
+    def delete_roadmap(self, key: str, roadmap_data: Dict[str, Any]):
+        user_id, roadmap_id = roadmap_data["user_id"], roadmap_data["roadmap_id"]
+        with self._lock, self._transaction():
+            for table in ("quiz_result", "module_progress", "roadmap_progress"):
+                self._conn.execute(
+                    f"DELETE FROM {table} WHERE user_id = ? AND roadmap_id = ?",
+                    (user_id, roadmap_id)
+                )
+
+    def save_rollups(self, rows: List[RollupRow]):
+        with self._lock, self._transaction():
+            self._upsert_rollups(rows)
+
+    def load_rollups(self, user_id: Optional[str] = None) -> List[RollupRow]:
+        where, params = ("WHERE user_id = ?", (user_id,)) if user_id is not None else ("", ())
+        with self._read() as conn:
+            return [
+                (row["user_id"], row["roadmap_id"], row["granularity"], row["bucket"],
+                 (row["minutes"], row["progress_delta"], row["modules_completed"]))
+                for row in conn.execute(f"SELECT * FROM progress_rollup {where}", params)
+            ]
+
+    def save_all(self, data: Dict[str, Dict[str, Any]]):
+        """Verilen tüm kayıtları tek bir işlemde yazar"""
+        with self._lock, self._transaction():
+            for roadmap_data in data.values():
+                self._upsert_roadmap(roadmap_data)
+                for module_data in roadmap_data.get("module_progress", []):
+                    self._upsert_module(module_data)
+
+    def save_batch(self,
+                   roadmaps: List[Tuple[str, Dict[str, Any]]],
+                   modules: List[Tuple[str, Dict[str, Any]]],
+                   rollups: List[RollupRow] = ()):
+        """Tüm kayıtları tek bir işlemde (group commit) yazar"""
+        with self._lock, self._transaction():
+            for _, module_data in modules:
+                self._upsert_module(module_data)
+            for _, roadmap_data in roadmaps:
+                self._upsert_roadmap(roadmap_data)
+            self._upsert_rollups(rollups)
+
+    def flush(self, sync: bool = True):
+        """WAL içeriğini veritabanı dosyasına aktarır"""
+        if sync:
+            with self._lock:
+                self._conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def user_lock(self, user_id: str):
+        """Kullanıcının kayıtlarını diğer süreçlere karşı kilitler"""
+        if self._user_locks is None:
+            return nullcontext()
+        return self._user_locks.hold(user_id)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
+        if self._user_locks is not None:
+            self._user_locks.close()
+
+    def _transaction(self):
+        return _SQLiteTransaction(self._conn)
+
+    @contextmanager
+    def _read(self):
+        """Bu iş parçacığının okuma bağlantısında tek bir okuma işlemi (tutarlı görüntü)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_file, check_same_thread=False, isolation_level=None, timeout=30)
+            conn.row_factory = sqlite3.Row
+            with self._readers_lock:
+                self._readers.append(conn)
+            self._local.conn = conn
+        conn.execute("BEGIN")
+        try:
+            yield conn
+        finally:
+            conn.execute("COMMIT")
+
+    def _upsert_roadmap(self, roadmap_data: Dict[str, Any]):
+        values = [self._column_value(roadmap_data.get(c)) for c in ROADMAP_COLUMNS]
+        self._conn.execute(
+            f"""INSERT INTO roadmap_progress (user_id, roadmap_id, {', '.join(ROADMAP_COLUMNS)})
+                VALUES (?, ?, {', '.join('?' for _ in ROADMAP_COLUMNS)})
+                ON CONFLICT (user_id, roadmap_id) DO UPDATE SET
+                {', '.join(f'{c} = excluded.{c}' for c in ROADMAP_COLUMNS)}""",
+            [roadmap_data["user_id"], roadmap_data["roadmap_id"]] + values
+        )
+
+    def _upsert_module(self, module_data: Dict[str, Any]):
+        user_id = module_data["user_id"]
+        roadmap_id = module_data["roadmap_id"]
+        module_id = module_data["module_id"]
+        values = [self._column_value(module_data.get(c)) for c in MODULE_COLUMNS]
+
+        self._conn.execute(
+            f"""INSERT INTO module_progress (user_id, roadmap_id, module_id, position, {', '.join(MODULE_COLUMNS)})
+                VALUES (?, ?, ?,
+                        (SELECT COUNT(*) FROM module_progress WHERE user_id = ? AND roadmap_id = ?),
+                        {', '.join('?' for _ in MODULE_COLUMNS)})
+                ON CONFLICT (user_id, roadmap_id, module_id) DO UPDATE SET
+                {', '.join(f'{c} = excluded.{c}' for c in MODULE_COLUMNS)}""",
+            [user_id, roadmap_id, module_id, user_id, roadmap_id] + values
+        )
+
+        # Quiz sonuçları yalnızca eklenir; yalnızca yeni olanlar yazılır
+        quiz_results = module_data.get("quiz_results", [])
+        stored = self._conn.execute(
+            "SELECT COUNT(*) FROM quiz_result WHERE user_id = ? AND roadmap_id = ? AND module_id = ?",
+            (user_id, roadmap_id, module_id)
+        ).fetchone()[0]
+        for quiz in quiz_results[stored:]:
+            self._conn.execute(
+                f"""INSERT INTO quiz_result (user_id, roadmap_id, module_id, {', '.join(QUIZ_COLUMNS)})
+                    VALUES (?, ?, ?, {', '.join('?' for _ in QUIZ_COLUMNS)})""",
+                [user_id, roadmap_id, module_id] + [self._column_value(quiz.get(c)) for c in QUIZ_COLUMNS]
+            )
+
+    def _upsert_rollups(self, rows: List[RollupRow]):
+        self._conn.executemany(
+            """INSERT INTO progress_rollup
+                   (user_id, roadmap_id, granularity, bucket, minutes, progress_delta, modules_completed)
+               VALUES (?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT (user_id, roadmap_id, granularity, bucket) DO UPDATE SET
+                   minutes = excluded.minutes,
+                   progress_delta = excluded.progress_delta,
+                   modules_completed = excluded.modules_completed""",
+            [(user_id, roadmap_id, granularity, bucket, *values)
+             for user_id, roadmap_id, granularity, bucket, values in rows]
+        )
+
+    def _load_where(self, conn: sqlite3.Connection, where: str, params: tuple) -> Dict[str, Dict[str, Any]]:
+        data: Dict[str, Dict[str, Any]] = {}
+
+        for row in conn.execute(f"SELECT * FROM roadmap_progress {where}", params):
+            roadmap_data = {"roadmap_id": row["roadmap_id"], "user_id": row["user_id"]}
+            roadmap_data.update({c: row[c] for c in ROADMAP_COLUMNS})
+            roadmap_data["module_progress"] = []
+            data[f"{row['user_id']}_{row['roadmap_id']}"] = roadmap_data
+
+        modules: Dict[tuple, Dict[str, Any]] = {}
+        for row in conn.execute(
+                f"SELECT * FROM module_progress {where} ORDER BY user_id, roadmap_id, position", params):
+            roadmap_data = data.get(f"{row['user_id']}_{row['roadmap_id']}")
+            if roadmap_data is None:
+                continue
+            module_data = {
+                "module_id": row["module_id"],
+                "roadmap_id": row["roadmap_id"],
+                "user_id": row["user_id"]
+            }
+            module_data.update({c: row[c] for c in MODULE_COLUMNS})
+            module_data["quiz_results"] = []
+            roadmap_data["module_progress"].append(module_data)
+            modules[(row["user_id"], row["roadmap_id"], row["module_id"])] = module_data
+
+        for row in conn.execute(f"SELECT * FROM quiz_result {where} ORDER BY id", params):
+            module_data = modules.get((row["user_id"], row["roadmap_id"], row["module_id"]))
+            if module_data is None:
+                continue
+            quiz = {"module_id": row["module_id"]}
+            quiz.update({c: row[c] for c in QUIZ_COLUMNS})
+            module_data["quiz_results"].append(quiz)
+
+        return data
+
+    def _migrate_legacy_json(self):
+        """Veritabanı boşsa eski JSON snapshot + günlüğü içeri aktarır"""
+        if not self.legacy_json_file or not os.path.exists(self.legacy_json_file):
+            return
+
+        with self._lock:
+            migrated = self._conn.execute(
+                "SELECT value FROM store_meta WHERE key = 'migrated_from'"
+            ).fetchone()
+            if migrated:
+                return
+
+            legacy = ProgressEventLog(self.legacy_json_file)
+            data = legacy.load()
+            self.save_all(data)
+            self.save_rollups(legacy.load_rollups())
+            with self._transaction():
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO store_meta (key, value) VALUES ('migrated_from', ?)",
+                    (os.path.abspath(self.legacy_json_file),)
+                )
+
+        logger.info(f"{len(data)} roadmap ilerlemesi JSON dosyasından SQLite'a taşındı")
+
+    @staticmethod
+    def _column_value(value: Any) -> Any:
+        if value is None or isinstance(value, (int, float, str)):
+            return value
+        if hasattr(value, "value"):
+            # Enum (ör. ProgressStatus)
+            return value.value
+        return str(value)
+
+class _SQLiteTransaction:
+    """BEGIN IMMEDIATE ... COMMIT/ROLLBACK bağlam yöneticisi"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def __enter__(self):
+        if self._conn.in_transaction:
+            self._nested = True
+        else:
+            self._nested = False
+            self._conn.execute("BEGIN IMMEDIATE")
+        return self._conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._nested:
+            return False
+        if exc_type is None:
+            self._conn.execute("COMMIT")
+        else:
+            self._conn.execute("ROLLBACK")
+        return False
+
+DURABILITY_POLICIES = ("fsync_every_commit", "batched", "async")
+
+class _StripedFileLock:
+    """
+    Anahtarları sabit sayıda kilit dosyasına dağıtan süreçler arası kilit.
+
+    Her dilim bir iş parçacığı kilidi ve bir `flock` kilidinden oluşur; farklı
+    dilimlere düşen kullanıcılar birbirini beklemez.
+    """
+
+    def __init__(self, directory: str, stripes: int = 64):
+        self.directory = directory
+        self.stripes = stripes
+        self._thread_locks = [threading.Lock() for _ in range(stripes)]
+        self._files: Dict[int, Any] = {}
+
+        if fcntl is None:
+            logger.warning("fcntl bulunamadı; süreçler arası ilerleme kilidi devre dışı")
+        else:
+            os.makedirs(directory, exist_ok=True)
+
+    @contextmanager
+    def hold(self, key: str):
+        stripe = zlib.crc32(key.encode('utf-8')) % self.stripes
+        with self._thread_locks[stripe]:
+            if fcntl is None:
+                yield
+                return
+            lock_file = self._files.get(stripe)
+            if lock_file is None:
+                lock_file = open(os.path.join(self.directory, f"{stripe}.lock"), 'a+')
+                self._files[stripe] = lock_file
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def close(self):
+        for stripe, lock_file in list(self._files.items()):
+            with self._thread_locks[stripe]:
+                lock_file.close()
+        self._files.clear()
+
+
+class _PendingStripe:
+    """Bir kullanıcı diliminin henüz alttaki depoya yazılmamış kayıtları"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.roadmaps: Dict[str, Dict[str, Any]] = {}
+        self.modules: Dict[Tuple[str, str], Tuple[str, Dict[str, Any]]] = {}
+        self.rollups: Dict[Tuple[str, str, str, int], Tuple[int, int, int]] = {}
+        # Yazıcının o an alttaki depoya aktardığı kayıtlar (commit bitene kadar okumalara bindirilir)
+        self.writing_roadmaps: Dict[str, Dict[str, Any]] = {}
+        self.writing_modules: Dict[Tuple[str, str], Tuple[str, Dict[str, Any]]] = {}
+        self.writing_rollups: Dict[Tuple[str, str, str, int], Tuple[int, int, int]] = {}
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self.roadmaps) + len(self.modules) + len(self.rollups)
+
+
+class BatchingProgressStore(ProgressStore):
+    """
+    Yazmaları bellekte biriktirip arka plandaki bir yazıcı iş parçacığıyla
+    toplu olarak (group commit) alttaki depoya aktaran sarmalayıcı.
+
+    Aynı kayda pencere içinde gelen güncellemeler tek yazmaya indirgenir.
+    Toplu yazma `flush_interval_ms` milisaniyede bir veya `max_batch`
+    kirli kayda ulaşıldığında yapılır. `batched` politikası her toplu
+    yazmadan sonra fsync yapar, `async` politikası yapmaz.
+
+    Bekleyen kayıtlar kullanıcıya göre `stripes` dilime bölünür; her dilimin
+    kendi kilidi olduğundan farklı dilimlerdeki kullanıcılar birbirini beklemez.
+    Alttaki depoya yalnızca yazıcı iş parçacığı yazar.
+
+    Kullanıcı ve roadmap okumaları yazıcıyı beklemez: alttaki depodan okunan
+    kayıtların üzerine henüz yazılmamış (ve yazılmakta olan) kayıtlar bindirilir.
+    """
+
+    def __init__(self,
+                 inner: ProgressStore,
+                 policy: str = "batched",
+                 flush_interval_ms: int = 200,
+                 max_batch: int = 256,
+                 stripes: int = 16):
+        if policy not in ("batched", "async"):
+            raise ValueError(f"Toplu yazma politikası desteklenmiyor: {policy}")
+
+        self.inner = inner
+        self.policy = policy
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_batch = max_batch
+
+        self._stripes = [_PendingStripe() for _ in range(max(stripes, 1))]
+        self._wakeup = threading.Event()
+        self._write_lock = threading.Lock()
+        self._stopped = False
+        self._stats = {"batches": 0, "records_written": 0, "errors": 0}
+
+        self._writer = threading.Thread(target=self._run, name="progress-writer", daemon=True)
+        self._writer.start()
+
+    @property
+    def supports_lazy_load(self) -> bool:
+        return self.inner.supports_lazy_load
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return dict(self._stats, records_coalesced=sum(stripe.coalesced for stripe in self._stripes))
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        self.flush()
+        return self.inner.load()
+
+    def load_user(self, user_id: str) -> Dict[str, Dict[str, Any]]:
+        # Bekleyen kayıtlar alttaki depodan önce alınır: arada commit edilenler okumada zaten görünür
+        headers, modules = self._pending_for_user(user_id)
+        return self._overlay(self.inner.load_user(user_id), headers, modules)
+
+    def iter_module_records(self,
+                            roadmap_id: Optional[str] = None,
+                            since: Optional[str] = None,
+                            until: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        self.flush()
+        return self.inner.iter_module_records(roadmap_id, since, until)
+
+    def load_roadmap(self, user_id: str, roadmap_id: str) -> Optional[Dict[str, Any]]:
+        key = f"{user_id}_{roadmap_id}"
+        headers, modules = self._pending_for_user(user_id)
+        roadmap = self.inner.load_roadmap(user_id, roadmap_id)
+        data = self._overlay(
+            {key: roadmap} if roadmap is not None else {},
+            {k: header for k, header in headers.items() if k == key},
+            [(k, record) for k, record in modules if k == key]
+        )
+        return data.get(key)
+
+    def save_roadmap(self, key: str, roadmap_data: Dict[str, Any]):
+        header = {k: v for k, v in roadmap_data.items() if k != "module_progress"}
+        stripe = self._stripe(header["user_id"])
+        with stripe.lock:
+            if key in stripe.roadmaps:
+                stripe.coalesced += 1
+            stripe.roadmaps[key] = header
+        self._notify_if_full()
+
+    def save_module(self, key: str, module_data: Dict[str, Any]):
+        # Yazıcı iş parçacığı canlı sözlüğü değil, o anki kopyayı görür
+        record = dict(module_data)
+        record["quiz_results"] = list(module_data.get("quiz_results", []))
+        stripe = self._stripe(record["user_id"])
+        with stripe.lock:
+            if (key, record["module_id"]) in stripe.modules:
+                stripe.coalesced += 1
+            stripe.modules[(key, record["module_id"])] = (key, record)
+        self._notify_if_full()
+
+    def save_rollups(self, rows: List[RollupRow]):
+        by_stripe: Dict[int, List[RollupRow]] = {}
+        for row in rows:
+            by_stripe.setdefault(self._stripe_index(row[0]), []).append(row)
+        for index, stripe_rows in by_stripe.items():
+            stripe = self._stripes[index]
+            with stripe.lock:
+                for user_id, roadmap_id, granularity, bucket, values in stripe_rows:
+                    if (user_id, roadmap_id, granularity, bucket) in stripe.rollups:
+                        stripe.coalesced += 1
+                    stripe.rollups[(user_id, roadmap_id, granularity, bucket)] = values
+        self._notify_if_full()
+
+    def load_rollups(self, user_id: Optional[str] = None) -> List[RollupRow]:
+        stripes = self._stripes if user_id is None else (self._stripe(user_id),)
+        pending = {}
+        for stripe in stripes:
+            with stripe.lock:
+                pending.update(
+                    (key, values)
+                    for source in (stripe.writing_rollups, stripe.rollups)
+                    for key, values in source.items()
+                    if user_id is None or key[0] == user_id
+                )
+        rows = self.inner.load_rollups(user_id)
+        if not pending:
+            return rows
+        merged = {(uid, roadmap_id, granularity, bucket): values
+                  for uid, roadmap_id, granularity, bucket, values in rows}
+        merged.update(pending)
+        return [key + (tuple(values),) for key, values in merged.items()]
+
+    def delete_roadmap(self, key: str, roadmap_data: Dict[str, Any]):
+        # Silme nadirdir; sıralamayı korumak için bekleyen yazmalar önce aktarılır
+        self.flush()
+        self.inner.delete_roadmap(key, roadmap_data)
+
+    def checkpoint(self, snapshot_source: Callable[[], Dict[str, Dict[str, Any]]]):
+        self.inner.checkpoint(snapshot_source)
+
+    def compact(self, snapshot_source: Callable[[], Dict[str, Dict[str, Any]]]):
+        self.flush()
+        self.inner.compact(snapshot_source)
+
+    def user_lock(self, user_id: str):
+        return self.inner.user_lock(user_id)
+
+    def flush(self, sync: bool = True):
+        """Bekleyen tüm kayıtları hemen yazar"""
+        self._write_pending(sync=sync)
+
+    def pending_count(self) -> int:
+        count = 0
+        for stripe in self._stripes:
+            with stripe.lock:
+                count += len(stripe)
+        return count
+
+    def close(self):
+        self._stopped = True
+        self._wakeup.set()
+        self._writer.join(timeout=5)
+        self._write_pending(sync=True)
+        self.inner.close()
+
+    def _stripe_index(self, user_id: str) -> int:
+        return hash(user_id) % len(self._stripes)
+
+    def _stripe(self, user_id: str) -> _PendingStripe:
+        return self._stripes[self._stripe_index(user_id)]
+
+    def _pending_for_user(self, user_id: str) -> Tuple[Dict[str, Dict[str, Any]], List[Tuple[str, Dict[str, Any]]]]:
+        """Kullanıcının henüz alttaki depoda görünmeyebilecek kayıtları (yeniler sonda)"""
+        stripe = self._stripe(user_id)
+        with stripe.lock:
+            headers = {
+                key: dict(header)
+                for source in (stripe.writing_roadmaps, stripe.roadmaps)
+                for key, header in source.items()
+                if header.get("user_id") == user_id
+            }
+            modules = [
+                (key, dict(record, quiz_results=list(record.get("quiz_results", []))))
+                for source in (stripe.writing_modules, stripe.modules)
+                for key, record in source.values()
+                if record.get("user_id") == user_id
+            ]
+        return headers, modules
+
+    @staticmethod
+    def _overlay(data: Dict[str, Dict[str, Any]],
+                 headers: Dict[str, Dict[str, Any]],
+                 modules: List[Tuple[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+        """Bekleyen roadmap başlıklarını ve modül kayıtlarını okunan kayıtların üzerine yazar"""
+        for key, header in headers.items():
+            roadmap = data.get(key)
+            if roadmap is None:
+                data[key] = {**header, "module_progress": []}
+            else:
+                roadmap.update(header)
+        for key, record in modules:
+            roadmap = data.get(key)
+            if roadmap is None:
+                continue
+            module_progress = roadmap.setdefault("module_progress", [])
+            for index, existing in enumerate(module_progress):
+                if existing.get("module_id") == record["module_id"]:
+                    module_progress[index] = record
+                    break
+            else:
+                module_progress.append(record)
+        return data
+
+    def _notify_if_full(self):
+        # Dilim boyutları kilitsiz okunur; eşik yaklaşık olarak denetlenir
+        if sum(len(stripe) for stripe in self._stripes) >= self.max_batch:
+            self._wakeup.set()
+
+    def _run(self):
+        while True:
+            if not self._stopped:
+                self._wakeup.wait(timeout=self.flush_interval)
+            self._wakeup.clear()
+            stopped = self._stopped
+            self._write_pending(sync=self.policy == "batched")
+            if stopped:
+                return
+
+    def _write_pending(self, sync: bool):
+        with self._write_lock:
+            roadmaps, modules, rollups = [], [], []
+            # Bir kullanıcının tüm kayıtları aynı dilimdedir; dilimler sırayla devralınır
+            for stripe in self._stripes:
+                with stripe.lock:
+                    roadmaps.extend(stripe.roadmaps.items())
+                    modules.extend(stripe.modules.values())
+                    rollups.extend(key + (values,) for key, values in stripe.rollups.items())
+                    stripe.writing_roadmaps, stripe.roadmaps = stripe.roadmaps, {}
+                    stripe.writing_modules, stripe.modules = stripe.modules, {}
+                    stripe.writing_rollups, stripe.rollups = stripe.rollups, {}
+
+            if not roadmaps and not modules and not rollups:
+                return
+
+            try:
+                self.inner.save_batch(roadmaps, modules, rollups)
+                self.inner.flush(sync=sync)
+                self._stats["batches"] += 1
+                self._stats["records_written"] += len(roadmaps) + len(modules) + len(rollups)
+            except Exception as e:
+                logger.error(f"İlerleme toplu yazma hatası: {e}")
+                self._stats["errors"] += 1
+                # Başarısız kayıtlar, daha yenileri gelmediyse bir sonraki tura bırakılır
+                for key, header in roadmaps:
+                    stripe = self._stripe(header["user_id"])
+                    with stripe.lock:
+                        stripe.roadmaps.setdefault(key, header)
+                for key, record in modules:
+                    stripe = self._stripe(record["user_id"])
+                    with stripe.lock:
+                        stripe.modules.setdefault((key, record["module_id"]), (key, record))
+                for user_id, roadmap_id, granularity, bucket, values in rollups:
+                    stripe = self._stripe(user_id)
+                    with stripe.lock:
+                        stripe.rollups.setdefault((user_id, roadmap_id, granularity, bucket), values)
+            finally:
+                for stripe in self._stripes:
+                    with stripe.lock:
+                        stripe.writing_roadmaps = {}
+                        stripe.writing_modules = {}
+                        stripe.writing_rollups = {}
+
+def create_progress_store(backend: str, progress_file: str = "user_progress.json", **options) -> ProgressStore:
+    """Yapılandırmaya göre ilerleme deposunu oluşturur"""
+    backend = (backend or "sqlite").lower()
+    durability = options.get("durability", "batched")
+    multiprocess = options.get("multiprocess", False)
+    if durability not in DURABILITY_POLICIES:
+        raise ValueError(f"Bilinmeyen dayanıklılık politikası: {durability}")
+    if multiprocess and backend != "sqlite":
+        raise ValueError("Çok süreçli çalışma yalnızca sqlite ilerleme deposuyla desteklenir")
+
+    if backend == "sqlite":
+        db_file = options.get("db_file") or f"{os.path.splitext(progress_file)[0]}.db"
+        store = SQLiteProgressStore(
+            db_file,
+            legacy_json_file=progress_file,
+            synchronous="FULL" if durability == "fsync_every_commit" else "NORMAL",
+            cross_process=multiprocess
+        )
+    elif backend in ("json", "jsonlog"):
+        sync_every = 1 if durability == "fsync_every_commit" else options.get("sync_every", 32)
+        if options.get("snapshot_format", "json") == "binary":
+            store = BinarySnapshotStore(
+                f"{os.path.splitext(progress_file)[0]}.bin",
+                legacy_json_file=progress_file,
+                snapshot_every=options.get("snapshot_every", 1000),
+                sync_every=sync_every
+            )
+        else:
+            store = ProgressEventLog(
+                progress_file,
+                snapshot_every=options.get("snapshot_every", 1000),
+                sync_every=sync_every
+            )
+    else:
+        raise ValueError(f"Bilinmeyen ilerleme deposu: {backend}")
+
+    if durability == "fsync_every_commit" or multiprocess:
+        # Çok süreçli modda yazmalar kilit bırakılmadan önce görünür olmalı
+        return store
+
+    return BatchingProgressStore(
+        store,
+        policy=durability,
+        flush_interval_ms=options.get("flush_interval_ms", 200),
+        max_batch=options.get("max_batch", 256)
+    )
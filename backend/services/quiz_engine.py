@@ -0,0 +1,234 @@
+"""
+Quiz Engine - Cevap anahtarlarını arama tablolarına derleyip quiz cevaplarını puanlar
+"""
+
+import os
+import json
+import logging
+import threading
+from typing import Dict, Any, Optional, List
+
+import numpy as np
+
+from models.progress import QuizAnswerKey, QuizQuestionType
+from utils.text import normalize_text
+
+logger = logging.getLogger(__name__)
+
+_EDGE_PUNCTUATION = " \t\n.,;:!?\"'`()[]{}"
+
+
+def normalize_answer(value: Optional[str]) -> str:
+    """
+    Metin cevabı karşılaştırma biçimine çevirir.
+
+    normalize_text ile aynı sadeleştirmeye ek olarak baştaki/sondaki
+    noktalama temizlenir.
+    """
+    if value is None:
+        return ""
+    return normalize_text(str(value)).strip(_EDGE_PUNCTUATION)
+
+
+def parse_number(value: Optional[str]) -> Optional[float]:
+    """Sayısal cevabı çözümler; ondalık virgül kabul edilir"""
+    if value is None:
+        return None
+    text = str(value).strip().replace(" ", "")
+    if "," in text and "." not in text:
+        text = text.replace(",", ".")
+    try:
+        number = float(text)
+    except ValueError:
+        return None
+    return number if np.isfinite(number) else None
+
+
+def _percent(earned, total: int):
+    """Puanı 0-100 aralığında yarımı yukarı yuvarlanmış tamsayıya çevirir (skaler veya dizi)"""
+    return (earned * 200 + total) // (2 * total) if total else earned * 0
+
+
+class CompiledQuiz:
+    """
+    Cevap anahtarının derlenmiş hâli.
+
+    Seçenek ve metin soruları normalize edilmiş kabul kümelerine, sayısal
+    sorular (değer, tolerans) çiftlerine çevrilir; tek bir gönderim soru
+    sayısı kadar küme araması veya karşılaştırmayla puanlanır.
+    """
+
+    def __init__(self, key: QuizAnswerKey):
+        self.quiz_id = key.quiz_id
+        self.module_id = key.module_id
+        self.question_ids: List[str] = []
+        self.kinds: List[QuizQuestionType] = []
+        # Seçenek/metin: normalize kabul kümesi; sayısal: (değer, tolerans)
+        self.checks: List[Any] = []
+
+        for question in key.questions:
+            if question.question_id in self.question_ids:
+                raise ValueError(f"Soru kimliği tekrarlanıyor: {question.question_id}")
+            if not question.accepted_answers:
+                raise ValueError(f"{question.question_id} için kabul edilen cevap yok")
+            if question.points < 0:
+                raise ValueError(f"{question.question_id} için puan negatif olamaz")
+
+            if question.question_type == QuizQuestionType.NUMERIC:
+                value = parse_number(question.accepted_answers[0])
+                if value is None:
+                    raise ValueError(f"{question.question_id} için sayısal cevap geçersiz")
+                check = (value, abs(question.tolerance))
+            elif question.question_type == QuizQuestionType.CHOICE:
+                check = frozenset(answer.strip().casefold() for answer in question.accepted_answers)
+            else:
+                check = frozenset(normalize_answer(answer) for answer in question.accepted_answers)
+
+            self.question_ids.append(question.question_id)
+            self.kinds.append(question.question_type)
+            self.checks.append(check)
+
+        self.points = np.array([question.points for question in key.questions], dtype=np.int64)
+        self.total_points = int(self.points.sum())
+
+    def __len__(self) -> int:
+        return len(self.question_ids)
+
+    def is_correct(self, index: int, answer: Optional[str]) -> bool:
+        """Tek bir cevabı derlenmiş kontrolle karşılaştırır"""
+        if answer is None:
+            return False
+        kind = self.kinds[index]
+        check = self.checks[index]
+        if kind == QuizQuestionType.NUMERIC:
+            number = parse_number(answer)
+            return number is not None and abs(number - check[0]) <= check[1]
+        if kind == QuizQuestionType.CHOICE:
+            return answer.strip().casefold() in check
+        return normalize_answer(answer) in check
+
+    def grade(self, answers: Dict[str, str]) -> Dict[str, int]:
+        """Tek bir gönderimi O(soru sayısı) sürede puanlar"""
+        correct = 0
+        earned = 0
+        for index, question_id in enumerate(self.question_ids):
+            if self.is_correct(index, answers.get(question_id)):
+                correct += 1
+                earned += int(self.points[index])
+        return {
+            "score": int(_percent(earned, self.total_points)),
+            "correct_answers": correct,
+            "total_questions": len(self.question_ids),
+            "earned_points": earned
+        }
+
+    def grade_many(self, submissions: List[Dict[str, str]]) -> Dict[str, np.ndarray]:
+        """
+        Çok sayıda gönderimi soru sütunları üzerinden tek geçişte puanlar.
+
+        Her sütunda aynı ham cevap yalnızca bir kez değerlendirilir (sınavlarda
+        cevapların büyük kısmı birkaç seçenekten oluşur); sayısal sorular
+        dizi karşılaştırmasıyla, puanlar doğruluk matrisi ile puan vektörünün
+        çarpımıyla hesaplanır.
+        """
+        count = len(submissions)
+        correct = np.zeros((count, len(self.question_ids)), dtype=np.bool_)
+
+        for index, question_id in enumerate(self.question_ids):
+            column = [answers.get(question_id) for answers in submissions]
+            if self.kinds[index] == QuizQuestionType.NUMERIC:
+                parsed: Dict[Optional[str], float] = {}
+                values = np.fromiter(
+                    (parsed[a] if a in parsed else parsed.setdefault(a, self._number_or_nan(a)) for a in column),
+                    dtype=np.float64, count=count
+                )
+                value, tolerance = self.checks[index]
+                with np.errstate(invalid="ignore"):
+                    correct[:, index] = np.abs(values - value) <= tolerance
+            else:
+                memo: Dict[Optional[str], bool] = {}
+                correct[:, index] = np.fromiter(
+                    (memo[a] if a in memo else memo.setdefault(a, self.is_correct(index, a)) for a in column),
+                    dtype=np.bool_, count=count
+                )
+
+        earned = correct.astype(np.int64) @ self.points
+        return {
+            "correct": correct,
+            "correct_answers": correct.sum(axis=1),
+            "earned_points": earned,
+            "scores": _percent(earned, self.total_points)
+        }
+
+    @staticmethod
+    def _number_or_nan(answer: Optional[str]) -> float:
+        number = parse_number(answer)
+        return np.nan if number is None else number
+
+
+class QuizEngine:
+    """
+    Quiz cevap anahtarlarını saklar ve derlenmiş hâllerini önbellekte tutar.
+
+    Anahtarlar JSON dosyasında kalıcıdır; derleme anahtar kaydedilirken bir
+    kez yapılır, puanlama sırasında yalnızca derlenmiş tablolar kullanılır.
+    """
+
+    def __init__(self, keys_file: str = "quiz_keys.json"):
+        self.keys_file = keys_file
+        self._lock = threading.Lock()
+        self._keys: Dict[str, Dict[str, Any]] = {}
+        self._compiled: Dict[str, CompiledQuiz] = {}
+        self._load()
+
+    def set_key(self, key: QuizAnswerKey) -> CompiledQuiz:
+        """Cevap anahtarını derler ve kaydeder (geçersizse ValueError)"""
+        compiled = CompiledQuiz(key)
+        with self._lock:
+            self._keys[key.quiz_id] = key.model_dump()
+            self._compiled[key.quiz_id] = compiled
+            self._save()
+        return compiled
+
+    def remove_key(self, quiz_id: str) -> bool:
+        with self._lock:
+            if quiz_id not in self._keys:
+                return False
+            del self._keys[quiz_id]
+            del self._compiled[quiz_id]
+            self._save()
+            return True
+
+    def get(self, quiz_id: str) -> Optional[CompiledQuiz]:
+        """Derlenmiş anahtarı döndürür (anahtar yoksa None)"""
+        return self._compiled.get(quiz_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "quizzes": len(self._compiled),
+            "questions": sum(len(compiled) for compiled in self._compiled.values())
+        }
+
+    def _load(self):
+        if not os.path.exists(self.keys_file):
+            return
+        try:
+            with open(self.keys_file, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+        except Exception as e:
+            logger.error(f"Quiz cevap anahtarları okunamadı: {e}")
+            return
+
+        for quiz_id, raw_key in stored.items():
+            try:
+                self._compiled[quiz_id] = CompiledQuiz(QuizAnswerKey(**raw_key))
+                self._keys[quiz_id] = raw_key
+            except Exception as e:
+                logger.error(f"Quiz cevap anahtarı derlenemedi ({quiz_id}): {e}")
+
+    def _save(self):
+        """Anahtarları geçici dosya üzerinden atomik olarak yazar (kilit tutulurken çağrılır)"""
+        temp_file = f"{self.keys_file}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(self._keys, f, ensure_ascii=False, indent=2)
+        os.replace(temp_file, self.keys_file)
@@ -0,0 +1,211 @@
+"""
+Roadmap Cache - Üretilmiş yol haritalarını normalize edilmiş kullanıcı profiline göre önbellekler
+"""
+
+import copy
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple
+
+from config import (
+    ROADMAP_CACHE_MAX_ENTRIES,
+    ROADMAP_CACHE_TTL_SECONDS,
+    ROADMAP_CACHE_DISK_FILE,
+    ROADMAP_CACHE_DISK_MAX_ENTRIES
+)
+from utils.text import normalize_text
+
+logger = logging.getLogger(__name__)
+
+# Haftalık çalışma saati kovaları: aynı kovadaki profiller aynı yol haritasını alır
+HOURS_BUCKETS = (5, 10, 15, 20, 30, 40)
+
+
+def hours_bucket(hours: Optional[Any]) -> Optional[int]:
+    """Saati, değeri kapsayan en küçük kova sınırına yuvarla (son kovadan büyükler tek kova)"""
+    if hours is None:
+        return None
+    try:
+        hours = float(hours)
+    except (TypeError, ValueError):
+        return None
+    for bound in HOURS_BUCKETS:
+        if hours <= bound:
+            return bound
+    return HOURS_BUCKETS[-1] + 1
+
+
+def _normalized_list(values: Optional[List[Any]]) -> List[str]:
+    """Listeyi normalize et, boşları ve tekrarları at, sırala"""
+    return sorted({normalize_text(str(value)) for value in values or [] if str(value).strip()})
+
+
+def profile_key(variant: str,
+                interests: Optional[List[str]],
+                skill_level: Optional[str],
+                learning_goals: Optional[List[str]] = None,
+                available_hours: Optional[Any] = None,
+                timeline_months: Optional[Any] = None) -> str:
+    """
+    Profilin kanonik anahtarı.
+
+    `variant` farklı çıktı biçimleri üreten üreticileri (router, agent'lar) ayırır.
+    """
+    canonical = {
+        "variant": variant,
+        "interests": _normalized_list(interests),
+        "skill_level": normalize_text(skill_level or ""),
+        "learning_goals": _normalized_list(learning_goals),
+        "hours": hours_bucket(available_hours),
+        "months": int(timeline_months) if isinstance(timeline_months, (int, float)) else timeline_months
+    }
+    payload = json.dumps(canonical, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RoadmapCache:
+    """
+    Süreli (TTL) ve boyutu sınırlı LRU önbellek; isteğe bağlı SQLite disk katmanı.
+
+    Bellekte en fazla `max_entries` kayıt tutulur, en eski kullanılan atılır.
+    Disk katmanı yeniden başlatmalar arasında kalır; bellekte bulunmayan kayıt
+    diskten okunup belleğe alınır. Disk tablosu `disk_max_entries` kayıtla
+    sınırlıdır: her `put` sayacı ilerletir ve sınırın onda biri kadar yazmada
+    bir süresi dolan kayıtlar ve sınırı aşan en eski kayıtlar silinir. Disk
+    G/Ç'si bellek kilidi dışında, ayrı bir bağlantı kilidiyle yapılır; böylece
+    bellekteki isabetler disk yazmasını beklemez. Değerler kopyalanarak verilir
+    ve saklanır, böylece çağıranlar önbellekteki kaydı değiştiremez.
+    """
+
+    def __init__(self,
+                 max_entries: int = 1000,
+                 ttl_seconds: float = 86400,
+                 disk_file: Optional[str] = None,
+                 disk_max_entries: int = 10000):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_max_entries = disk_max_entries
+        self._lock = threading.Lock()
+        # SQLite bağlantısı yalnızca bu kilitle kullanılır; bellek kilidi disk G/Ç'si sırasında tutulmaz
+        self._disk_lock = threading.Lock()
+        self._disk_puts = 0
+        # anahtar -> (son geçerlilik zamanı, değer)
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+        self._disk = None
+        if disk_file:
+            self._disk = sqlite3.connect(disk_file, check_same_thread=False, isolation_level=None, timeout=30)
+            self._disk.execute("PRAGMA journal_mode=WAL")
+            self._disk.execute(
+                """CREATE TABLE IF NOT EXISTS roadmap_cache (
+                       cache_key TEXT PRIMARY KEY,
+                       expires_at REAL NOT NULL,
+                       value TEXT NOT NULL
+                   )"""
+            )
+            self._disk.execute("CREATE INDEX IF NOT EXISTS roadmap_cache_expires ON roadmap_cache (expires_at)")
+            self._prune_disk()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Geçerli kaydın kopyasını döndür (yoksa veya süresi dolduysa None)"""
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return copy.deepcopy(entry[1])
+                del self._entries[key]
+            if self._disk is None:
+                self._stats["misses"] += 1
+                return None
+
+        with self._disk_lock:
+            row = self._disk.execute(
+                "SELECT expires_at, value FROM roadmap_cache WHERE cache_key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+
+        with self._lock:
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            # Disk okunurken aynı anahtar için yazılmış daha yeni kayıt varsa o verilir
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < row[0]:
+                entry = (row[0], json.loads(row[1]))
+                self._remember(key, *entry)
+            self._stats["disk_hits"] += 1
+            return copy.deepcopy(entry[1])
+
+    def put(self, key: str, value: Dict[str, Any]):
+        """Değerin kopyasını bellek ve (varsa) disk katmanına yaz"""
+        if not self.enabled:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._remember(key, expires_at, value)
+        if self._disk is None:
+            return
+
+        payload = json.dumps(value, ensure_ascii=False, default=str)
+        with self._disk_lock:
+            try:
+                self._disk.execute("INSERT OR REPLACE INTO roadmap_cache VALUES (?, ?, ?)", (key, expires_at, payload))
+                self._disk_puts += 1
+                if self._disk_puts >= max(1, self.disk_max_entries // 10):
+                    self._prune_disk()
+            except Exception as e:
+                logger.error(f"Roadmap önbelleği diske yazılamadı: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self._disk is not None:
+            with self._disk_lock:
+                self._disk.execute("DELETE FROM roadmap_cache")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._entries), "disk_tier": self._disk is not None, **self._stats}
+
+    def _prune_disk(self):
+        """Süresi dolan ve sınırı aşan en eski disk kayıtlarını sil (disk kilidi altında çağrılır)"""
+        self._disk_puts = 0
+        self._disk.execute("DELETE FROM roadmap_cache WHERE expires_at <= ?", (time.time(),))
+        self._disk.execute(
+            """DELETE FROM roadmap_cache WHERE cache_key IN (
+                   SELECT cache_key FROM roadmap_cache ORDER BY expires_at DESC LIMIT -1 OFFSET ?
+               )""",
+            (self.disk_max_entries,)
+        )
+
+    def _remember(self, key: str, expires_at: float, value: Dict[str, Any]):
+        """Kaydı belleğe ekle ve sınır aşılırsa en eski kullanılanları at (kilit altında çağrılır)"""
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+
+# Global önbellek instance
+roadmap_cache = RoadmapCache(
+    max_entries=ROADMAP_CACHE_MAX_ENTRIES,
+    ttl_seconds=ROADMAP_CACHE_TTL_SECONDS,
+    disk_file=ROADMAP_CACHE_DISK_FILE or None,
+    disk_max_entries=ROADMAP_CACHE_DISK_MAX_ENTRIES
+)
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Agent iş kuyruğu ve süre sınırı testleri
+Süresi aşılan roadmap çalışmasının iş olarak saklanması ve yeniden başlatmada kuyruğa dönmesi
+"""
+
+import asyncio
+import os
+import shutil
+import tempfile
+import threading
+
+from agents.base_agent import BaseAgent
+from agents.agent_manager import AgentManager
+from agents.job_queue import AgentJobStore
+
+class SlowAgent(BaseAgent):
+    """Süre sınırını aşacak kadar yavaş çalışan test agent'ı"""
+
+    capabilities = ("create_roadmap",)
+
+    def __init__(self, delay: float):
+        super().__init__("SlowAgent", "Slow test agent")
+        self.delay = delay
+        self.activate()
+
+    def can_handle_task(self, task_type):
+        return task_type in self.capabilities
+
+    async def execute_task(self, task):
+        await asyncio.sleep(self.delay)
+        return {"roadmap": task.get("user_info", {})}
+
+def _make_manager(test_dir: str, delay: float) -> AgentManager:
+    manager = AgentManager()
+    manager._job_store = AgentJobStore(os.path.join(test_dir, "agent_jobs.db"))
+    manager.register_agent(SlowAgent(delay))
+    return manager
+
+def _slow_task() -> dict:
+    return {"type": "create_roadmap", "agent": "SlowAgent", "user_info": {"topic": "python"}}
+
+def test_late_run_requeued_after_restart():
+    """Süresi aşılan çalışma 'running' olarak saklanmalı; yeniden açılışta load_pending onu kuyruğa almalı"""
+    print("⏱️ Geç Çalışma Yeniden Kuyruk Testi...")
+
+    test_dir = tempfile.mkdtemp()
+    try:
+        async def scenario():
+            manager = _make_manager(test_dir, delay=0.5)
+            response = await manager.execute_task_with_deadline(_slow_task(), "user_1", deadline=0.05)
+            assert response["success"] and response["degraded"]
+            job_id = response["upgrade_job_id"]
+            assert manager.get_job(job_id)["status"] == "running"
+
+            # Süreç çalışma bitmeden durmuş gibi aynı dosyayı yeni bir depo açar
+            restarted = AgentJobStore(os.path.join(test_dir, "agent_jobs.db"))
+            try:
+                pending = restarted.load_pending()
+                assert [job["job_id"] for job in pending] == [job_id]
+                assert pending[0]["status"] == "queued"
+            finally:
+                restarted.close()
+
+            # Çalışma sürdüğü yerde bitince sonuç işe yazılmalı
+            await asyncio.sleep(0.7)
+            assert manager.get_job(job_id)["status"] == "completed"
+            manager.job_store.close()
+
+        asyncio.run(scenario())
+    finally:
+        shutil.rmtree(test_dir)
+    print("✅ Geç çalışma yeniden başlatmada kuyruğa dönüyor")
+
+def test_deadline_without_template_agent():
+    """Şablon üretebilen agent yoksa süre sınırında zaman aşımı hatası dönmeli"""
+    print("⌛ Şablonsuz Süre Sınırı Testi...")
+
+    test_dir = tempfile.mkdtemp()
+    try:
+        async def scenario():
+            manager = _make_manager(test_dir, delay=0.3)
+            for agent_name in [name for name, agent in manager.agents.items()
+                               if hasattr(agent, "create_template_roadmap")]:
+                manager.unregister_agent(agent_name)
+
+            response = await manager.execute_task_with_deadline(_slow_task(), "user_1", deadline=0.05)
+            assert not response["success"] and response["timed_out"]
+            assert manager.job_store.load_pending() == []
+            await asyncio.sleep(0.4)
+            manager.job_store.close()
+
+        asyncio.run(scenario())
+    finally:
+        shutil.rmtree(test_dir)
+    print("✅ Şablon yokken zaman aşımı hatası dönüyor")
+
+def test_job_store_writes_off_loop():
+    """İş deposu yazmaları olay döngüsünü bloklamamalı; kuyruktaki iş işçi havuzunda tamamlanmalı"""
+    print("🧵 Döngü Dışı İş Deposu Testi...")
+
+    test_dir = tempfile.mkdtemp()
+    try:
+        async def scenario():
+            manager = _make_manager(test_dir, delay=0.01)
+            loop_thread = threading.current_thread()
+            writers = []
+            for name in ("add", "mark_running", "finish"):
+                method = getattr(manager.job_store, name)
+                def record(*args, _method=method, _name=name, **kwargs):
+                    writers.append((_name, threading.current_thread() is loop_thread))
+                    return _method(*args, **kwargs)
+                setattr(manager.job_store, name, record)
+
+            await manager.start_workers(worker_count=1)
+            job = await manager.submit_task(_slow_task(), priority="interactive", user_id="user_1")
+            await asyncio.wait_for(manager.task_queue.join(), timeout=2)
+            assert manager.get_job(job["job_id"])["status"] == "completed"
+            await manager.stop_workers()
+            assert [name for name, _ in writers] == ["add", "mark_running", "finish"]
+            assert not any(on_loop for _, on_loop in writers)
+
+        asyncio.run(scenario())
+    finally:
+        shutil.rmtree(test_dir)
+    print("✅ İş deposu yazmaları döngü dışında çalışıyor")
+
+def test_coalesced_caller_keeps_own_timeout():
+    """Ortak çalışmaya katılan çağrı kendi süre sınırında dönmeli; ortak çalışma sürmeli"""
+    print("🤝 Birleştirilmiş Çağrı Süre Sınırı Testi...")
+
+    test_dir = tempfile.mkdtemp()
+    try:
+        async def scenario():
+            manager = _make_manager(test_dir, delay=0.3)
+            leader = asyncio.ensure_future(manager.execute_task(_slow_task(), timeout=2))
+            await asyncio.sleep(0)
+            started = asyncio.get_running_loop().time()
+            follower = await manager.execute_task(_slow_task(), timeout=0.05)
+            assert asyncio.get_running_loop().time() - started < 0.2
+            assert follower["timed_out"] and follower["coalesced"] and not follower["success"]
+            result = await leader
+            assert result["success"] and "coalesced" not in result
+            manager.job_store.close()
+
+        asyncio.run(scenario())
+    finally:
+        shutil.rmtree(test_dir)
+    print("✅ Birleştirilmiş çağrı kendi süre sınırını koruyor")
+
+if __name__ == "__main__":
+    print("🚀 Agent İş Kuyruğu Testleri Başlatılıyor...\n")
+    test_late_run_requeued_after_restart()
+    test_deadline_without_template_agent()
+    test_job_store_writes_off_loop()
+    test_coalesced_caller_keeps_own_timeout()
+    print("\n🎉 Tüm iş kuyruğu testleri başarılı!")
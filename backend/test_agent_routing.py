@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Agent yönlendirme tablosu testleri
+Başarı oranı düşen agent'ın, tablo yenilendiğinde sıralamada geriye düşmesi
+"""
+
+from agents.agent_manager import AgentManager
+
+def _route(manager: AgentManager, task_type: str) -> str:
+    return manager._find_best_agent_for_task({"type": task_type}).name
+
+def test_langchain_preferred_by_default():
+    """Henüz çalışmamış LangChain agent create_roadmap için ilk sırada olmalı"""
+    print("🧭 Varsayılan Yönlendirme Testi...")
+
+    manager = AgentManager()
+    assert _route(manager, "create_roadmap") == "LangChainRoadmapAgent"
+    assert _route(manager, "analyze_roadmap") == "RoadmapAgent"
+    print("✅ LangChain agent varsayılan olarak tercih ediliyor")
+
+def test_routing_follows_success_rate():
+    """Sürekli hata veren LangChain agent yenilemeden sonra RoadmapAgent'ın gerisine düşmeli"""
+    print("📉 Başarı Oranı Yönlendirme Testi...")
+
+    manager = AgentManager()
+    manager.routing_refresh_seconds = 60
+    for _ in range(5):
+        manager._update_agent_stats("LangChainRoadmapAgent", success=False, execution_time=0.1)
+        manager._update_agent_stats("RoadmapAgent", success=True, execution_time=0.1)
+
+    # Yenileme aralığı dolmadan tablo değişmemeli
+    assert _route(manager, "create_roadmap") == "LangChainRoadmapAgent"
+
+    manager._routes_refreshed_at -= manager.routing_refresh_seconds
+    assert _route(manager, "create_roadmap") == "RoadmapAgent"
+
+    # Başarı oranı toparlanınca LangChain agent yeniden öne geçmeli
+    for _ in range(20):
+        manager._update_agent_stats("LangChainRoadmapAgent", success=True, execution_time=0.1)
+    manager._refresh_routes()
+    assert _route(manager, "create_roadmap") == "LangChainRoadmapAgent"
+    print("✅ Yönlendirme tablosu başarı oranını izliyor")
+
+if __name__ == "__main__":
+    print("🚀 Agent Yönlendirme Testleri Başlatılıyor...\n")
+    test_langchain_preferred_by_default()
+    test_routing_follows_success_rate()
+    print("\n🎉 Tüm yönlendirme testleri başarılı!")
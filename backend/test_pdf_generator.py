@@ -5,9 +5,45 @@ PDF Generator Test Script
 
 import sys
 import os
+import re
+import shutil
+import tempfile
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from rag.pdf_generator import PDFGenerator
+import reportlab
+from reportlab import rl_config
+from reportlab.platypus import PageBreak
+
+import rag.pdf_generator as pdf_generator_module
+from rag.pdf_generator import PDFGenerator, LazyStory
+
+def _large_roadmap(module_count: int) -> dict:
+    return {
+        "title": "Büyük Roadmap",
+        "description": "Çok modüllü test roadmap'i",
+        "modules": [
+            {
+                "title": f"Modül {i}",
+                "description": "Açıklama metni " * 20,
+                "resources": [f"Kaynak {j}" for j in range(3)],
+                "tasks": [f"Görev {j}" for j in range(2)]
+            }
+            for i in range(module_count)
+        ]
+    }
+
+def _page_count(data: bytes) -> int:
+    return len(re.findall(rb"/Type /Page\b", data))
+
+def _assert_well_formed(path: str):
+    """Başlık, dosya sonu, xref konumu ve sayfa ağacı sayısı tutarlı olmalı"""
+    with open(path, "rb") as f:
+        data = f.read()
+    assert data.startswith(b"%PDF-") and data.rstrip().endswith(b"%%EOF")
+    xref_offset = int(re.findall(rb"startxref\s+(\d+)", data)[-1])
+    assert data[xref_offset:xref_offset + 4] == b"xref"
+    assert int(re.search(rb"/Count (\d+)", data).group(1)) == _page_count(data) > 0
+    return data
 
 def test_pdf_generator():
     """PDF Generator'ı test eder"""
@@ -76,9 +112,90 @@ def test_pdf_generator():
         traceback.print_exc()
         return False
 
+def test_lazy_story_matches_eager():
+    """Tembel story, tüm flowable'ları önceden kuran listeyle aynı PDF'i üretmeli ve bir modülden fazlasını tutmamalı"""
+    print("📚 Tembel Story Testi...")
+
+    test_dir = tempfile.mkdtemp()
+    invariant = rl_config.invariant
+    # Sabit zaman damgası ve belge kimliğiyle iki çıktı bayt bayt karşılaştırılabilir
+    rl_config.invariant = 1
+    try:
+        pdf_gen = PDFGenerator(output_directory=test_dir)
+        roadmap = _large_roadmap(300)
+        user = {"name": "Test User"}
+
+        lazy_path = pdf_gen.generate_roadmap_pdf(roadmap, user)
+        eager_path = os.path.join(test_dir, "eager.pdf")
+        pdf_gen._create_document(eager_path).build(
+            pdf_gen._create_title_page(roadmap, user) + [PageBreak()]
+            + pdf_gen._create_table_of_contents(roadmap) + [PageBreak()]
+            + pdf_gen._create_roadmap_content(roadmap)
+        )
+        with open(lazy_path, "rb") as f:
+            lazy = f.read()
+        with open(eager_path, "rb") as f:
+            eager = f.read()
+        assert lazy == eager and _page_count(lazy) > 100
+
+        # Yeni modül istendiğinde tamponda önceki modülden kalan en fazla bir parça olmalı
+        buffered = []
+        def chunks():
+            for index, module in enumerate(roadmap["modules"], 1):
+                buffered.append(len(story._buffer))
+                yield pdf_gen._create_module_content(index, module)
+        story = LazyStory(chunks())
+        pdf_gen._create_document(os.path.join(test_dir, "bounded.pdf")).build(story)
+        assert len(buffered) == 300
+        assert max(buffered) <= len(pdf_gen._create_module_content(1, roadmap["modules"][0]))
+    finally:
+        rl_config.invariant = invariant
+        shutil.rmtree(test_dir)
+    print("✅ Tembel story aynı PDF'i sınırlı bellekle üretiyor")
+
+def test_shared_styles_with_embedded_font():
+    """PDF_FONT_PATH ile ardışık iki PDF alt küme font gömmeli, paylaşılan stiller değişmemeli"""
+    print("🔤 Gömülü Font ve Paylaşılan Stil Testi...")
+
+    test_dir = tempfile.mkdtemp()
+    font_paths = (pdf_generator_module.PDF_FONT_PATH, pdf_generator_module.PDF_BOLD_FONT_PATH)
+    font_dir = os.path.join(os.path.dirname(reportlab.__file__), "fonts")
+    pdf_generator_module.PDF_FONT_PATH = os.path.join(font_dir, "Vera.ttf")
+    pdf_generator_module.PDF_BOLD_FONT_PATH = os.path.join(font_dir, "VeraBd.ttf")
+    pdf_generator_module._register_fonts.cache_clear()
+    try:
+        pdf_gen = PDFGenerator(output_directory=test_dir)
+        assert (pdf_gen.font_name, pdf_gen.bold_font_name) == ("MyWisePathSans", "MyWisePathSans-Bold")
+        styles = {name: dict(vars(style)) for name, style in pdf_gen.styles.byName.items()}
+        table_commands = list(pdf_gen.stats_table_style.getCommands())
+
+        roadmap_path = pdf_gen.generate_roadmap_pdf(_large_roadmap(5), {"name": "Işıl Çağrı"})
+        report_path = pdf_gen.generate_progress_report_pdf({
+            "total_roadmaps": 1, "total_completed_modules": 2, "total_time_spent_minutes": 90,
+            "overall_completion_rate": 40, "roadmaps": [{"roadmap_id": "r1", "overall_progress": 40}]
+        })
+        for path in (roadmap_path, report_path):
+            data = _assert_well_formed(path)
+            # Alt küme fontlar "AAAAAA+" önekiyle gömülür
+            assert re.search(rb"/BaseFont /[A-Z]{6}\+BitstreamVeraSans-Roman", data)
+            assert b"/FontFile2" in data
+
+        # İkinci örnek aynı stil nesnelerini almalı; belgeler bu nesneleri değiştirmemeli
+        second = PDFGenerator(output_directory=test_dir)
+        assert second.styles is pdf_gen.styles and second.stats_table_style is pdf_gen.stats_table_style
+        assert {name: dict(vars(style)) for name, style in second.styles.byName.items()} == styles
+        assert list(second.stats_table_style.getCommands()) == table_commands
+    finally:
+        pdf_generator_module.PDF_FONT_PATH, pdf_generator_module.PDF_BOLD_FONT_PATH = font_paths
+        pdf_generator_module._register_fonts.cache_clear()
+        shutil.rmtree(test_dir)
+    print("✅ Gömülü font alt kümesi ve paylaşılan stiller doğru")
+
 if __name__ == "__main__":
     print("🚀 PDF Generator Test Başlatılıyor...")
     success = test_pdf_generator()
+    test_lazy_story_matches_eager()
+    test_shared_styles_with_embedded_font()
     
     if success:
         print("\n🎉 Test başarılı! PDF Generator çalışıyor.")
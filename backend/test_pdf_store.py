@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+PDF Artifact Store Test Script
+Bayt bütçesinde LRU tahliyesi, dosya sistemiyle eşitleme ve kaynak anahtarıyla yeniden kullanımı test eder
+"""
+
+import sys
+import os
+import time
+import shutil
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from rag.pdf_store import PDFArtifactStore
+
+def _write_pdf(directory: str, filename: str, size: int, mtime: float = None) -> str:
+    path = os.path.join(directory, filename)
+    with open(path, "wb") as f:
+        f.write(b"%PDF" + b"x" * (size - 4))
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return path
+
+def test_lru_eviction_under_budget():
+    """Bütçe aşılınca en uzun süredir erişilmeyen dosyalar diskten silinmeli"""
+    print("🗑️ LRU Tahliye Testi...")
+
+    test_dir = tempfile.mkdtemp()
+    try:
+        store = PDFArtifactStore(test_dir, max_total_bytes=300)
+        a = store.register(_write_pdf(test_dir, "a.pdf", 100))
+        store.register(_write_pdf(test_dir, "b.pdf", 100))
+        store.register(_write_pdf(test_dir, "c.pdf", 100))
+        assert store.total_bytes == 300 and len(store) == 3
+        assert a.content_hash and a.size_bytes == 100
+
+        # a'ya erişilince en eski dosya b olur
+        assert store.touch("a.pdf") is not None
+        store.register(_write_pdf(test_dir, "d.pdf", 100))
+        assert "b.pdf" not in store and not os.path.exists(os.path.join(test_dir, "b.pdf"))
+        assert [artifact["filename"] for artifact in store.list_artifacts()] == ["d.pdf", "a.pdf", "c.pdf"]
+        assert store.total_bytes == 300
+
+        # Bütçeden büyük yeni dosya korunur, diğerleri silinir
+        store.register(_write_pdf(test_dir, "big.pdf", 500))
+        assert len(store) == 1 and "big.pdf" in store and store.total_bytes == 500
+        assert sorted(os.listdir(test_dir)) == ["big.pdf"]
+
+        # Aynı dosyanın yeniden kaydı toplamı iki kez saymamalı
+        store.register(_write_pdf(test_dir, "big.pdf", 200))
+        assert len(store) == 1 and store.total_bytes == 200
+        assert store.get_stats()["usage_ratio"] == round(200 / 300, 4)
+    finally:
+        shutil.rmtree(test_dir)
+    print("✅ LRU tahliyesi bütçeye uyuyor")
+
+def test_reconcile_with_disk():
+    """Eşitleme dışarıdan eklenen dosyaları LRU ucuna almalı, silinenleri indeksten çıkarmalı"""
+    print("🔄 Eşitleme Testi...")
+
+    test_dir = tempfile.mkdtemp()
+    try:
+        now = time.time()
+        _write_pdf(test_dir, "old.pdf", 100, mtime=now - 300)
+        _write_pdf(test_dir, "older.pdf", 100, mtime=now - 600)
+        _write_pdf(test_dir, "notes.txt", 100)
+        store = PDFArtifactStore(test_dir, max_total_bytes=1000, reconcile_interval_seconds=3600)
+        assert [artifact["filename"] for artifact in store.list_artifacts()] == ["old.pdf", "older.pdf"]
+
+        store.register(_write_pdf(test_dir, "new.pdf", 100))
+        os.remove(os.path.join(test_dir, "old.pdf"))
+        _write_pdf(test_dir, "external.pdf", 100, mtime=now - 100)
+        # Eşitleme aralığı dolmadan indeks diske bakmaz
+        assert store.get("old.pdf") is not None and store.get("external.pdf") is None
+
+        result = store.reconcile()
+        assert (result["added"], result["removed"], result["total_files"]) == (1, 1, 3)
+        # Eşitlemede bulunan dosyalar hiç erişilmemiş sayılır ve en eski uca eklenir
+        assert [artifact["filename"] for artifact in store.list_artifacts()] == ["new.pdf", "older.pdf", "external.pdf"]
+        assert store.total_bytes == 300
+
+        # Eşitlemede bütçe aşılırsa en eski dosyalar silinir
+        store.max_total_bytes = 200
+        store.reconcile()
+        assert "external.pdf" not in store and not os.path.exists(os.path.join(test_dir, "external.pdf"))
+
+        assert store.evict_older_than(60) == 1
+        assert [artifact["filename"] for artifact in store.list_artifacts()] == ["new.pdf"]
+    finally:
+        shutil.rmtree(test_dir)
+    print("✅ İndeks dosya sistemiyle eşitleniyor")
+
+def test_find_by_source():
+    """Aynı kaynak anahtarı var olan dosyayı döndürmeli; dosya silinince kayıt bırakılmalı"""
+    print("🔎 Kaynak Anahtarı Testi...")
+
+    test_dir = tempfile.mkdtemp()
+    try:
+        store = PDFArtifactStore(test_dir, max_total_bytes=250, reconcile_interval_seconds=3600)
+        store.register(_write_pdf(test_dir, "a.pdf", 100), source_key="roadmap-a")
+        store.register(_write_pdf(test_dir, "b.pdf", 100), source_key="roadmap-b")
+        assert store.find_by_source("roadmap-a") == os.path.join(test_dir, "a.pdf")
+        assert store.find_by_source("missing") is None
+
+        # find_by_source erişimi yeniler: tahliyede b silinir, a kalır
+        store.register(_write_pdf(test_dir, "c.pdf", 100), source_key="roadmap-c")
+        assert store.find_by_source("roadmap-b") is None
+        assert store.find_by_source("roadmap-a") is not None
+
+        # Dışarıdan silinen dosya yeniden üretim için None döndürmeli
+        os.remove(os.path.join(test_dir, "a.pdf"))
+        assert store.find_by_source("roadmap-a") is None
+        assert "a.pdf" not in store and store.total_bytes == 100
+
+        # Kaynak anahtarı yeni dosyaya taşınınca eski dosyanın silinmesi onu unutturmamalı
+        store.register(_write_pdf(test_dir, "c2.pdf", 100), source_key="roadmap-c")
+        assert store.remove("c.pdf")
+        assert store.find_by_source("roadmap-c") == os.path.join(test_dir, "c2.pdf")
+        assert not store.remove("c.pdf")
+    finally:
+        shutil.rmtree(test_dir)
+    print("✅ Kaynak anahtarıyla yeniden kullanım doğru")
+
+if __name__ == "__main__":
+    print("🚀 PDF Deposu Testleri Başlatılıyor...\n")
+    test_lru_eviction_under_budget()
+    test_reconcile_with_disk()
+    test_find_by_source()
+    print("\n🎉 Tüm PDF deposu testleri başarılı!")
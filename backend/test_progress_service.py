@@ -0,0 +1,850 @@
+#!/usr/bin/env python3
+"""
+Progress Service Test Script
+İlerleme servisinin depolama ve indeks davranışlarını test eder
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import time
+import asyncio
+import json
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.progress_service import ProgressService
+from services.quiz_engine import QuizEngine
+from services.progress_store import ProgressEventLog, SQLiteProgressStore, BatchingProgressStore, BinarySnapshotStore
+from services.progress_analytics import ProgressColumns
+from models.progress import (
+    ProgressUpdate, ProgressStatus, QuizSubmission, QuizResult, RoadmapProgress,
+    QuizAnswerKey, QuizQuestionKey, QuizQuestionType, QuizBulkGradeRequest, QuizBulkSubmission
+)
+from fastapi.encoders import jsonable_encoder
+
+def _make_service(test_dir: str, backend: str, durability: str = "fsync_every_commit") -> ProgressService:
+    progress_file = os.path.join(test_dir, "user_progress.json")
+    if backend == "sqlite":
+        store = SQLiteProgressStore(os.path.join(test_dir, "user_progress.db"), legacy_json_file=progress_file)
+    elif backend == "binary":
+        store = BinarySnapshotStore(os.path.join(test_dir, "user_progress.bin"),
+                                    legacy_json_file=progress_file, snapshot_every=5)
+    else:
+        store = ProgressEventLog(progress_file, snapshot_every=5)
+    if durability != "fsync_every_commit":
+        store = BatchingProgressStore(store, policy=durability, flush_interval_ms=50)
+    quiz_engine = QuizEngine(os.path.join(test_dir, "quiz_keys.json"))
+    quiz_engine.set_key(QuizAnswerKey(quiz_id="quiz_1", questions=[
+        QuizQuestionKey(question_id="q1", accepted_answers=["a"])
+    ]))
+    return ProgressService(progress_file=progress_file, store=store, quiz_engine=quiz_engine)
+
+def _settle_snapshots(service: ProgressService):
+    """Arka plandaki snapshot'ı bitir; kapatılmamış servisin dosyaları ikinci bir örnekle açılmadan önce çağrılır"""
+    store = getattr(service.store, "inner", service.store)
+    if isinstance(store, ProgressEventLog):
+        store._stop_snapshots()
+
+def _apply_sample_updates(service: ProgressService):
+    service.update_module_progress("user_1", "roadmap_a", ProgressUpdate(
+        module_id="m1", progress_percentage=50, time_spent_minutes=30, status=ProgressStatus.IN_PROGRESS
+    ))
+    service.update_module_progress("user_1", "roadmap_a", ProgressUpdate(
+        module_id="m2", progress_percentage=100, time_spent_minutes=45, status=ProgressStatus.COMPLETED
+    ))
+    service.update_module_progress("user_1", "roadmap_b", ProgressUpdate(
+        module_id="m1", progress_percentage=10, time_spent_minutes=5, status=ProgressStatus.IN_PROGRESS
+    ))
+    service.update_module_progress("user_1_x", "roadmap_a", ProgressUpdate(
+        module_id="m1", progress_percentage=100, time_spent_minutes=60, status=ProgressStatus.COMPLETED
+    ))
+    service.submit_quiz_result("user_1", "roadmap_a", QuizSubmission(
+        module_id="m1", quiz_id="quiz_1", answers={"q1": "a"}, time_taken_minutes=5
+    ))
+
+def test_persistence_roundtrip():
+    """Her iki depoda da veriler yeniden açılışta aynı şekilde yüklenmeli"""
+    print("💾 Kalıcılık Testleri...")
+
+    for backend in ("jsonlog", "sqlite", "binary"):
+        test_dir = tempfile.mkdtemp()
+        try:
+            service = _make_service(test_dir, backend)
+            _apply_sample_updates(service)
+            before = service.get_user_progress_summary("user_1")
+
+            _settle_snapshots(service)
+            reopened = _make_service(test_dir, backend)
+            after = reopened.get_user_progress_summary("user_1")
+
+            assert before == after, f"{backend}: yeniden yüklenen veri farklı"
+            assert after["total_roadmaps"] == 2
+            print(f"✅ {backend}: veriler yeniden açılışta korundu")
+        finally:
+            shutil.rmtree(test_dir)
+
+def test_json_migration_to_sqlite():
+    """Eski JSON dosyası SQLite deposuna otomatik taşınmalı"""
+    print("🔁 JSON -> SQLite Taşıma Testi...")
+
+    test_dir = tempfile.mkdtemp()
+    try:
+        json_service = _make_service(test_dir, "jsonlog")
+        _apply_sample_updates(json_service)
+        json_service.close()
+        expected = json_service.get_user_progress_summary("user_1")
+
+        sqlite_service = _make_service(test_dir, "sqlite")
+        assert sqlite_service.get_user_progress_summary("user_1") == expected
+        print("✅ JSON verileri SQLite'a taşındı")
+    finally:
+        shutil.rmtree(test_dir)
+
+def test_user_index_isolation():
+    """Kullanıcı özeti yalnızca o kullanıcının roadmap'lerini içermeli"""
+    print("🗂️ Kullanıcı İndeksi Testi...")
+
+    test_dir = tempfile.mkdtemp()
+    try:
+        service = _make_service(test_dir, "sqlite")
+        _apply_sample_updates(service)
+
+        # "user_1_x" anahtarı "user_1_" önekiyle başlasa da user_1'e ait değildir
+        summary = service.get_user_progress_summary("user_1")
+        assert {r["user_id"] for r in summary["roadmaps"]} == {"user_1"}
+        assert service.get_user_progress_summary("user_1_x")["total_roadmaps"] == 1
+
+        # Roadmap sıfırlanınca eski modüller indeksten kalkmalı
+        service.initialize_roadmap_progress("user_1", "roadmap_a", 3)
+        progress = service.get_roadmap_progress("user_1", "roadmap_a")
+        assert progress.module_progress == []
+        assert service._find_module("user_1_roadmap_a", "m1") is None
+        print("✅ Kullanıcı ve modül indeksleri tutarlı")
+    finally:
+        shutil.rmtree(test_dir)
+
+def test_incremental_aggregates():
+    """Artımlı toplamlar tam yeniden hesaplamayla aynı olmalı"""
+    print("🧮 Artımlı Toplam Testi...")
+
+    test_dir = tempfile.mkdtemp()
+    try:
+        service = _make_service(test_dir, "sqlite")
+        _apply_sample_updates(service)
+        service.update_module_progress("user_1", "roadmap_a", ProgressUpdate(
+            module_id="m2", progress_percentage=40, time_spent_minutes=10, status=ProgressStatus.PAUSED
+        ))
+
+        progress = service.get_roadmap_progress("user_1", "roadmap_a")
+        modules = progress.module_progress
+        assert progress.total_modules == len(modules)
+        assert progress.completed_modules == sum(1 for m in modules if m.status == ProgressStatus.COMPLETED)
+        assert progress.total_time_spent_minutes == sum(m.time_spent_minutes for m in modules)
+        assert progress.overall_progress == sum(m.progress_percentage for m in modules) // len(modules)
+        assert service.verify_aggregates() == []
+
+        # Bozulan toplamlar doğrulama rutiniyle onarılmalı
+        service._aggregates["user_1_roadmap_a"]["time_sum"] += 999
+        assert service.verify_aggregates() == ["user_1_roadmap_a"]
+        assert service.verify_aggregates() == []
+        print("✅ Artımlı toplamlar tutarlı")
+    finally:
+        shutil.rmtree(test_dir)
+
+def test_batched_writes():
+    """Toplu yazma modunda güncellemeler birleştirilip kapanışta diske yazılmalı"""
+    print("📦 Toplu Yazma Testi...")
+
+    for backend in ("jsonlog", "sqlite"):
+        for durability in ("batched", "async"):
+            test_dir = tempfile.mkdtemp()
+            try:
+                service = _make_service(test_dir, backend, durability)
+                for minutes in range(1, 21):
+                    service.update_module_progress("user_1", "roadmap_a", ProgressUpdate(
+                        module_id="m1", progress_percentage=minutes * 5, time_spent_minutes=minutes,
+                        status=ProgressStatus.IN_PROGRESS
+                    ))
+                expected = service.get_user_progress_summary("user_1")
+                service.close()
+
+                assert service.store.stats["records_coalesced"] > 0
+                reopened = _make_service(test_dir, backend)
+                assert reopened.get_user_progress_summary("user_1") == expected
+                print(f"✅ {backend}/{durability}: toplu yazma tutarlı")
+            finally:
+                shutil.rmtree(test_dir)
+
+def test_batched_reads_skip_flush():
+    """Tembel okumalar yazıcıyı beklememeli; bekleyen kayıtlar okunan verinin üzerine bindirilmeli"""
+    print("📖 Bekleyen Kayıt Okuma Testi...")
+
+    test_dir = tempfile.mkdtemp()
+    try:
+        inner = SQLiteProgressStore(os.path.join(test_dir, "user_progress.db"))
+        store = BatchingProgressStore(inner, policy="batched", flush_interval_ms=60000)
+        service = ProgressService(progress_file=os.path.join(test_dir, "user_progress.json"), store=store,
+                                  quiz_engine=QuizEngine(os.path.join(test_dir, "quiz_keys.json")),
+                                  archive_after_days=0)
+        service.update_module_progress("user_1", "roadmap_a", ProgressUpdate(
+            module_id="m1", progress_percentage=50, time_spent_minutes=30, status=ProgressStatus.IN_PROGRESS
+        ))
+        store.flush()
+        service.update_module_progress("user_1", "roadmap_a", ProgressUpdate(
+            module_id="m1", progress_percentage=100, time_spent_minutes=45, status=ProgressStatus.COMPLETED
+        ))
+        service.update_module_progress("user_1", "roadmap_a", ProgressUpdate(
+            module_id="m2", progress_percentage=10, time_spent_minutes=5, status=ProgressStatus.IN_PROGRESS
+        ))
+        service.update_module_progress("user_10", "roadmap_a", ProgressUpdate(
+            module_id="m1", progress_percentage=20, time_spent_minutes=5, status=ProgressStatus.IN_PROGRESS
+        ))
+        pending = store.pending_count()
+        assert pending > 0
+
+        roadmap = store.load_user("user_1")["user_1_roadmap_a"]
+        modules = {mp["module_id"]: mp for mp in roadmap["module_progress"]}
+        assert modules["m1"]["progress_percentage"] == 100 and modules["m2"]["time_spent_minutes"] == 5
+        assert roadmap["completed_modules"] == 1
+        assert list(store.load_user("user_10")) == ["user_10_roadmap_a"]
+        assert store.load_roadmap("user_1", "roadmap_a")["completed_modules"] == 1
+        daily = [values for _, _, granularity, _, values in store.load_rollups("user_1") if granularity == "day"]
+        assert sum(values[0] for values in daily) == 50
+        # Okumalar bekleyen kayıtları diske yazmamalı
+        assert store.pending_count() == pending and inner.load_user("user_1")["user_1_roadmap_a"]["completed_modules"] == 0
+        service.close()
+        print("✅ Bekleyen kayıtlar diske yazılmadan okunuyor")
+    finally:
+        shutil.rmtree(test_dir)
+
+def test_background_snapshot():
+    """Snapshot eşiğini aşan istek snapshot'ı kendisi almamalı; snapshot iş parçacığı almalı"""
+    print("📸 Arka Plan Snapshot Testi...")
+
+    test_dir = tempfile.mkdtemp()
+    try:
+        service = _make_service(test_dir, "jsonlog")
+        copy_threads = []
+        copy_progress_data = service._copy_progress_data
+
+        def recording_copy():
+            copy_threads.append(threading.current_thread().name)
+            return copy_progress_data()
+
+        service._copy_progress_data = recording_copy
+        for minutes in range(1, 13):
+            service.update_module_progress("user_1", "roadmap_a", ProgressUpdate(
+                module_id=f"m{minutes % 4}", progress_percentage=minutes * 5, time_spent_minutes=minutes,
+                status=ProgressStatus.IN_PROGRESS
+            ))
+        expected = service.get_user_progress_summary("user_1")
+        _settle_snapshots(service)
+
+        assert copy_threads and set(copy_threads) == {"progress-snapshot"}
+        assert os.path.exists(os.path.join(test_dir, "user_progress.json"))
+        reopened = _make_service(test_dir, "jsonlog")
+        assert reopened.get_user_progress_summary("user_1") == expected
+        print("✅ Snapshot istek dışında alınıyor")
+    finally:
+        shutil.rmtree(test_dir)
+
+def test_concurrent_writers():
+    """64 eşzamanlı yazıcı güncelleme kaybetmemeli ve depo bozulmamalı"""
+    print("🧵 Eşzamanlı Yazma Testi...")
+
+    for backend, durability in (("jsonlog", "fsync_every_commit"), ("sqlite", "batched"), ("binary", "batched")):
+        test_dir = tempfile.mkdtemp()
+        try:
+            service = _make_service(test_dir, backend, durability)
+            errors = []
+
+            def writer(index: int):
+                try:
+                    # Her kullanıcı kendi roadmap'ini, ayrıca herkes ortak bir kullanıcıyı günceller
+                    for module in range(10):
+                        service.update_module_progress(f"user_{index}", "roadmap_a", ProgressUpdate(
+                            module_id=f"m{module}", progress_percentage=100, time_spent_minutes=1,
+                            status=ProgressStatus.COMPLETED
+                        ))
+                    service.update_module_progress("shared", "roadmap_a", ProgressUpdate(
+                        module_id=f"m{index}", progress_percentage=50, time_spent_minutes=2,
+                        status=ProgressStatus.IN_PROGRESS
+                    ))
+                except Exception as e:
+                    errors.append(e)
+
+            threads = [threading.Thread(target=writer, args=(i,)) for i in range(64)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            assert errors == [], errors
+            assert service.verify_aggregates() == []
+            shared = service.get_roadmap_progress("shared", "roadmap_a")
+            assert shared.total_modules == 64 and shared.total_time_spent_minutes == 128
+            service.close()
+
+            reopened = _make_service(test_dir, backend)
+            assert reopened.get_roadmap_progress("shared", "roadmap_a").total_modules == 64
+            for i in range(64):
+                assert reopened.get_roadmap_progress(f"user_{i}", "roadmap_a").completed_modules == 10
+            print(f"✅ {backend}/{durability}: eşzamanlı güncellemeler kaybolmadı")
+        finally:
+            shutil.rmtree(test_dir)
+
+def test_writers_skip_global_locks():
+    """Toplu yazmalı depoda istek iş parçacıkları SQLite yazma kilidini ve diğer kullanıcıların dilimini beklememeli"""
+    print("🔓 Kilit Çekişmesi Testi...")
+
+    test_dir = tempfile.mkdtemp()
+    try:
+        service = _make_service(test_dir, "sqlite", "batched")
+        store = service.store
+        blocked_stripe = store._stripe("blocked_user")
+        users = [f"user_{i}" for i in range(200) if store._stripe(f"user_{i}") is not blocked_stripe][:64]
+        errors = []
+
+        def writer(user_id: str):
+            try:
+                for module in range(5):
+                    service.update_module_progress(user_id, "roadmap_a", ProgressUpdate(
+                        module_id=f"m{module}", progress_percentage=100, time_spent_minutes=1,
+                        status=ProgressStatus.COMPLETED
+                    ))
+                assert service.get_roadmap_progress(user_id, "roadmap_a").completed_modules == 5
+            except Exception as e:
+                errors.append(e)
+
+        # Uzun süren bir group commit (SQLite yazma kilidi) ve tek bir dilimi tutan yazıcı
+        with store.inner._lock, blocked_stripe.lock:
+            threads = [threading.Thread(target=writer, args=(user_id,)) for user_id in users]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(timeout=10)
+            assert not any(thread.is_alive() for thread in threads), "yazıcılar küresel bir kilidi bekledi"
+
+        assert errors == [], errors
+        service.close()
+
+        reopened = _make_service(test_dir, "sqlite")
+        for user_id in users:
+            assert reopened.get_roadmap_progress(user_id, "roadmap_a").completed_modules == 5
+        reopened.close()
+    finally:
+        shutil.rmtree(test_dir)
+    print("✅ Farklı kullanıcıların yazmaları ortak kilitte beklemiyor")
+
+def test_multiprocess_mode():
+    """Aynı veritabanını paylaşan iki servis birbirinin yazmalarını görmeli"""
+    print("🔒 Çok Süreçli Mod Testi...")
+
+    test_dir = tempfile.mkdtemp()
+    try:
+        db_file = os.path.join(test_dir, "user_progress.db")
+        workers = [
+            ProgressService(
+                progress_file=os.path.join(test_dir, "user_progress.json"),
+                store=SQLiteProgressStore(db_file, legacy_json_file=None, cross_process=True),
+                multiprocess=True
+            )
+            for _ in range(2)
+        ]
+
+        for module in range(6):
+            worker = workers[module % 2]
+            worker.update_module_progress("user_1", "roadmap_a", ProgressUpdate(
+                module_id=f"m{module}", progress_percentage=100, time_spent_minutes=5,
+                status=ProgressStatus.COMPLETED
+            ))
+
+        for worker in workers:
+            progress = worker.get_roadmap_progress("user_1", "roadmap_a")
+            assert progress.total_modules == 6 and progress.completed_modules == 6
+        print("✅ Worker'lar arasında güncellemeler kaybolmadı")
+    finally:
+        shutil.rmtree(test_dir)
+
+def test_weekly_rollups():
+    """Haftalık seri zaman kovalarından gelmeli ve yeniden açılışta korunmalı"""
+    print("📅 Haftalık Kova Testi...")
+
+    for backend in ("jsonlog", "sqlite"):
+        test_dir = tempfile.mkdtemp()
+        try:
+            service = _make_service(test_dir, backend, "batched")
+            service.update_module_progress("user_1", "roadmap_a", ProgressUpdate(
+                module_id="m1", progress_percentage=50, time_spent_minutes=30, status=ProgressStatus.IN_PROGRESS
+            ))
+            service.update_module_progress("user_1", "roadmap_a", ProgressUpdate(
+                module_id="m1", progress_percentage=100, time_spent_minutes=45, status=ProgressStatus.COMPLETED
+            ))
+            service.update_module_progress("user_1", "roadmap_a", ProgressUpdate(
+                module_id="m2", progress_percentage=0, time_spent_minutes=10, status=ProgressStatus.IN_PROGRESS
+            ))
+
+            weekly = service.get_weekly_progress("user_1", "roadmap_a")
+            assert len(weekly) == 4 and [w["week"] for w in weekly] == [1, 2, 3, 4]
+            current = weekly[-1]
+            assert current["time_spent_minutes"] == 55
+            assert current["modules_completed"] == 1
+            assert current["progress"] == service.get_roadmap_progress("user_1", "roadmap_a").overall_progress
+            assert all(w["time_spent_minutes"] == 0 for w in weekly[:-1])
+            assert service.get_monthly_progress("user_1", "roadmap_a", 2)[-1]["time_spent_minutes"] == 55
+            service.close()
+
+            reopened = _make_service(test_dir, backend)
+            assert reopened.get_weekly_progress("user_1", "roadmap_a") == weekly
+            print(f"✅ {backend}: haftalık seri tutarlı")
+        finally:
+            shutil.rmtree(test_dir)
+
+def test_batch_updates():
+    """Toplu güncelleme tek tek güncellemelerle aynı sonucu vermeli ve tek yazmayla kalıcı olmalı"""
+    print("📥 Toplu Güncelleme Testi...")
+
+    updates = [
+        ProgressUpdate(module_id=f"m{i % 10}", progress_percentage=(i * 7) % 101,
+                       time_spent_minutes=i, status=ProgressStatus.IN_PROGRESS)
+        for i in range(100)
+    ]
+
+    for backend in ("jsonlog", "sqlite"):
+        test_dir = tempfile.mkdtemp()
+        try:
+            single = _make_service(tempfile.mkdtemp(dir=test_dir), backend)
+            for update in updates:
+                single.update_module_progress("user_1", "roadmap_a", update)
+
+            service = _make_service(test_dir, backend)
+            results = service.update_modules_batch("user_1", "roadmap_a", updates)
+            assert [m.module_id for m in results] == [f"m{i}" for i in range(10)]
+
+            expected = single.get_roadmap_progress("user_1", "roadmap_a")
+            progress = service.get_roadmap_progress("user_1", "roadmap_a")
+            assert progress.overall_progress == expected.overall_progress
+            assert progress.total_time_spent_minutes == expected.total_time_spent_minutes
+            assert service.get_weekly_progress("user_1", "roadmap_a") == single.get_weekly_progress("user_1", "roadmap_a")
+            assert service.verify_aggregates() == []
+
+            _settle_snapshots(service)
+            reopened = _make_service(test_dir, backend)
+            assert reopened.get_user_progress_summary("user_1") == service.get_user_progress_summary("user_1")
+
+            # Aynı modül bir toplu güncellemede geri gidip ilerlerse yalnızca net fark sayılmalı
+            service.update_module_progress("user_1", "roadmap_b", ProgressUpdate(module_id="m0", progress_percentage=10, time_spent_minutes=10, status=ProgressStatus.IN_PROGRESS))
+            service.update_modules_batch("user_1", "roadmap_b", [
+                ProgressUpdate(module_id="m0", progress_percentage=minutes, time_spent_minutes=minutes, status=ProgressStatus.IN_PROGRESS)
+                for minutes in (5, 20)
+            ])
+            assert sum(week["time_spent_minutes"] for week in service.get_weekly_progress("user_1", "roadmap_b")) == 20
+            assert service.verify_aggregates() == []
+            print(f"✅ {backend}: toplu güncelleme tutarlı")
+        finally:
+            shutil.rmtree(test_dir)
+
+def test_trusted_reads():
+    """Doğrulamasız okuma yolu, model üzerinden serileştirmeyle aynı JSON'u üretmeli"""
+    print("⚡ Doğrulamasız Okuma Testi...")
+
+    for backend in ("jsonlog", "sqlite"):
+        test_dir = tempfile.mkdtemp()
+        try:
+            service = _make_service(test_dir, backend)
+            _apply_sample_updates(service)
+
+            _settle_snapshots(service)
+            for reader in (service, _make_service(test_dir, backend)):
+                roadmaps = reader.get_user_progress_summary("user_1")["roadmaps"]
+                validated = [jsonable_encoder(RoadmapProgress(**r)) for r in roadmaps]
+                assert roadmaps == validated
+                assert reader.get_roadmap_progress_data("user_1", "roadmap_a") == validated[0]
+            print(f"✅ {backend}: okuma yolu doğrulanmış çıktıyla aynı")
+        finally:
+            shutil.rmtree(test_dir)
+
+def test_binary_snapshot_lazy_load():
+    """İkili snapshot JSON'dan dönüştürülmeli ve kullanıcılar ilk erişimde yüklenmeli"""
+    print("🗜️ İkili Snapshot Testi...")
+
+    test_dir = tempfile.mkdtemp()
+    try:
+        json_service = _make_service(test_dir, "jsonlog")
+        _apply_sample_updates(json_service)
+        expected = json_service.get_user_progress_summary("user_1")
+        json_service.close()
+
+        binary_service = _make_service(test_dir, "binary")
+        assert binary_service.progress_data == {}
+        assert binary_service.get_user_progress_summary("user_1") == expected
+        assert set(binary_service.progress_data) == {"user_1_roadmap_a", "user_1_roadmap_b"}
+
+        # Snapshot'tan sonraki olaylar yeniden açılışta kullanıcı kaydına uygulanmalı
+        for minutes in range(1, 13):
+            binary_service.update_module_progress(f"user_{minutes % 3}", "roadmap_c", ProgressUpdate(
+                module_id="m1", progress_percentage=minutes * 5, time_spent_minutes=minutes,
+                status=ProgressStatus.IN_PROGRESS
+            ))
+        summaries = {u: binary_service.get_user_progress_summary(u) for u in ("user_0", "user_1", "user_2", "user_1_x")}
+        weekly = binary_service.get_weekly_progress("user_2", "roadmap_c")
+
+        _settle_snapshots(binary_service)
+        reopened = _make_service(test_dir, "binary")
+        assert {u: reopened.get_user_progress_summary(u) for u in summaries} == summaries
+        assert reopened.get_weekly_progress("user_2", "roadmap_c") == weekly
+        assert reopened.store._reader.raw("missing_user") is None
+        print("✅ İkili snapshot tembel yükleme ile tutarlı")
+    finally:
+        shutil.rmtree(test_dir)
+
+def test_event_stream_resume():
+    """Akış aboneleri yalnızca kendi olaylarını almalı ve kaldıkları yerden devam edebilmeli"""
+    print("📡 Canlı Akış Testi...")
+
+    test_dir = tempfile.mkdtemp()
+    try:
+        service = _make_service(test_dir, "sqlite")
+        update = ProgressUpdate(module_id="m1", progress_percentage=40, time_spent_minutes=20,
+                                status=ProgressStatus.IN_PROGRESS)
+
+        async def scenario():
+            subscription = service.events.subscribe("user_1")
+            service.update_module_progress("user_1", "roadmap_a", update)
+            service.update_module_progress("user_2", "roadmap_a", update)
+            # İlk güncelleme roadmap kaydını da oluşturur
+            assert (await asyncio.wait_for(subscription.queue.get(), timeout=1))[1] == "roadmap"
+            event_id, event_type, payload = await asyncio.wait_for(subscription.queue.get(), timeout=1)
+            assert subscription.queue.empty()
+            service.events.unsubscribe(subscription)
+
+            data = json.loads(payload)
+            assert (event_type, data["roadmap_id"]) == ("module", "roadmap_a")
+            assert data["modules"][0]["progress_percentage"] == 40
+            assert data["roadmap"]["overall_progress"] == 40
+
+            # Bağlantı yokken gelen olaylar Last-Event-ID ile yeniden gönderilmeli
+            _apply_sample_updates(service)
+            resumed = service.events.subscribe("user_1", event_id)
+            assert [e[1] for e in resumed.backlog] == ["module", "module", "roadmap", "module", "quiz"]
+            service.events.unsubscribe(resumed)
+
+            stale = service.events.subscribe("user_1", "0-1")
+            assert [e[1] for e in stale.backlog] == ["resync"]
+            service.events.unsubscribe(stale)
+
+        asyncio.run(scenario())
+        print("✅ Akış olayları kullanıcıya özel ve devam ettirilebilir")
+    finally:
+        shutil.rmtree(test_dir)
+
+def test_progress_analytics():
+    """Sütunlu analiz, kayıtlar üzerinden döngüyle hesaplanan değerlerle aynı olmalı"""
+    print("📊 Kohort Analizi Testi...")
+
+    test_dir = tempfile.mkdtemp()
+    try:
+        service = _make_service(test_dir, "binary")
+        _apply_sample_updates(service)
+        # Yeniden başlatılan roadmap'in eski modülleri analizden düşmeli
+        service.update_module_progress("user_2", "roadmap_c", ProgressUpdate(
+            module_id="m9", progress_percentage=100, time_spent_minutes=10, status=ProgressStatus.COMPLETED
+        ))
+        service.initialize_roadmap_progress("user_2", "roadmap_c", 3)
+
+        later = datetime.now() + timedelta(days=30)
+        analytics = service.analytics.analyze(now=later)
+        totals = analytics["totals"]
+        assert (totals["module_records"], totals["users"], totals["roadmaps"]) == (4, 2, 3)
+        assert totals["time_spent_minutes"] == 30 + 45 + 5 + 60
+        assert totals["status_counts"]["completed"] == 2
+        assert analytics["completion_rate"]["percentiles"]["p50"] == 50.0
+
+        modules = {(m["roadmap_id"], m["module_id"]): m for m in analytics["modules"]}
+        assert modules[("roadmap_a", "m1")]["started"] == 2
+        assert modules[("roadmap_a", "m1")]["median_minutes_to_complete"] == 60.0
+        assert modules[("roadmap_a", "m2")]["completion_rate"] == 100.0
+        assert ("roadmap_c", "m9") not in modules
+        assert {(m["roadmap_id"], m["module_id"]) for m in analytics["drop_off_points"]} == {
+            ("roadmap_a", "m1"), ("roadmap_b", "m1")
+        }
+        assert service.analytics.analyze()["drop_off_points"] == []
+        assert service.analytics.analyze("roadmap_b")["totals"]["module_records"] == 1
+        service.close()
+
+        # Tembel yüklemede henüz erişilmemiş kullanıcılar ilk analizde eklenmeli
+        reopened = _make_service(test_dir, "binary")
+        assert len(reopened.analytics) == 0
+        assert reopened.get_progress_analytics()["totals"] == totals
+        reopened.close()
+
+        # Arşivlenen roadmap'lerin kodları sözlükten düşmeli; sonuçlar değişmemeli
+        columns = ProgressColumns()
+        columns.COMPACT_MIN_CODES = 8
+        roadmaps = [
+            (f"user_{i}_roadmap_{i % 3}", {"module_progress": [
+                {"user_id": f"user_{i}", "roadmap_id": f"roadmap_{i % 3}", "module_id": f"m{j}",
+                 "status": "completed" if (i + j) % 2 else "in_progress",
+                 "progress_percentage": 50, "time_spent_minutes": i + j, "last_activity": None}
+                for j in range(3)
+            ]})
+            for i in range(40)
+        ]
+        columns.load(roadmaps)
+        expected = ProgressColumns()
+        expected.load(roadmaps[30:])
+        for roadmap_key, _ in roadmaps[:30]:
+            columns.remove_roadmap(roadmap_key)
+        assert len(columns._instances) <= 20 and len(columns._users) <= 20
+        assert columns.analyze(now=later) == expected.analyze(now=later)
+        assert columns.analyze("roadmap_1", now=later) == expected.analyze("roadmap_1", now=later)
+        print("✅ Kohort analizi kayıtlarla tutarlı")
+    finally:
+        shutil.rmtree(test_dir)
+
+def test_quiz_grading():
+    """Quiz'ler cevap anahtarıyla puanlanmalı; toplu puanlama tekli puanlamayla aynı sonucu vermeli"""
+    print("📝 Quiz Puanlama Testi...")
+
+    test_dir = tempfile.mkdtemp()
+    try:
+        service = _make_service(test_dir, "sqlite")
+        service.quiz_engine.set_key(QuizAnswerKey(quiz_id="exam", module_id="m1", questions=[
+            QuizQuestionKey(question_id="q1", accepted_answers=["B"]),
+            QuizQuestionKey(question_id="q2", question_type=QuizQuestionType.TEXT,
+                            accepted_answers=["İstanbul", "Constantinople"], points=2),
+            QuizQuestionKey(question_id="q3", question_type=QuizQuestionType.NUMERIC,
+                            accepted_answers=["3.14"], tolerance=0.01),
+        ]))
+
+        result = service.submit_quiz_result("user_1", "roadmap_a", QuizSubmission(
+            module_id="m1", quiz_id="exam", time_taken_minutes=5,
+            answers={"q1": " b ", "q2": "  ISTANBUL.", "q3": "3,141"}
+        ))
+        assert (result.score, result.correct_answers, result.total_questions) == (100, 3, 3)
+
+        partial = service.quiz_engine.get("exam").grade({"q1": "c", "q2": "istanbul"})
+        assert (partial["score"], partial["correct_answers"]) == (50, 1)
+
+        submissions = [
+            QuizBulkSubmission(user_id=f"student_{i}", answers={
+                "q1": "abcd"[i % 4], "q2": ["istanbul", "ankara", "Constantinople"][i % 3], "q3": str(3.13 + (i % 3) / 100)
+            })
+            for i in range(60)
+        ]
+        service.update_module_progress("student_1", "roadmap_exam", ProgressUpdate(
+            module_id="m1", progress_percentage=10, time_spent_minutes=5, status=ProgressStatus.IN_PROGRESS
+        ))
+        bulk = service.grade_quiz_bulk("exam", QuizBulkGradeRequest(
+            module_id="m1", roadmap_id="roadmap_exam", submissions=submissions
+        ))
+        compiled = service.quiz_engine.get("exam")
+        expected = [compiled.grade(submission.answers)["score"] for submission in submissions]
+        assert [r["score"] for r in bulk["results"]] == expected
+        assert bulk["graded"] == 60 and bulk["questions"][0]["correct_rate"] == 25.0
+        # İlerleme kaydı olmayan kullanıcılar sessizce atlanmamalı
+        assert bulk["recorded"] == 1
+        assert bulk["not_recorded"] == [s.user_id for s in submissions if s.user_id != "student_1"]
+        # roadmap verildiğinde sonuçlar kullanıcıların ilerlemesine yazılır
+        recorded = service.get_roadmap_progress("student_1", "roadmap_exam").module_progress[0].quiz_results
+        assert [quiz.score for quiz in recorded] == [expected[1]]
+
+        # Anahtarı olmayan quiz istemci puanıyla (yoksa cevaplanan oranla) kaydedilir
+        service.update_module_progress("user_1", "roadmap_a", ProgressUpdate(
+            module_id="m1", progress_percentage=10, time_spent_minutes=5, status=ProgressStatus.IN_PROGRESS
+        ))
+        client_scored = service.submit_quiz_result("user_1", "roadmap_a", QuizSubmission(
+            module_id="m1", quiz_id="unknown", answers={"q1": "a", "q2": "b"}, time_taken_minutes=1, score=85
+        ))
+        assert (client_scored.score, client_scored.correct_answers) == (85, 2)
+        unscored = service.submit_quiz_result("user_1", "roadmap_a", QuizSubmission(
+            module_id="m1", quiz_id="unknown", answers={"q1": "a", "q2": " "}, time_taken_minutes=1
+        ))
+        assert (unscored.score, unscored.total_questions) == (50, 2)
+        recorded = service.get_roadmap_progress("user_1", "roadmap_a").module_progress[0].quiz_results
+        assert [quiz.score for quiz in recorded][-2:] == [85, 50]
+        assert not service.has_quiz_key("unknown") and service.has_quiz_key("exam")
+        try:
+            service.submit_quiz_result("user_1", "roadmap_a", QuizSubmission(
+                module_id="m2", quiz_id="exam", answers={"q1": "b"}, time_taken_minutes=1
+            ))
+            assert False, "Başka modüle ait quiz kabul edilmemeli"
+        except ValueError:
+            pass
+
+        # Anahtarlar yeniden açılışta dosyadan derlenmeli
+        reloaded = QuizEngine(service.quiz_engine.keys_file)
+        assert reloaded.get("exam").grade({"q1": "b", "q2": "istanbul", "q3": "3.2"})["score"] == 75
+        print("✅ Quiz puanlama anahtarla tutarlı")
+    finally:
+        shutil.rmtree(test_dir)
+
+def test_quiz_without_module():
+    """Modül kaydı olmayan quiz sonucu roadmap'i değiştirmemeli, kaydetmemeli ve yayınlanmamalı"""
+    print("🚫 Modülsüz Quiz Testi...")
+
+    test_dir = tempfile.mkdtemp()
+    try:
+        service = _make_service(test_dir, "sqlite")
+        service.update_module_progress("user_1", "roadmap_a", ProgressUpdate(
+            module_id="m1", progress_percentage=10, time_spent_minutes=5, status=ProgressStatus.IN_PROGRESS
+        ))
+        before = service.get_roadmap_progress("user_1", "roadmap_a")
+        stored = service.store.load_roadmap("user_1", "roadmap_a")
+
+        async def scenario():
+            subscription = service.events.subscribe("user_1")
+            quiz_result = QuizResult(quiz_id="unknown", module_id="m9", score=90, total_questions=1,
+                                     correct_answers=1, time_taken_minutes=1, completed_at=datetime.now())
+            with service._locked("user_1"):
+                assert not service._record_quiz_result("user_1", "roadmap_a", "m9", quiz_result)
+            assert subscription.queue.empty()
+            service.events.unsubscribe(subscription)
+
+        asyncio.run(scenario())
+        assert service.get_roadmap_progress("user_1", "roadmap_a") == before
+        assert service.store.load_roadmap("user_1", "roadmap_a") == stored
+        print("✅ Modülsüz quiz sonucu yan etkisiz reddediliyor")
+    finally:
+        shutil.rmtree(test_dir)
+
+def test_progress_export():
+    """Dışa aktarma her depoda aynı satırları üretmeli ve filtreleri depoda uygulamalı"""
+    print("📤 Dışa Aktarma Testi...")
+
+    exports = {}
+    for backend, durability in (("jsonlog", "fsync_every_commit"), ("sqlite", "fsync_every_commit"),
+                                ("binary", "fsync_every_commit"), ("sqlite", "batched")):
+        test_dir = tempfile.mkdtemp()
+        try:
+            service = _make_service(test_dir, backend, durability)
+            _apply_sample_updates(service)
+            today = datetime.now().date().isoformat()
+            tomorrow = (datetime.now().date() + timedelta(days=1)).isoformat()
+
+            def export(**filters):
+                return sorted(
+                    (row["user_id"], row["roadmap_id"], row["module_id"], row["status"],
+                     row["time_spent_minutes"], row["quiz_attempts"], row["best_quiz_score"])
+                    for row in service.export_progress_records(**filters)
+                )
+
+            state = None
+            if backend == "jsonlog":
+                # Akışlı dışa aktarma deponun canlı durumunu değiştirmemeli
+                store = service.store
+                _settle_snapshots(service)
+                state = (store._generation, store._events_since_snapshot, dict(store._rollups))
+            exports[(backend, durability)] = (
+                export(),
+                export(roadmap_id="roadmap_a"),
+                export(since=today + "T00:00:00"),
+                export(until=today + "T00:00:00"),
+                export(roadmap_id="roadmap_b", since=today + "T00:00:00", until=tomorrow + "T00:00:00")
+            )
+            if state is not None:
+                assert state == (store._generation, store._events_since_snapshot, dict(store._rollups))
+            service.close()
+        finally:
+            shutil.rmtree(test_dir)
+
+    everything, roadmap_a, since_today, before_today, roadmap_b = exports[("sqlite", "fsync_every_commit")]
+    assert len(everything) == 4 and since_today == everything and before_today == []
+    assert [row[:3] for row in roadmap_a] == [
+        ("user_1", "roadmap_a", "m1"), ("user_1", "roadmap_a", "m2"), ("user_1_x", "roadmap_a", "m1")
+    ]
+    assert roadmap_a[0][5:] == (1, 100) and roadmap_a[1][5:] == (0, None)
+    assert [row[:3] for row in roadmap_b] == [("user_1", "roadmap_b", "m1")]
+    assert all(result == exports[("sqlite", "fsync_every_commit")] for result in exports.values())
+    print("✅ Dışa aktarma tüm depolarda tutarlı")
+
+def test_cold_archive():
+    """Eski roadmap'ler soğuk arşive taşınmalı, bellekten çıkmalı ve erişimde geri yüklenmeli"""
+    print("🧊 Soğuk Arşiv Testi...")
+
+    old = (datetime.now() - timedelta(days=200)).isoformat()
+    cases = [("jsonlog", "fsync_every_commit"), ("sqlite", "fsync_every_commit"),
+             ("binary", "fsync_every_commit"), ("sqlite", "batched")]
+    for backend, durability in cases:
+        test_dir = tempfile.mkdtemp()
+        try:
+            service = _make_service(test_dir, backend, durability)
+            _apply_sample_updates(service)
+            expected = service.get_user_progress_summary("user_1")
+            analytics_rows = len(service.analytics)
+            expected_export = sorted(map(str, service.export_progress_records()))
+            # user_1_x tamamen, user_1 yalnızca roadmap_b ile etkin değil
+            for key in ("user_1_x_roadmap_a", "user_1_roadmap_b"):
+                service.progress_data[key]["last_activity"] = old
+                service.store.save_roadmap(key, service.progress_data[key])
+
+            result = service.archive_inactive_roadmaps(max_idle_days=90)
+            assert result["archived_roadmaps"] == 2 and result["evicted_users"] == 1
+            assert set(service.progress_data) == {"user_1_roadmap_a"}
+            assert "user_1_x" not in service._user_roadmaps
+            # Bellekten çıkarılan kullanıcının kilit, yükleme ve zaman kovası kayıtları kalmamalı
+            # (arka plandaki snapshot kilidi geçici olarak yeniden oluşturabilir)
+            deadline = time.monotonic() + 5
+            while "user_1_x" in service._user_locks and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert "user_1_x" not in service._user_locks
+            assert "user_1_x" not in service._loaded_users and "user_1_x" not in service._thawed_users
+            assert "user_1_x" not in service.rollups._series
+            assert len(service.analytics) < analytics_rows
+            assert set(service.store.load()) == {"user_1_roadmap_a"}
+            assert result["archive"]["roadmaps"] == 2 and result["archive"]["stored_bytes"] > 0
+
+            # Dışa aktarma ve kohort analizi arşivdeki kayıtları da kapsamalı
+            assert sorted(map(str, service.export_progress_records())) == expected_export
+            assert service.get_progress_analytics("roadmap_a")["totals"]["users"] == 2
+            assert len(service.analytics) < analytics_rows
+            assert service.archive_inactive_roadmaps(max_idle_days=90)["archived_roadmaps"] == 0
+
+            # Yeniden açılışta arşivdeki kayıtlar ilk erişimde şeffaf olarak geri yüklenmeli
+            service.close()
+            reopened = _make_service(test_dir, backend, durability)
+            assert "user_1_roadmap_b" not in reopened.progress_data
+            assert reopened.get_progress_analytics()["totals"]["module_records"] == 4
+            summary = reopened.get_user_progress_summary("user_1")
+            if durability == "batched":
+                # Arşivden silinmeden önce geri yüklenen kayıtlar diske yazılmış olmalı
+                assert reopened.store.pending_count() == 0
+            assert summary["total_roadmaps"] == 2
+            assert summary["total_time_spent_minutes"] == expected["total_time_spent_minutes"]
+            assert reopened.get_roadmap_progress("user_1_x", "roadmap_a").completed_modules == 1
+            assert len(reopened.archive) == 0
+            # Geri yüklenen kullanıcının zaman kovaları depodan yeniden okunmalı
+            weekly = reopened.get_weekly_progress("user_1_x", "roadmap_a", weeks=1)
+            assert weekly[-1]["time_spent_minutes"] > 0
+            assert set(reopened.store.load()) == {"user_1_roadmap_a", "user_1_roadmap_b", "user_1_x_roadmap_a"}
+            reopened.close()
+        finally:
+            shutil.rmtree(test_dir)
+    print("✅ Soğuk arşiv taşıma ve geri yükleme tutarlı")
+
+if __name__ == "__main__":
+    print("🚀 Progress Service Testleri Başlatılıyor...\n")
+    test_persistence_roundtrip()
+    test_json_migration_to_sqlite()
+    test_user_index_isolation()
+    test_incremental_aggregates()
+    test_batched_writes()
+    test_batched_reads_skip_flush()
+    test_background_snapshot()
+    test_concurrent_writers()
+    test_writers_skip_global_locks()
+    test_multiprocess_mode()
+    test_weekly_rollups()
+    test_batch_updates()
+    test_trusted_reads()
+    test_binary_snapshot_lazy_load()
+    test_event_stream_resume()
+    test_progress_analytics()
+    test_quiz_grading()
+    test_quiz_without_module()
+    test_progress_export()
+    test_cold_archive()
+    print("\n🎉 Tüm ilerleme testleri başarılı!")
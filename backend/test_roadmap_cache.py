@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Roadmap Cache Test Script
+Profil normalizasyonu, TTL, LRU sınırı ve disk katmanını test eder
+"""
+
+import sys
+import os
+import time
+import shutil
+import tempfile
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.roadmap_cache import RoadmapCache, profile_key, hours_bucket
+
+def test_profile_key_normalization():
+    """Sıra, büyük/küçük harf, Türkçe karakter ve yakın saat farkları aynı anahtarı vermeli"""
+    print("🔑 Profil Anahtarı Testi...")
+
+    base = profile_key("agent", ["Python", "Veri Bilimi"], "beginner", ["İş bulmak"], 10, 6)
+    assert profile_key("agent", [" veri  bilimi", "PYTHON", "python"], "Beginner", ["iş bulmak"], 8, 6) == base
+    assert profile_key("agent", ["Python", "Veri Bilimi"], "beginner", ["IŞ BULMAK"], 10, 6) == base
+    assert profile_key("agent", ["Python", "Veri Bilimi"], "beginner", ["İş bulmak"], 12, 6) != base
+    assert profile_key("agent", ["Python"], "beginner", ["İş bulmak"], 10, 6) != base
+    assert profile_key("router", ["Python", "Veri Bilimi"], "beginner", ["İş bulmak"], 10, 6) != base
+    assert [hours_bucket(h) for h in (1, 5, 6, 40, 80, None, "x")] == [5, 5, 10, 40, 41, None, None]
+    print("✅ Profil anahtarı normalizasyonu doğru")
+
+def test_cache_ttl_and_eviction():
+    """Süresi dolan kayıt verilmemeli, sınır aşılınca en eski kullanılan atılmalı"""
+    print("⏱️ TTL ve LRU Testi...")
+
+    cache = RoadmapCache(max_entries=2, ttl_seconds=0.2)
+    cache.put("a", {"title": "A", "modules": []})
+    cache.put("b", {"title": "B", "modules": []})
+    assert cache.get("a")["title"] == "A"
+    cache.put("c", {"title": "C", "modules": []})
+    assert cache.get("b") is None and cache.get("a") is not None and cache.get("c") is not None
+
+    # Kopya verilmeli: çağıranın değişikliği önbelleğe yansımamalı
+    value = cache.get("a")
+    value["modules"].append({"id": "x"})
+    assert cache.get("a")["modules"] == []
+
+    time.sleep(0.25)
+    assert cache.get("a") is None
+    stats = cache.get_stats()
+    assert stats["evictions"] == 1 and stats["hits"] >= 3
+    assert RoadmapCache(max_entries=0).get("a") is None
+    print("✅ TTL ve LRU sınırı doğru")
+
+def test_disk_tier():
+    """Disk katmanı yeniden açılışta kaydı vermeli ve belleğe almalı"""
+    print("💽 Disk Katmanı Testi...")
+
+    test_dir = tempfile.mkdtemp()
+    try:
+        disk_file = os.path.join(test_dir, "roadmap_cache.db")
+        key = profile_key("agent", ["Python"], "beginner")
+        RoadmapCache(max_entries=10, ttl_seconds=60, disk_file=disk_file).put(key, {"title": "Python Yolu"})
+
+        reopened = RoadmapCache(max_entries=10, ttl_seconds=60, disk_file=disk_file)
+        assert reopened.get(key) == {"title": "Python Yolu"}
+        assert reopened.get(key) == {"title": "Python Yolu"}
+        stats = reopened.get_stats()
+        assert stats["disk_hits"] == 1 and stats["hits"] == 1 and stats["entries"] == 1
+    finally:
+        shutil.rmtree(test_dir)
+    print("✅ Disk katmanı kalıcı")
+
+def test_disk_tier_bounded():
+    """Disk tablosu sınırı aşmamalı, süresi dolanlar silinmeli; bellek isabeti disk kilidini beklememeli"""
+    print("📏 Disk Sınırı Testi...")
+
+    test_dir = tempfile.mkdtemp()
+    try:
+        disk_file = os.path.join(test_dir, "roadmap_cache.db")
+        cache = RoadmapCache(max_entries=5, ttl_seconds=60, disk_file=disk_file, disk_max_entries=20)
+        for i in range(100):
+            cache.put(f"k{i}", {"title": f"Yol {i}"})
+        rows = cache._disk.execute("SELECT COUNT(*) FROM roadmap_cache").fetchone()[0]
+        assert rows <= 20 + 20 // 10
+        # En yeni kayıtlar kalır, en eskiler silinir
+        assert cache.get("k99") == {"title": "Yol 99"} and cache.get("k0") is None
+        assert cache.get("k85") == {"title": "Yol 85"}
+
+        # Süresi dolan kayıtlar sonraki budamada diskten silinmeli
+        short = RoadmapCache(max_entries=5, ttl_seconds=0.05, disk_file=disk_file, disk_max_entries=20)
+        short.put("old", {"title": "Eski"})
+        time.sleep(0.1)
+        for i in range(2):
+            short.put(f"new{i}", {"title": "Yeni"})
+        assert short._disk.execute("SELECT COUNT(*) FROM roadmap_cache WHERE cache_key = 'old'").fetchone()[0] == 0
+
+        # Disk G/Ç'si sürerken bellek isabeti beklememeli
+        cache.put("hot", {"title": "Sıcak"})
+        with cache._disk_lock:
+            result = []
+            reader = threading.Thread(target=lambda: result.append(cache.get("hot")))
+            reader.start()
+            reader.join(timeout=1)
+            assert result == [{"title": "Sıcak"}]
+    finally:
+        shutil.rmtree(test_dir)
+    print("✅ Disk katmanı sınırlı ve bellek kilidinden bağımsız")
+
+if __name__ == "__main__":
+    print("🚀 Roadmap Önbellek Testleri Başlatılıyor...\n")
+    test_profile_key_normalization()
+    test_cache_ttl_and_eviction()
+    test_disk_tier()
+    test_disk_tier_bounded()
+    print("\n🎉 Tüm önbellek testleri başarılı!")
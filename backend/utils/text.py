@@ -0,0 +1,11 @@
+import re
+import unicodedata
+
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_text(value: str) -> str:
+    """Metni karşılaştırma biçimine çevir: NFKC, büyük/küçük harf katlama (Türkçe İ/ı dahil), boşluk sadeleştirme"""
+    text = unicodedata.normalize("NFKC", value).casefold()
+    # "İ".casefold() birleşik nokta bırakır; noktasız ı da i ile eşlenir
+    text = text.replace("\u0307", "").replace("ı", "i")
+    return _WHITESPACE.sub(" ", text).strip()